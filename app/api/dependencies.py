@@ -8,11 +8,15 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from app.core.config import get_settings
 from app.core.database import get_database
 from app.core.security import decode_access_token
+from app.indexes.registry import SearchIndexes, get_search_indexes
 from app.schemas.auth import TokenPayload
 from app.schemas.user import UserResponse
+from app.services.graph_service import GraphNotReadyError, GraphService
 from app.services.hadith_service import HadithService
+from app.services.narrator_loader import NarratorLoader
 from app.services.narrator_service import NarratorService
 from app.services.user_service import UserService
+from app.storage.backend import SnapshotDatabase, get_corpus_database
 
 settings = get_settings()
 
@@ -28,15 +32,41 @@ def get_user_service(
 
 
 def get_hadith_service(
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_database)],
+    db: Annotated[
+        AsyncIOMotorDatabase | SnapshotDatabase, Depends(get_corpus_database)
+    ],
+    indexes: Annotated[SearchIndexes, Depends(get_search_indexes)],
 ) -> HadithService:
-    return HadithService(db)
+    return HadithService(db, indexes)
 
 
 def get_narrator_service(
-    db: Annotated[AsyncIOMotorDatabase, Depends(get_database)],
+    db: Annotated[
+        AsyncIOMotorDatabase | SnapshotDatabase, Depends(get_corpus_database)
+    ],
+    indexes: Annotated[SearchIndexes, Depends(get_search_indexes)],
 ) -> NarratorService:
-    return NarratorService(db)
+    return NarratorService(db, indexes)
+
+
+def get_graph_service(
+    indexes: Annotated[SearchIndexes, Depends(get_search_indexes)],
+) -> GraphService:
+    try:
+        return GraphService(indexes)
+    except GraphNotReadyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=str(e),
+            headers={"Retry-After": "5"},
+        )
+
+
+def get_narrator_loader(
+    narrator_service: Annotated[NarratorService, Depends(get_narrator_service)],
+) -> NarratorLoader:
+    # FastAPI caches dependencies per request, so this is request-scoped.
+    return NarratorLoader(narrator_service)
 
 
 async def get_current_user(
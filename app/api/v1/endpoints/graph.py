@@ -0,0 +1,55 @@
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+
+from app.api.dependencies import get_graph_service
+from app.core.serialization import json_response
+from app.schemas.graph import (
+    NarratorGraphResponse,
+    TopTransmittersResponse,
+    TransmissionPathResponse,
+)
+from app.services.graph_service import GraphService, UnknownNarratorError
+
+router = APIRouter(prefix="/graph", tags=["graph"])
+
+
+@router.get("/narrators/{narrator_id}", response_model=NarratorGraphResponse)
+async def get_narrator_neighbors(
+    narrator_id: int,
+    graph_service: Annotated[GraphService, Depends(get_graph_service)],
+    limit: Annotated[int, Query(ge=1, le=200, description="Maximum teachers and students each")] = 20,
+) -> Response:
+    try:
+        payload = await graph_service.get_neighbors(narrator_id, limit)
+    except UnknownNarratorError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    return json_response(payload, NarratorGraphResponse)
+
+
+@router.get("/top-transmitters", response_model=TopTransmittersResponse)
+async def get_top_transmitters(
+    graph_service: Annotated[GraphService, Depends(get_graph_service)],
+    limit: Annotated[int, Query(ge=1, le=100)] = 20,
+) -> Response:
+    payload = await graph_service.get_top_transmitters(limit)
+    return json_response(payload, TopTransmittersResponse)
+
+
+@router.get("/path", response_model=TransmissionPathResponse)
+async def get_transmission_path(
+    graph_service: Annotated[GraphService, Depends(get_graph_service)],
+    source: Annotated[int, Query(description="narrator_id of the earlier narrator (the teacher side)")],
+    target: Annotated[int, Query(description="narrator_id of the later narrator (the student side)")],
+    directed: Annotated[bool, Query(description="If false, links may also be followed from student to teacher")] = True,
+) -> Response:
+    try:
+        payload = await graph_service.find_path(source, target, directed)
+    except UnknownNarratorError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No transmission path between these narrators.",
+        )
+    return json_response(payload, TransmissionPathResponse)
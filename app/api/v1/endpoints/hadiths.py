@@ -1,43 +1,172 @@
-from typing import Annotated
+from typing import Annotated, Literal
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
+from fastapi.responses import StreamingResponse
 
-from app.api.dependencies import get_hadith_service
-from app.schemas.hadith import HadithListResponse, HadithResponse
+from app.api.dependencies import get_hadith_service, get_narrator_loader
+from app.core.http_cache import cached_json_response
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import json_response
+from app.core.streaming import accepts_gzip, gzip_stream, started
+from app.schemas.hadith import (
+    HadithBatchRequest,
+    HadithBatchResponse,
+    HadithExpandedResponse,
+    HadithListResponse,
+    HadithPartialListResponse,
+    HadithResponse,
+    HadithSummaryListResponse,
+    SimilarHadithsResponse,
+)
 from app.services.hadith_service import HadithService
+from app.services.narrator_loader import NarratorLoader
 
 router = APIRouter(prefix="/hadiths", tags=["hadiths"])
 
 
-@router.get("", response_model=HadithListResponse)
+def _parse_fields(fields: str | None) -> list[str] | None:
+    if not fields:
+        return None
+    selected = list(dict.fromkeys(f.strip() for f in fields.split(",") if f.strip()))
+    unknown = [f for f in selected if f not in HadithResponse.model_fields]
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unknown fields: {', '.join(unknown)}.",
+        )
+    return selected
+
+
+@router.get(
+    "",
+    response_model=HadithListResponse
+    | HadithSummaryListResponse
+    | HadithPartialListResponse,
+)
 async def search_hadiths(
     hadith_service: Annotated[HadithService, Depends(get_hadith_service)],
     full_text_plain: Annotated[str | None, Query()] = None,
     book_id: Annotated[int | None, Query()] = None,
     narrators: Annotated[str | None, Query(description="Comma-separated narrator IDs")] = None,
     narrators_ordered: Annotated[bool, Query(description="If true, narrators must appear in the given order")] = False,
+    narrators_contiguous: Annotated[bool, Query(description="If true, narrators must appear as an exact, contiguous segment of the chain")] = False,
     skip: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 20,
-) -> HadithListResponse:
-    return await hadith_service.search_hadiths(
-        full_text_plain=full_text_plain,
-        book_id=book_id,
-        narrators=narrators,
-        narrators_ordered=narrators_ordered,
-        skip=skip,
-        limit=limit,
+    cursor: Annotated[str | None, Query(description="Opaque next_cursor from a previous page; overrides skip")] = None,
+    include_total: Annotated[bool, Query(description="If false, skip counting; total is null and has_more tells whether another page exists")] = True,
+    fields: Annotated[str | None, Query(description="Comma-separated hadith fields to return, e.g. id,book_id,matn")] = None,
+    view: Annotated[Literal["full", "summary"], Query(description="summary returns ids, book/page, narrator names and a short snippet")] = "full",
+    facets: Annotated[bool, Query(description="If true, add match counts per book_id and for the most frequent narrators")] = False,
+) -> Response:
+    selected_fields = _parse_fields(fields)
+    try:
+        payload = await hadith_service.search_hadiths(
+            full_text_plain=full_text_plain,
+            book_id=book_id,
+            narrators=narrators,
+            narrators_ordered=narrators_ordered,
+            narrators_contiguous=narrators_contiguous,
+            skip=skip,
+            limit=limit,
+            cursor=cursor,
+            include_total=include_total,
+            fields=selected_fields,
+            view=view,
+            facets=facets,
+        )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    if view == "summary":
+        return json_response(payload, HadithSummaryListResponse)
+    if selected_fields:
+        return json_response(payload, HadithPartialListResponse)
+    return json_response(payload, HadithListResponse)
+
+
+@router.get(
+    "/export",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/x-ndjson": {}},
+            "description": "One hadith JSON object per line",
+        }
+    },
+)
+async def export_hadiths(
+    request: Request,
+    hadith_service: Annotated[HadithService, Depends(get_hadith_service)],
+    full_text_plain: Annotated[str | None, Query()] = None,
+    book_id: Annotated[int | None, Query()] = None,
+    narrators: Annotated[str | None, Query(description="Comma-separated narrator IDs")] = None,
+    narrators_ordered: Annotated[bool, Query(description="If true, narrators must appear in the given order")] = False,
+    narrators_contiguous: Annotated[bool, Query(description="If true, narrators must appear as an exact, contiguous segment of the chain")] = False,
+    fields: Annotated[str | None, Query(description="Comma-separated hadith fields to return, e.g. id,book_id,matn")] = None,
+) -> StreamingResponse:
+    """Stream every matching hadith as NDJSON, gzipped if the client accepts it."""
+    body = await started(
+        hadith_service.export_hadiths(
+            full_text_plain=full_text_plain,
+            book_id=book_id,
+            narrators=narrators,
+            narrators_ordered=narrators_ordered,
+            narrators_contiguous=narrators_contiguous,
+            fields=_parse_fields(fields),
+        )
     )
+    headers = {
+        "Content-Disposition": 'attachment; filename="hadiths.ndjson"',
+        "Vary": "Accept-Encoding",
+    }
+    if accepts_gzip(request):
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return StreamingResponse(body, media_type="application/x-ndjson", headers=headers)
+
+
+@router.post("/batch", response_model=HadithBatchResponse)
+async def get_hadiths_batch(
+    batch: HadithBatchRequest,
+    hadith_service: Annotated[HadithService, Depends(get_hadith_service)],
+) -> Response:
+    payload = await hadith_service.get_hadiths_by_ids(batch.ids)
+    return json_response(payload, HadithBatchResponse)
 
 
-@router.get("/{hadith_id}", response_model=HadithResponse)
+@router.get("/{hadith_id}/similar", response_model=SimilarHadithsResponse)
+async def get_similar_hadiths(
+    hadith_id: str,
+    hadith_service: Annotated[HadithService, Depends(get_hadith_service)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> Response:
+    """Other narrations of the same matn, most similar first."""
+    payload = await hadith_service.get_similar_hadiths(hadith_id, limit)
+    if payload is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Hadith not found.",
+        )
+    return json_response(payload, SimilarHadithsResponse)
+
+
+@router.get("/{hadith_id}", response_model=HadithResponse | HadithExpandedResponse)
 async def get_hadith(
     hadith_id: str,
+    request: Request,
     hadith_service: Annotated[HadithService, Depends(get_hadith_service)],
-) -> HadithResponse:
-    hadith = await hadith_service.get_hadith_by_id(hadith_id)
-    if hadith is None:
+    narrator_loader: Annotated[NarratorLoader, Depends(get_narrator_loader)],
+    expand: Annotated[Literal["narrators"] | None, Query(description="narrators adds each chain member's full narrator record as details")] = None,
+) -> Response:
+    cached = await hadith_service.get_hadith_body(
+        hadith_id,
+        narrator_loader=narrator_loader if expand == "narrators" else None,
+    )
+    if cached is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Hadith not found.",
         )
-    return hadith
+    return cached_json_response(request, cached)
@@ -1,9 +1,19 @@
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, status
 
 from app.api.dependencies import get_narrator_service
-from app.schemas.narrator import NarratorListResponse, NarratorResponse
+from app.core.http_cache import cached_json_response
+from app.core.limits import search_limiter
+from app.core.pagination import InvalidCursorError
+from app.core.serialization import json_response
+from app.schemas.narrator import (
+    NarratorBatchRequest,
+    NarratorBatchResponse,
+    NarratorListResponse,
+    NarratorResponse,
+    NarratorSuggestResponse,
+)
 from app.services.narrator_service import NarratorService
 
 router = APIRouter(prefix="/narrators", tags=["narrators"])
@@ -17,25 +27,59 @@ async def search_narrators(
     nasab: Annotated[str | None, Query()] = None,
     skip: Annotated[int, Query(ge=0)] = 0,
     limit: Annotated[int, Query(ge=1, le=100)] = 20,
-) -> NarratorListResponse:
-    return await narrator_service.search_narrators(
-        name_plain=name_plain,
-        kunya=kunya,
-        nasab=nasab,
-        skip=skip,
-        limit=limit,
-    )
+    cursor: Annotated[str | None, Query(description="Opaque next_cursor from a previous page; overrides skip")] = None,
+    include_total: Annotated[bool, Query(description="If false, skip counting; total is null and has_more tells whether another page exists")] = True,
+    fuzzy: Annotated[bool, Query(description="If true, rank narrators by name similarity to tolerate misspellings; paginate with skip")] = False,
+) -> Response:
+    try:
+        async with search_limiter:
+            payload = await narrator_service.search_narrators(
+                name_plain=name_plain,
+                kunya=kunya,
+                nasab=nasab,
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                include_total=include_total,
+                fuzzy=fuzzy,
+            )
+    except InvalidCursorError as e:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e),
+        )
+    return json_response(payload, NarratorListResponse)
+
+
+@router.get("/suggest", response_model=NarratorSuggestResponse)
+async def suggest_narrators(
+    narrator_service: Annotated[NarratorService, Depends(get_narrator_service)],
+    q: Annotated[str, Query(min_length=1, max_length=100)],
+    limit: Annotated[int, Query(ge=1, le=50)] = 10,
+) -> Response:
+    payload = await narrator_service.suggest_narrators(q, limit)
+    return json_response(payload, NarratorSuggestResponse)
+
+
+@router.post("/batch", response_model=NarratorBatchResponse)
+async def get_narrators_batch(
+    batch: NarratorBatchRequest,
+    narrator_service: Annotated[NarratorService, Depends(get_narrator_service)],
+) -> Response:
+    payload = await narrator_service.get_narrators_by_ids(batch.ids)
+    return json_response(payload, NarratorBatchResponse)
 
 
 @router.get("/{narrator_id}", response_model=NarratorResponse)
 async def get_narrator(
     narrator_id: str,
+    request: Request,
     narrator_service: Annotated[NarratorService, Depends(get_narrator_service)],
-) -> NarratorResponse:
-    narrator = await narrator_service.get_narrator_by_id(narrator_id)
-    if narrator is None:
+) -> Response:
+    cached = await narrator_service.get_narrator_body(narrator_id)
+    if cached is None:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
             detail="Narrator not found.",
         )
-    return narrator
+    return cached_json_response(request, cached)
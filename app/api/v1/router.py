@@ -1,6 +1,6 @@
 from fastapi import APIRouter
 
-from app.api.v1.endpoints import auth, hadiths, health, narrators, users
+from app.api.v1.endpoints import auth, graph, hadiths, health, narrators, users
 
 api_router = APIRouter()
 
@@ -9,3 +9,4 @@ api_router.include_router(auth.router)
 api_router.include_router(users.router)
 api_router.include_router(hadiths.router)
 api_router.include_router(narrators.router)
+api_router.include_router(graph.router)
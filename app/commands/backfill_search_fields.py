@@ -0,0 +1,66 @@
+"""Store normalized search fields on existing hadith and narrator documents.
+
+Usage: python -m app.commands.backfill_search_fields [--batch-size N]
+"""
+
+import argparse
+import asyncio
+import logging
+from collections.abc import Callable
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+from pymongo import UpdateOne
+
+from app.core.database import database
+from app.core.normalization import hadith_search_fields, narrator_search_fields
+
+logger = logging.getLogger(__name__)
+
+
+async def backfill(
+    collection: AsyncIOMotorCollection,
+    projection: dict,
+    derive: Callable[[dict], dict],
+    batch_size: int,
+) -> int:
+    updated = 0
+    batch: list[UpdateOne] = []
+    async for doc in collection.find({}, projection):
+        batch.append(UpdateOne({"_id": doc["_id"]}, {"$set": derive(doc)}))
+        if len(batch) >= batch_size:
+            await collection.bulk_write(batch, ordered=False)
+            updated += len(batch)
+            batch = []
+    if batch:
+        await collection.bulk_write(batch, ordered=False)
+        updated += len(batch)
+    return updated
+
+
+async def main(batch_size: int) -> None:
+    await database.connect()
+    try:
+        hadiths = await backfill(
+            database.db.hadiths,
+            {"full_text_plain": 1},
+            hadith_search_fields,
+            batch_size,
+        )
+        logger.info("Updated %d hadiths.", hadiths)
+        narrators = await backfill(
+            database.db.narrators,
+            {"name_plain": 1, "kunya": 1, "nasab": 1},
+            narrator_search_fields,
+            batch_size,
+        )
+        logger.info("Updated %d narrators.", narrators)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.batch_size))
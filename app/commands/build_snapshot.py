@@ -0,0 +1,58 @@
+"""Write the hadith and narrator collections to a read-only snapshot file.
+
+Usage: python -m app.commands.build_snapshot [--output PATH]
+
+Serve it with STORAGE_BACKEND=snapshot and SNAPSHOT_PATH=PATH. The file is
+replaced atomically, so running workers keep their current mapping until
+they restart.
+"""
+
+import argparse
+import asyncio
+import logging
+
+from app.core.config import get_settings
+from app.core.database import database
+from app.indexes.registry import HADITH_SORT
+from app.services.hadith_service import HadithService
+from app.services.narrator_service import NARRATOR_SORT
+from app.storage.snapshot import SnapshotWriter
+
+logger = logging.getLogger(__name__)
+
+
+async def main(output: str) -> None:
+    await database.connect(ensure_indexes=False)
+    try:
+        writer = SnapshotWriter(output)
+        hadiths = await writer.add_collection(
+            "hadiths",
+            database.db.hadiths.find({}).sort(HADITH_SORT).allow_disk_use(True),
+            HADITH_SORT,
+            multi_paths=["narrators.id"],
+        )
+        logger.info("Wrote %d hadiths.", hadiths)
+        narrators = await writer.add_collection(
+            "narrators",
+            database.db.narrators.find({}).sort(NARRATOR_SORT),
+            NARRATOR_SORT,
+        )
+        logger.info("Wrote %d narrators.", narrators)
+        similar = await writer.add_collection(
+            HadithService.SIMILAR_COLLECTION,
+            database.db[HadithService.SIMILAR_COLLECTION].find({}).sort("_id"),
+            [("_id", 1)],
+        )
+        logger.info("Wrote %d similar-hadith entries.", similar)
+        writer.close()
+        logger.info("Snapshot written to %s.", output)
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--output", default=get_settings().SNAPSHOT_PATH)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args.output))
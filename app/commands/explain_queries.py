@@ -0,0 +1,265 @@
+"""Explain the query shapes the services run and report weak plans.
+
+Usage: python -m app.commands.explain_queries [--max-ratio R] [--drop-retired]
+
+Representative filters are built with the services' own query builders and
+sample values from the database, then explained with executionStats. Each
+shape is reported with the index it used, and flagged for a COLLSCAN, an
+in-memory SORT, many more documents examined than returned, or a missing
+catalog index. Exits with status 1 when any shape has a COLLSCAN or its
+index is missing.
+
+With --drop-retired the catalog is reconciled first: missing indexes are
+built and the retired ones dropped, which cannot be undone.
+"""
+
+import argparse
+import asyncio
+import logging
+from collections.abc import Iterator
+from dataclasses import dataclass
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.core.database import database
+from app.core.index_catalog import INDEX_CATALOG, IndexSpec, reconcile_indexes
+from app.core.normalization import tokens_query
+from app.core.pagination import keyset_query
+from app.indexes.registry import HADITH_SORT
+from app.services.hadith_service import _search_query
+from app.services.narrator_service import NARRATOR_SORT
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 21
+
+
+@dataclass
+class Shape:
+    label: str
+    collection: str
+    filter: dict
+    sort: list[tuple[str, int]] | None
+    # Catalog index expected to serve it; None for _id lookups.
+    index: IndexSpec | None
+
+
+def _spec(collection: str, *fields: str) -> IndexSpec:
+    return next(
+        spec
+        for spec in INDEX_CATALOG
+        if spec.collection == collection
+        and tuple(field for field, _ in spec.keys) == fields
+    )
+
+
+async def shapes(db: AsyncIOMotorDatabase) -> list[Shape]:
+    """Query shapes of HadithService and NarratorService, with sample values."""
+    by_book = _spec("hadiths", "book_id", "page_number", "_id")
+    by_narrator = _spec("hadiths", "narrators.id", "book_id", "page_number", "_id")
+    by_narrator_id = _spec("narrators", "narrator_id", "_id")
+    found = [
+        Shape("hadiths: first page", "hadiths", {}, HADITH_SORT, by_book),
+        Shape("narrators: first page", "narrators", {}, NARRATOR_SORT, by_narrator_id),
+        Shape(
+            "users: by email",
+            "users",
+            {"email": "nobody@example.com"},
+            None,
+            _spec("users", "email"),
+        ),
+    ]
+
+    hadith = await db.hadiths.find_one(
+        {"narrators.1": {"$exists": True}},
+        {"book_id": 1, "page_number": 1, "narrators.id": 1, "text_tokens": 1},
+    )
+    if hadith is None:
+        logger.warning("No hadith with a chain found; skipping hadith filters.")
+    else:
+        book_id = hadith["book_id"]
+        first, second = (n["id"] for n in hadith["narrators"][:2])
+        words = " ".join(sorted(hadith.get("text_tokens", []), key=len)[-2:])
+        after = keyset_query(
+            HADITH_SORT, [book_id, hadith["page_number"], hadith["_id"]]
+        )
+        found += [
+            Shape(
+                "hadiths: book",
+                "hadiths",
+                _search_query(None, book_id, [], False, False),
+                HADITH_SORT,
+                by_book,
+            ),
+            Shape(
+                "hadiths: book, next cursor page",
+                "hadiths",
+                {"$and": [_search_query(None, book_id, [], False, False), after]},
+                HADITH_SORT,
+                by_book,
+            ),
+            Shape(
+                "hadiths: narrator",
+                "hadiths",
+                _search_query(None, None, [first], False, False),
+                HADITH_SORT,
+                by_narrator,
+            ),
+            Shape(
+                "hadiths: book and narrator",
+                "hadiths",
+                _search_query(None, book_id, [first], False, False),
+                HADITH_SORT,
+                by_narrator,
+            ),
+            Shape(
+                "hadiths: narrators in order",
+                "hadiths",
+                _search_query(None, None, [second, first], True, False),
+                HADITH_SORT,
+                by_narrator,
+            ),
+            Shape(
+                "hadiths: page by ids",
+                "hadiths",
+                {"_id": {"$in": [hadith["_id"]]}},
+                None,
+                None,
+            ),
+            Shape(
+                "narrators: by narrator_id",
+                "narrators",
+                {"narrator_id": {"$in": [first, second]}},
+                None,
+                by_narrator_id,
+            ),
+        ]
+        if words:
+            found.append(
+                Shape(
+                    "hadiths: text",
+                    "hadiths",
+                    _search_query(words, None, [], False, False),
+                    HADITH_SORT,
+                    _spec("hadiths", "text_tokens"),
+                )
+            )
+
+    narrator = await db.narrators.find_one(
+        {"name_plain": {"$gt": ""}}, {"name_plain": 1, "kunya": 1}
+    )
+    if narrator is None:
+        logger.warning("No named narrator found; skipping narrator filters.")
+    else:
+        # As typed in autocomplete: the last word is a prefix.
+        prefix = narrator["name_plain"][: max(len(narrator["name_plain"]) - 2, 1)]
+        for label, field, value in (
+            ("narrators: name prefix", "name_tokens", prefix),
+            ("narrators: kunya", "kunya_tokens", narrator.get("kunya") or ""),
+        ):
+            condition = tokens_query(field, value, prefix_last=True)
+            if condition:
+                found.append(
+                    Shape(
+                        label,
+                        "narrators",
+                        {"$and": [condition]},
+                        NARRATOR_SORT,
+                        _spec("narrators", field),
+                    )
+                )
+    return found
+
+
+def _stages(plan: dict) -> Iterator[dict]:
+    yield plan
+    for key in ("queryPlan", "inputStage"):
+        if key in plan:
+            yield from _stages(plan[key])
+    for child in plan.get("inputStages", ()):
+        yield from _stages(child)
+
+
+async def explain(
+    db: AsyncIOMotorDatabase, shape: Shape, max_ratio: float
+) -> tuple[str, list[str], bool]:
+    """Summary line, findings, and whether the shape needs fixing."""
+    command = {"find": shape.collection, "filter": shape.filter, "limit": PAGE_SIZE}
+    if shape.sort:
+        command["sort"] = dict(shape.sort)
+    result = await db.command({"explain": command, "verbosity": "executionStats"})
+    stats = result["executionStats"]
+    stages = list(_stages(result["queryPlanner"]["winningPlan"]))
+    names = {stage.get("stage") for stage in stages}
+    used = [stage["indexName"] for stage in stages if "indexName" in stage]
+    returned = stats["nReturned"]
+    examined = stats["totalDocsExamined"]
+    summary = (
+        f"{shape.label:<34} {', '.join(used) or 'COLLSCAN':<42} "
+        f"{returned:>8} {stats['totalKeysExamined']:>10} {examined:>10} "
+        f"{stats['executionTimeMillis']:>7}"
+    )
+
+    findings = []
+    broken = False
+    if "COLLSCAN" in names:
+        findings.append("full collection scan")
+        broken = True
+    if "SORT" in names:
+        findings.append("sorted in memory")
+    if examined > max_ratio * max(returned, 1):
+        findings.append(f"examined {examined} documents for {returned} results")
+    if shape.index is not None:
+        name = shape.index.find(await db[shape.collection].index_information())
+        if name is None:
+            findings.append(
+                f"missing index {shape.index.name} ({shape.index.serves}); "
+                "it is created at the next startup"
+            )
+            broken = True
+        elif name not in used:
+            findings.append(f"planner did not use {name}")
+    return summary, findings, broken
+
+
+async def main(max_ratio: float, drop_retired: bool = False) -> int:
+    await database.connect(ensure_indexes=False)
+    try:
+        if drop_retired:
+            await reconcile_indexes(database.db, drop_retired=True)
+        db = database.corpus_db
+        print(
+            f"{'shape':<34} {'index':<42} {'returned':>8} {'keys':>10} "
+            f"{'docs':>10} {'ms':>7}"
+        )
+        problems = 0
+        needs_fixing = False
+        for shape in await shapes(db):
+            summary, findings, broken = await explain(db, shape, max_ratio)
+            print(summary)
+            for finding in findings:
+                print(f"    ! {finding}")
+            problems += bool(findings)
+            needs_fixing |= broken
+        print(f"\n{problems} shape(s) with findings.")
+        return 1 if needs_fixing else 0
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--max-ratio",
+        type=float,
+        default=10.0,
+        help="Flag shapes examining more than this many documents per result.",
+    )
+    parser.add_argument(
+        "--drop-retired",
+        action="store_true",
+        help="Build missing catalog indexes and drop retired ones first.",
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    raise SystemExit(asyncio.run(main(args.max_ratio, args.drop_retired)))
@@ -0,0 +1,260 @@
+"""Find near-duplicate narrations and store them in hadith_similar.
+
+Usage: python -m app.commands.find_similar_hadiths [--threshold T]
+    [--permutations N] [--bands B] [--min-length N] [--batch-size N]
+
+Needs NumPy: install the ``similarity`` extra.
+
+Every matn is reduced to a MinHash signature over character shingles of its
+normalized text. Locality-sensitive hashing on bands of the signatures finds
+candidate pairs without comparing every matn to every other, and a pair is
+kept when its estimated Jaccard similarity reaches the threshold. Connected
+pairs form clusters. Results go to a scratch collection that then replaces
+hadith_similar, so the API never serves a half-built result.
+"""
+
+import argparse
+import asyncio
+import logging
+import zlib
+
+from app.core.database import database
+from app.core.normalization import tokenize
+from app.indexes.registry import HADITH_SORT
+from app.services.hadith_service import HadithService
+
+try:
+    import numpy as np
+except ImportError as e:
+    raise SystemExit(
+        "find_similar_hadiths needs NumPy: install islamic-app-server[similarity]."
+    ) from e
+
+logger = logging.getLogger(__name__)
+
+SHINGLE_SIZE = 5
+# Most similar hadiths stored per hadith.
+MAX_SIMILAR = 50
+# Bands shared by more hadiths than this are boilerplate, not narrations.
+MAX_BUCKET_SIZE = 1_000
+WRITE_BATCH_SIZE = 1_000
+
+
+def normalize(text: str) -> str:
+    """Normalized words only, so punctuation and spacing do not count."""
+    return " ".join(tokenize(text))
+
+
+def shingles(text: str) -> "np.ndarray":
+    """CRC32 hashes of the distinct character shingles of normalized text."""
+    grams = {text[i : i + SHINGLE_SIZE] for i in range(len(text) - SHINGLE_SIZE + 1)}
+    return np.fromiter((zlib.crc32(gram.encode()) for gram in grams), dtype=np.uint64)
+
+
+class MinHasher:
+    """MinHash signatures under ``permutations`` random universal hashes.
+
+    Each hash is multiply-shift, ``(a * x + b) mod 2**64 >> 32`` for odd
+    ``a``: it wraps in uint64 instead of needing a slow modulo.
+    """
+
+    def __init__(self, permutations: int, seed: int = 1) -> None:
+        rng = np.random.default_rng(seed)
+        size = (permutations, 1)
+        self.a = rng.integers(0, 1 << 64, size, dtype=np.uint64, endpoint=False) | 1
+        self.b = rng.integers(0, 1 << 64, size, dtype=np.uint64, endpoint=False)
+
+    def signatures(self, shingle_sets: list["np.ndarray"]) -> "np.ndarray":
+        """One signature row per non-empty shingle set, in a single pass.
+
+        The sets are concatenated, permuted together and reduced per set, so
+        the work stays in NumPy rather than a Python loop per hadith.
+        """
+        lengths = np.fromiter(map(len, shingle_sets), dtype=np.int64)
+        starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+        permuted = (self.a * np.concatenate(shingle_sets) + self.b) >> np.uint64(32)
+        return np.minimum.reduceat(permuted, starts, axis=1).T.astype(np.uint32)
+
+
+def candidate_pairs(signatures: "np.ndarray", bands: int) -> "np.ndarray":
+    """``(i, j)`` rows, ``i < j``, of hadiths agreeing on at least one band."""
+    rows = signatures.shape[1] // bands
+    pairs = set()
+    for band in range(bands):
+        chunk = signatures[:, band * rows : (band + 1) * rows]
+        _, buckets = np.unique(chunk, axis=0, return_inverse=True)
+        order = np.argsort(buckets, kind="stable")
+        bounds = np.flatnonzero(np.diff(buckets[order])) + 1
+        for members in np.split(order, bounds):
+            if 1 < len(members) <= MAX_BUCKET_SIZE:
+                members = members.tolist()
+                pairs.update(
+                    (first, second)
+                    for k, first in enumerate(members)
+                    for second in members[k + 1 :]
+                )
+    return np.array(sorted(pairs), dtype=np.int64).reshape(-1, 2)
+
+
+def clusters(count: int, pairs: "np.ndarray") -> list[int]:
+    """Root of every hadith's cluster: its member earliest in corpus order."""
+    parent = list(range(count))
+
+    def find(i: int) -> int:
+        while parent[i] != i:
+            parent[i] = parent[parent[i]]
+            i = parent[i]
+        return i
+
+    for i, j in pairs.tolist():
+        root_i, root_j = find(i), find(j)
+        if root_i != root_j:
+            parent[max(root_i, root_j)] = min(root_i, root_j)
+    return [find(i) for i in range(count)]
+
+
+def similar_documents(
+    keys: list[dict],
+    signatures: "np.ndarray",
+    bands: int,
+    threshold: float,
+) -> list[dict]:
+    """``hadith_similar`` documents for hadiths with at least one match.
+
+    ``keys`` holds the ``id``, ``book_id`` and ``page_number`` of each
+    signature's hadith, in corpus order.
+    """
+    pairs = candidate_pairs(signatures, bands)
+    similarity = (signatures[pairs[:, 0]] == signatures[pairs[:, 1]]).mean(axis=1)
+    keep = similarity >= threshold
+    pairs, similarity = pairs[keep], similarity[keep]
+
+    similar: dict[int, list[tuple[float, int]]] = {}
+    for (i, j), score in zip(pairs.tolist(), similarity.tolist()):
+        similar.setdefault(i, []).append((score, j))
+        similar.setdefault(j, []).append((score, i))
+    roots = clusters(len(keys), pairs)
+    sizes: dict[int, int] = {}
+    for i in similar:
+        sizes[roots[i]] = sizes.get(roots[i], 0) + 1
+
+    docs = []
+    for i in sorted(similar):
+        neighbors = sorted(similar[i], key=lambda item: (-item[0], item[1]))
+        docs.append(
+            {
+                "_id": keys[i]["id"],
+                "cluster_id": keys[roots[i]]["id"],
+                "cluster_size": sizes[roots[i]],
+                "similar": [
+                    {**keys[j], "similarity": round(score, 3)}
+                    for score, j in neighbors[:MAX_SIMILAR]
+                ],
+            }
+        )
+    return docs
+
+
+async def main(
+    threshold: float,
+    permutations: int,
+    bands: int,
+    min_length: int,
+    batch_size: int,
+) -> None:
+    if permutations % bands:
+        raise SystemExit("--permutations must be a multiple of --bands.")
+    await database.connect(ensure_indexes=False)
+    try:
+        hadiths = database.db[HadithService.COLLECTION]
+        hasher = MinHasher(permutations)
+        keys: list[dict] = []
+        blocks = []
+        batch = []
+        cursor = (
+            hadiths.find({}, {"book_id": 1, "page_number": 1, "matn_plain": 1})
+            .sort(HADITH_SORT)
+            .allow_disk_use(True)
+        )
+        async for doc in cursor:
+            text = normalize(doc.get("matn_plain") or "")
+            if len(text) < max(min_length, SHINGLE_SIZE):
+                continue
+            keys.append(
+                {
+                    "id": doc["_id"],
+                    "book_id": doc["book_id"],
+                    "page_number": doc["page_number"],
+                }
+            )
+            batch.append(shingles(text))
+            if len(batch) >= batch_size:
+                blocks.append(hasher.signatures(batch))
+                batch = []
+        if batch:
+            blocks.append(hasher.signatures(batch))
+        logger.info("Signed %d hadiths.", len(keys))
+
+        signatures = (
+            np.vstack(blocks)
+            if blocks
+            else np.empty((0, permutations), dtype=np.uint32)
+        )
+        docs = similar_documents(keys, signatures, bands, threshold)
+        logger.info("Found similar narrations for %d hadiths.", len(docs))
+
+        target = database.db[HadithService.SIMILAR_COLLECTION]
+        scratch = database.db[f"{HadithService.SIMILAR_COLLECTION}_build"]
+        await scratch.drop()
+        for start in range(0, len(docs), WRITE_BATCH_SIZE):
+            await scratch.insert_many(
+                docs[start : start + WRITE_BATCH_SIZE], ordered=False
+            )
+
+        if docs:
+            await scratch.rename(target.name, dropTarget=True)
+        else:
+            await target.delete_many({})
+        logger.info(
+            "Stored %d hadiths in %d clusters.",
+            len(docs),
+            len({doc["cluster_id"] for doc in docs}),
+        )
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.7,
+        help="Minimum estimated Jaccard similarity of two matns' shingles.",
+    )
+    parser.add_argument("--permutations", type=int, default=128)
+    parser.add_argument(
+        "--bands",
+        type=int,
+        default=16,
+        help="LSH bands; pairs near (1 / bands) ** (bands / permutations) "
+        "similarity become candidates.",
+    )
+    parser.add_argument(
+        "--min-length",
+        type=int,
+        default=30,
+        help="Skip matns shorter than this many normalized characters.",
+    )
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(
+        main(
+            args.threshold,
+            args.permutations,
+            args.bands,
+            args.min_length,
+            args.batch_size,
+        )
+    )
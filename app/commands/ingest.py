@@ -0,0 +1,320 @@
+"""Bulk-load hadiths or narrators from a JSONL or JSON array dump.
+
+Usage: python -m app.commands.ingest {hadiths,narrators} PATH
+           [--batch-size N] [--workers N] [--mode upsert|insert]
+           [--checkpoint PATH] [--restart]
+
+Records are read in a stream, validated against HadithDocument or
+NarratorDocument, and given their normalized search fields in a process
+pool. They are then written with unordered bulk writes. Progress is
+checkpointed after every batch, so an interrupted load picks up where it
+stopped when run again. Indexes are only ensured once the load finishes.
+Records without an ``_id`` get one derived from their natural key, so
+reloading a dump replaces documents instead of duplicating them.
+"""
+
+import argparse
+import asyncio
+import hashlib
+import json
+import logging
+import os
+from collections import deque
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from bson import ObjectId, json_util
+from pydantic import BaseModel, ValidationError
+from pymongo import ReplaceOne
+from pymongo.errors import BulkWriteError
+
+from app.core.database import database
+from app.core.normalization import hadith_search_fields, narrator_search_fields
+from app.models.hadith import HadithDocument
+from app.models.narrator import NarratorDocument
+
+logger = logging.getLogger(__name__)
+
+MODELS: dict[str, type[BaseModel]] = {
+    "hadiths": HadithDocument,
+    "narrators": NarratorDocument,
+}
+DERIVED = {
+    "hadiths": hadith_search_fields,
+    "narrators": narrator_search_fields,
+}
+DUPLICATE_KEY = 11000
+READ_SIZE = 1 << 20
+
+
+def natural_id(collection: str, record: dict) -> ObjectId:
+    """Deterministic ``_id`` for a record that does not carry one."""
+    if collection == "narrators":
+        key = f"narrator:{record.get('narrator_id')}"
+    else:
+        key = "hadith:{}:{}:{}".format(
+            record.get("book_id"), record.get("page_number"), record.get("full_text")
+        )
+    return ObjectId(hashlib.sha1(key.encode()).digest()[:12])
+
+
+def prepare_batch(
+    collection: str, records: list[bytes | dict]
+) -> tuple[list[dict], list[str]]:
+    """Decode, validate and derive search fields; runs in a worker process.
+
+    Returns the documents ready to write and one message per rejected record.
+    """
+    model = MODELS[collection]
+    derive = DERIVED[collection]
+    documents = []
+    errors = []
+    for raw in records:
+        try:
+            record = json_util.loads(raw) if isinstance(raw, bytes) else raw
+            if not isinstance(record, dict):
+                raise ValueError(f"Expected a JSON object, got {type(record).__name__}")
+            record.setdefault("_id", natural_id(collection, record))
+            document = model.model_validate(record).model_dump(by_alias=True)
+        except (ValueError, ValidationError) as e:
+            errors.append(str(e).splitlines()[0])
+            continue
+        document.update(derive(document))
+        documents.append(document)
+    return documents, errors
+
+
+def iter_jsonl(path: Path, offset: int) -> Iterator[tuple[bytes, int]]:
+    """Yield ``(line, end_offset)`` for each non-blank line after ``offset``."""
+    with path.open("rb") as f:
+        f.seek(offset)
+        for line in f:
+            offset += len(line)
+            if line.strip():
+                yield line, offset
+
+
+def iter_json_array(path: Path) -> Iterator[dict]:
+    """Yield the elements of a top-level JSON array without loading it whole."""
+    decoder = json.JSONDecoder(object_hook=json_util.object_hook)
+    with path.open(encoding="utf-8") as f:
+        buffer = f.read(READ_SIZE).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"{path} is not a JSON array.")
+        position = 1
+        eof = False
+        while True:
+            while position < len(buffer) and buffer[position] in " \t\r\n,":
+                position += 1
+            if position < len(buffer) and buffer[position] == "]":
+                return
+            try:
+                element, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+                more = f.read(READ_SIZE)
+                eof = not more
+                buffer = buffer[position:] + more
+                position = 0
+                continue
+            yield element
+            position = end
+
+
+def batches(
+    path: Path, batch_size: int, records: int, offset: int
+) -> Iterator[tuple[list, int, int]]:
+    """Yield ``(records, records_done, end_offset)`` after the checkpoint.
+
+    JSONL resumes by seeking to the saved byte offset; a JSON array has to
+    be re-read up to the saved record count.
+    """
+    batch: list = []
+    if path.suffix in (".jsonl", ".ndjson"):
+        end = offset
+        for line, end in iter_jsonl(path, offset):
+            batch.append(line)
+            if len(batch) >= batch_size:
+                records += len(batch)
+                yield batch, records, end
+                batch = []
+        if batch:
+            yield batch, records + len(batch), end
+        return
+
+    done = records
+    for i, element in enumerate(iter_json_array(path)):
+        if i < records:
+            continue
+        batch.append(element)
+        done = i + 1
+        if len(batch) >= batch_size:
+            yield batch, done, 0
+            batch = []
+    if batch:
+        yield batch, done, 0
+
+
+class Checkpoint:
+    """Progress of one load, saved atomically as JSON next to the source."""
+
+    def __init__(self, path: Path, source: Path, collection: str) -> None:
+        self.path = path
+        self.identity = {
+            "source": str(source.resolve()),
+            "size": source.stat().st_size,
+            "collection": collection,
+        }
+        self.records = 0
+        self.offset = 0
+
+    def load(self) -> None:
+        if not self.path.exists():
+            return
+        state = json.loads(self.path.read_text())
+        if {key: state.get(key) for key in self.identity} != self.identity:
+            raise SystemExit(
+                f"{self.path} belongs to a different load; use --restart to ignore it."
+            )
+        self.records = state["records"]
+        self.offset = state["offset"]
+
+    def save(self, records: int, offset: int) -> None:
+        self.records = records
+        self.offset = offset
+        tmp = self.path.with_suffix(".tmp")
+        state = {**self.identity, "records": records, "offset": offset}
+        tmp.write_text(json.dumps(state))
+        os.replace(tmp, self.path)
+
+
+async def write_batch(collection, documents: list[dict], mode: str) -> int:
+    """Write one batch unordered; returns how many documents were skipped."""
+    if not documents:
+        return 0
+    if mode == "upsert":
+        await collection.bulk_write(
+            [ReplaceOne({"_id": d["_id"]}, d, upsert=True) for d in documents],
+            ordered=False,
+        )
+        return 0
+    try:
+        await collection.insert_many(documents, ordered=False)
+    except BulkWriteError as e:
+        errors = e.details.get("writeErrors", [])
+        if any(error.get("code") != DUPLICATE_KEY for error in errors):
+            raise
+        return len(errors)
+    return 0
+
+
+async def ingest(
+    collection_name: str,
+    path: Path,
+    batch_size: int,
+    workers: int,
+    mode: str,
+    checkpoint: Checkpoint,
+) -> None:
+    collection = database.db[collection_name]
+    loop = asyncio.get_running_loop()
+    written = rejected = skipped = 0
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        # Keep a bounded window of batches being prepared while the oldest is
+        # written, and write strictly in order so the checkpoint only ever
+        # covers batches that are fully stored.
+        pending: deque = deque()
+        source = batches(path, batch_size, checkpoint.records, checkpoint.offset)
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < workers * 2:
+                batch = next(source, None)
+                if batch is None:
+                    exhausted = True
+                    break
+                records, done, offset = batch
+                future = loop.run_in_executor(
+                    pool, prepare_batch, collection_name, records
+                )
+                pending.append((future, done, offset))
+            if not pending:
+                break
+
+            future, done, offset = pending.popleft()
+            documents, errors = await future
+            for error in errors[:3]:
+                logger.warning("Rejected a record before #%d: %s", done + 1, error)
+            skipped += await write_batch(collection, documents, mode)
+            written += len(documents)
+            rejected += len(errors)
+            checkpoint.save(done, offset)
+            logger.info(
+                "%s: %d records read, %d written, %d rejected",
+                collection_name,
+                done,
+                written,
+                rejected,
+            )
+
+    logger.info(
+        "Finished %s: %d written, %d rejected, %d already present.",
+        collection_name,
+        written - skipped,
+        rejected,
+        skipped,
+    )
+
+
+async def main(args: argparse.Namespace) -> None:
+    checkpoint = Checkpoint(
+        args.checkpoint or args.path.with_name(args.path.name + ".checkpoint"),
+        args.path,
+        args.collection,
+    )
+    if not args.restart:
+        checkpoint.load()
+        if checkpoint.records:
+            logger.info("Resuming after %d records.", checkpoint.records)
+
+    # Building indexes once over the loaded data is much cheaper than
+    # maintaining them for every inserted document.
+    await database.connect(ensure_indexes=False)
+    try:
+        await ingest(
+            args.collection,
+            args.path,
+            args.batch_size,
+            args.workers,
+            args.mode,
+            checkpoint,
+        )
+        logger.info("Building indexes.")
+        await database.ensure_indexes()
+    finally:
+        await database.disconnect()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("collection", choices=sorted(MODELS))
+    parser.add_argument("path", type=Path, help=".jsonl/.ndjson or a .json array")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--mode",
+        choices=("upsert", "insert"),
+        default="upsert",
+        help="insert is faster on an empty collection and skips existing _ids",
+    )
+    parser.add_argument("--checkpoint", type=Path, help="default: PATH.checkpoint")
+    parser.add_argument(
+        "--restart", action="store_true", help="ignore any saved checkpoint"
+    )
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(args))
@@ -1,4 +1,5 @@
 from functools import lru_cache
+from typing import Literal
 
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -13,17 +14,74 @@ class Settings(BaseSettings):
     # App
     APP_NAME: str = "Islamic App API"
     DEBUG: bool = False
+    # Re-validate read responses against their schemas before sending.
+    VALIDATE_RESPONSES: bool = False
     API_V1_PREFIX: str = "/api/v1"
+    # Prometheus metrics at /metrics (request, MongoDB command and pool timings)
+    METRICS_ENABLED: bool = True
 
     # MongoDB
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "islamic_app"
+    MONGODB_MAX_POOL_SIZE: int = 50
+    MONGODB_MIN_POOL_SIZE: int = 0
+    # How long a request may wait for a pooled connection before failing
+    MONGODB_WAIT_QUEUE_TIMEOUT_MS: int = 1_000
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 5_000
+    # Where hadith and narrator reads go; accounts always read the primary
+    MONGODB_CORPUS_READ_PREFERENCE: Literal[
+        "primary", "primaryPreferred", "secondary", "secondaryPreferred", "nearest"
+    ] = "primary"
+    # Drop the indexes index_catalog retires at startup. Off: dropping is
+    # irreversible, so by default they are only logged
+    DROP_RETIRED_INDEXES: bool = False
+
+    # Query time budgets (maxTimeMS); a query over budget returns 504
+    SEARCH_QUERY_TIMEOUT_MS: int = 2_000
+    COUNT_QUERY_TIMEOUT_MS: int = 1_000
+    LOOKUP_QUERY_TIMEOUT_MS: int = 500
+    # A whole export, across all its batches
+    EXPORT_QUERY_TIMEOUT_MS: int = 60_000
+    # Searches running at once per worker, and how many more may wait;
+    # beyond that they are shed with 503 before the pool saturates
+    SEARCH_MAX_CONCURRENCY: int = 32
+    SEARCH_MAX_QUEUE: int = 64
+
+    # Corpus storage: "mongodb", or "snapshot" to serve hadiths and narrators
+    # from a read-only memory-mapped file built by app.commands.build_snapshot
+    STORAGE_BACKEND: Literal["mongodb", "snapshot"] = "mongodb"
+    SNAPSHOT_PATH: str = "data/corpus.snapshot"
+
+    # Search
+    SEARCH_INDEX_ENABLED: bool = True
+    COUNT_CACHE_SIZE: int = 10_000
+    COUNT_CACHE_TTL_SECONDS: float = 300.0
+    # Facet counts (per book, top narrators) cached per normalized query
+    FACET_CACHE_SIZE: int = 1_000
+    FACET_NARRATOR_LIMIT: int = 20
+    EXPORT_BATCH_SIZE: int = 1_000
+    EXPORT_CHUNK_BYTES: int = 64 * 1024
+
+    # Detail responses (the corpus is effectively immutable)
+    DETAIL_CACHE_SIZE: int = 5_000
+    DETAIL_CACHE_TTL_SECONDS: float = 3600.0
+    DETAIL_CACHE_MAX_AGE_SECONDS: int = 86400
+    NARRATOR_CACHE_SIZE: int = 50_000
 
     # JWT
     SECRET_KEY: str
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Authenticated users and decoded tokens, cached per worker
+    USER_CACHE_SIZE: int = 10_000
+    USER_CACHE_TTL_SECONDS: float = 60.0
+    TOKEN_CACHE_SIZE: int = 10_000
+
+    # Password hashing (bcrypt runs in a thread pool off the event loop)
+    PASSWORD_HASH_WORKERS: int = 2
+    PASSWORD_HASH_MAX_QUEUE: int = 64
+
 
 @lru_cache()
 def get_settings() -> Settings:
@@ -0,0 +1,49 @@
+import json
+
+from motor.motor_asyncio import AsyncIOMotorCollection
+
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+
+
+def query_key(query: dict) -> str:
+    """Canonical string for a MongoDB filter, usable as a cache key."""
+    return json.dumps(query, sort_keys=True, separators=(",", ":"), default=str)
+
+
+class TotalCounter:
+    """Count strategy for paginated searches.
+
+    Unfiltered totals come from collection metadata; filtered totals are
+    counted once and then served from an LRU+TTL cache keyed by the
+    normalized query, so paging through results does not rescan them.
+    """
+
+    def __init__(self, cache: TTLCache, max_time_ms: int) -> None:
+        self.cache = cache
+        self.max_time_ms = max_time_ms
+
+    async def count(self, collection: AsyncIOMotorCollection, query: dict) -> int:
+        if not query:
+            return await collection.estimated_document_count(
+                maxTimeMS=self.max_time_ms
+            )
+
+        key = (collection.name, query_key(query))
+        total = self.cache.get(key)
+        if total is None:
+            total = await collection.count_documents(
+                query, maxTimeMS=self.max_time_ms
+            )
+            self.cache.set(key, total)
+        return total
+
+
+settings = get_settings()
+total_counter = TotalCounter(
+    TTLCache(
+        maxsize=settings.COUNT_CACHE_SIZE,
+        ttl=settings.COUNT_CACHE_TTL_SECONDS,
+    ),
+    max_time_ms=settings.COUNT_QUERY_TIMEOUT_MS,
+)
@@ -1,39 +1,60 @@
-import logging
-
 from motor.motor_asyncio import AsyncIOMotorClient, AsyncIOMotorDatabase
+from pymongo import ReadPreference
 
 from app.core.config import get_settings
+from app.core.index_catalog import reconcile_indexes
+from app.core.metrics import mongo_listeners
 
-logger = logging.getLogger(__name__)
+READ_PREFERENCES = {
+    "primary": ReadPreference.PRIMARY,
+    "primaryPreferred": ReadPreference.PRIMARY_PREFERRED,
+    "secondary": ReadPreference.SECONDARY,
+    "secondaryPreferred": ReadPreference.SECONDARY_PREFERRED,
+    "nearest": ReadPreference.NEAREST,
+}
 
 
 class Database:
     client: AsyncIOMotorClient | None = None
     db: AsyncIOMotorDatabase | None = None
+    # Same database, reading with MONGODB_CORPUS_READ_PREFERENCE.
+    corpus_db: AsyncIOMotorDatabase | None = None
 
-    async def connect(self) -> None:
+    async def connect(self, ensure_indexes: bool = True) -> None:
         settings = get_settings()
-        self.client = AsyncIOMotorClient(settings.MONGODB_URL)
+        listeners = mongo_listeners() if settings.METRICS_ENABLED else []
+        self.client = AsyncIOMotorClient(
+            settings.MONGODB_URL,
+            maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+            minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+            waitQueueTimeoutMS=settings.MONGODB_WAIT_QUEUE_TIMEOUT_MS,
+            serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS,
+            event_listeners=listeners,
+        )
         self.db = self.client[settings.DATABASE_NAME]
-        await self._ensure_indexes()
+        self.corpus_db = self.client.get_database(
+            settings.DATABASE_NAME,
+            read_preference=READ_PREFERENCES[settings.MONGODB_CORPUS_READ_PREFERENCE],
+        )
+        if ensure_indexes:
+            await self.ensure_indexes()
 
     async def disconnect(self) -> None:
         if self.client:
             self.client.close()
 
-    async def _ensure_indexes(self) -> None:
+    async def ensure_indexes(self, collections: list[str] | None = None) -> None:
+        """Bring the indexes in line with ``INDEX_CATALOG``.
+
+        Only ``collections`` are reconciled when given, e.g. just ``users``
+        when the corpus is served from a snapshot.
+        """
         if self.db is not None:
-            try:
-                await self.db.users.create_index("email", unique=True)
-                await self.db.hadiths.create_index("full_text_plain")
-                await self.db.hadiths.create_index("book_id")
-                await self.db.hadiths.create_index("narrators.id")
-                await self.db.narrators.create_index("narrator_id")
-                await self.db.narrators.create_index("name_plain")
-            except Exception as e:
-                logger.warning(
-                    "Could not create indexes (check DB user permissions): %s", e
-                )
+            await reconcile_indexes(
+                self.db,
+                collections,
+                drop_retired=get_settings().DROP_RETIRED_INDEXES,
+            )
 
 
 database = Database()
@@ -0,0 +1,44 @@
+import hashlib
+from dataclasses import dataclass
+
+from fastapi import Request, Response, status
+
+from app.core.config import get_settings
+
+
+@dataclass(frozen=True, slots=True)
+class CachedBody:
+    """A serialized JSON response body with its strong ETag."""
+
+    body: bytes
+    etag: str
+
+    @classmethod
+    def from_bytes(cls, body: bytes) -> "CachedBody":
+        return cls(body=body, etag=f'"{hashlib.sha256(body).hexdigest()[:32]}"')
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison function (RFC 9110 13.1.2).
+    candidates = (tag.strip().removeprefix("W/") for tag in if_none_match.split(","))
+    return etag in candidates
+
+
+def cached_json_response(request: Request, cached: CachedBody) -> Response:
+    """Send ``cached``, or 304 Not Modified when the client already has it."""
+    settings = get_settings()
+    headers = {
+        "ETag": cached.etag,
+        "Cache-Control": f"public, max-age={settings.DETAIL_CACHE_MAX_AGE_SECONDS}",
+    }
+    if etag_matches(request.headers.get("if-none-match"), cached.etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return Response(
+        content=cached.body,
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,124 @@
+import logging
+from dataclasses import dataclass
+
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo import IndexModel
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True, slots=True)
+class IndexSpec:
+    """An index the services rely on, and the query shape it serves."""
+
+    collection: str
+    keys: tuple[tuple[str, int], ...]
+    serves: str
+    unique: bool = False
+
+    @property
+    def name(self) -> str:
+        """MongoDB's default name, so an identical index made by hand matches."""
+        return "_".join(f"{field}_{direction}" for field, direction in self.keys)
+
+    def model(self) -> IndexModel:
+        return IndexModel(list(self.keys), name=self.name, unique=self.unique)
+
+    def find(self, existing: dict) -> str | None:
+        """Name of the index with this key pattern in ``index_information()``."""
+        for name, info in existing.items():
+            keys = tuple((field, int(direction)) for field, direction in info["key"])
+            if keys == self.keys:
+                return name
+        return None
+
+
+# Equality fields come first, then the fields results are sorted on, so one
+# index both filters and returns documents already in HADITH_SORT or
+# NARRATOR_SORT order without an in-memory sort.
+INDEX_CATALOG = (
+    IndexSpec("users", (("email", 1),), "account lookup by email", unique=True),
+    IndexSpec(
+        "hadiths",
+        (("book_id", 1), ("page_number", 1), ("_id", 1)),
+        "book filter and keyset pages in HADITH_SORT",
+    ),
+    IndexSpec(
+        "hadiths",
+        (("narrators.id", 1), ("book_id", 1), ("page_number", 1), ("_id", 1)),
+        "narrator filter, alone or with book_id, in HADITH_SORT",
+    ),
+    IndexSpec("hadiths", (("text_tokens", 1),), "token search before the index"),
+    IndexSpec(
+        "narrators",
+        (("narrator_id", 1), ("_id", 1)),
+        "narrator_id lookups and keyset pages in NARRATOR_SORT",
+    ),
+    IndexSpec("narrators", (("name_tokens", 1),), "name token and prefix search"),
+    IndexSpec("narrators", (("kunya_tokens", 1),), "kunya token search"),
+    IndexSpec("narrators", (("nasab_tokens", 1),), "nasab token search"),
+)
+
+# Indexes earlier versions created that the catalog makes redundant (a
+# compound index above starts with the same field) or that no query uses.
+# Dropping one cannot be undone, so it only happens on request (the
+# DROP_RETIRED_INDEXES setting or explain_queries --drop-retired), once the
+# catalog's indexes exist.
+RETIRED_INDEXES = {
+    "hadiths": ("book_id_1", "narrators.id_1", "full_text_plain_1"),
+    "narrators": ("narrator_id_1", "name_plain_1"),
+}
+
+
+async def reconcile_indexes(
+    db: AsyncIOMotorDatabase,
+    collections: list[str] | None = None,
+    drop_retired: bool = False,
+) -> list[str]:
+    """Create missing catalog indexes, and report or drop retired ones.
+
+    Existing indexes are matched on their key pattern, so nothing is rebuilt
+    when the catalog is already in place. Missing indexes of a collection
+    are built together, in one pass over it. Retired indexes still present
+    are only logged unless ``drop_retired`` is set. Failures are logged per
+    collection rather than raised: the API works without the indexes, only
+    slower. ``collections`` limits the pass to those collections.
+
+    Returns the retired indexes left in place, as ``collection.name``.
+    """
+    retired = []
+    if collections is None:
+        collections = list(dict.fromkeys(spec.collection for spec in INDEX_CATALOG))
+    for collection in collections:
+        specs = [spec for spec in INDEX_CATALOG if spec.collection == collection]
+        try:
+            existing = await db[collection].index_information()
+            missing = [spec for spec in specs if spec.find(existing) is None]
+            if missing:
+                logger.info(
+                    "Building indexes on %s: %s.",
+                    collection,
+                    ", ".join(spec.name for spec in missing),
+                )
+                await db[collection].create_indexes([spec.model() for spec in missing])
+            for name in RETIRED_INDEXES.get(collection, ()):
+                if name not in existing:
+                    continue
+                if drop_retired:
+                    logger.info("Dropping retired index %s.%s.", collection, name)
+                    await db[collection].drop_index(name)
+                else:
+                    retired.append(f"{collection}.{name}")
+                    logger.info(
+                        "Retired index %s.%s is still present; drop it with "
+                        "python -m app.commands.explain_queries --drop-retired.",
+                        collection,
+                        name,
+                    )
+        except Exception as e:
+            logger.warning(
+                "Could not reconcile indexes on %s (check DB user permissions): %s",
+                collection,
+                e,
+            )
+    return retired
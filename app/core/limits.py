@@ -0,0 +1,51 @@
+import asyncio
+
+from app.core.config import get_settings
+
+
+class OverloadedError(Exception):
+    """Raised when a concurrency limiter's queue is full."""
+
+
+class ConcurrencyLimiter:
+    """Caps how many calls run at once and sheds the excess.
+
+    At most ``limit`` calls hold a slot; up to ``max_queue`` more wait for
+    one. Beyond that ``OverloadedError`` is raised at once, so a burst of
+    expensive searches is turned away while the connection pool still has
+    room for cheap lookups, instead of every request queueing behind it.
+    """
+
+    def __init__(self, limit: int, max_queue: int, message: str) -> None:
+        self.limit = limit
+        self.capacity = limit + max_queue
+        self.message = message
+        self._semaphore = asyncio.Semaphore(limit)
+        self._pending = 0
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def __aenter__(self) -> None:
+        # Single-threaded on the event loop, so no lock is needed.
+        if self._pending >= self.capacity:
+            raise OverloadedError(self.message)
+        self._pending += 1
+        try:
+            await self._semaphore.acquire()
+        except BaseException:
+            self._pending -= 1
+            raise
+
+    async def __aexit__(self, *exc_info) -> None:
+        self._semaphore.release()
+        self._pending -= 1
+
+
+settings = get_settings()
+search_limiter = ConcurrencyLimiter(
+    limit=settings.SEARCH_MAX_CONCURRENCY,
+    max_queue=settings.SEARCH_MAX_QUEUE,
+    message="Too many searches in progress. Try again shortly.",
+)
@@ -0,0 +1,217 @@
+import os
+import time
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from pymongo import monitoring
+from starlette.requests import Request
+from starlette.responses import Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+UNMATCHED_ROUTE = "<unmatched>"
+
+# Gauges are summed over live workers when running under
+# PROMETHEUS_MULTIPROC_DIR; the mode is ignored otherwise.
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds",
+    "Time from receiving a request to sending the last body chunk.",
+    ["method", "route", "status"],
+)
+REQUESTS_IN_FLIGHT = Gauge(
+    "http_requests_in_flight",
+    "Requests currently being handled.",
+    ["method"],
+    multiprocess_mode="livesum",
+)
+
+MONGO_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+MONGO_COMMAND_DURATION = Histogram(
+    "mongodb_command_duration_seconds",
+    "MongoDB command round trips, as measured by the driver.",
+    ["collection", "command"],
+    buckets=MONGO_BUCKETS,
+)
+MONGO_COMMAND_FAILURES = Counter(
+    "mongodb_command_failures_total",
+    "MongoDB commands that returned an error.",
+    ["collection", "command"],
+)
+
+POOL_CONNECTIONS = Gauge(
+    "mongodb_pool_connections",
+    "Open connections in the driver's pool.",
+    ["address"],
+    multiprocess_mode="livesum",
+)
+POOL_CONNECTIONS_IN_USE = Gauge(
+    "mongodb_pool_connections_in_use",
+    "Connections checked out of the pool.",
+    ["address"],
+    multiprocess_mode="livesum",
+)
+POOL_CHECKOUT_DURATION = Histogram(
+    "mongodb_pool_checkout_duration_seconds",
+    "Time spent waiting for a pooled connection.",
+    ["address"],
+    buckets=MONGO_BUCKETS,
+)
+POOL_CHECKOUT_FAILURES = Counter(
+    "mongodb_pool_checkout_failures_total",
+    "Connection checkouts that failed, e.g. on timeout.",
+    ["address", "reason"],
+)
+
+
+def _address(address: tuple[str, int]) -> str:
+    return f"{address[0]}:{address[1]}"
+
+
+def route_template(scope: Scope) -> str:
+    """The path template of the route that handled a request.
+
+    Labelling by template rather than raw path keeps one series per
+    endpoint no matter how many ids are requested. The router records the
+    matched route in the scope, so this is only known once it has run.
+
+    A route included through a prefixed router may carry only its own path,
+    e.g. ``/hadiths/{hadith_id}`` for ``/api/v1/hadiths/{hadith_id}``; the
+    prefix is then taken from the request path in front of the part the
+    route matched.
+    """
+    route = scope.get("route")
+    template = getattr(route, "path", None)
+    if template is None:
+        return UNMATCHED_ROUTE
+    path = scope.get("path", "")
+    path_regex = getattr(route, "path_regex", None)
+    if path_regex is None or path_regex.match(path):
+        return template
+    for start in range(1, len(path)):
+        if path[start] == "/" and path_regex.match(path[start:]):
+            return path[:start] + template
+    return template
+
+
+class MetricsMiddleware:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        status = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        in_flight = REQUESTS_IN_FLIGHT.labels(method)
+        in_flight.inc()
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            in_flight.dec()
+            REQUEST_DURATION.labels(method, route_template(scope), str(status)).observe(
+                time.perf_counter() - start
+            )
+
+
+class CommandMetricsListener(monitoring.CommandListener):
+    """Times every command by collection and command name.
+
+    Called from the driver's threads; only the started event carries the
+    command, so its collection is remembered until the command finishes.
+    """
+
+    def __init__(self) -> None:
+        self._collections: dict[tuple, str] = {}
+
+    def started(self, event: monitoring.CommandStartedEvent) -> None:
+        name = event.command_name
+        target = event.command.get("collection" if name == "getMore" else name)
+        self._collections[(event.connection_id, event.request_id)] = (
+            target if isinstance(target, str) else ""
+        )
+
+    def succeeded(self, event: monitoring.CommandSucceededEvent) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(
+            event.duration_micros / 1_000_000
+        )
+
+    def failed(self, event: monitoring.CommandFailedEvent) -> None:
+        collection = self._collections.pop((event.connection_id, event.request_id), "")
+        MONGO_COMMAND_DURATION.labels(collection, event.command_name).observe(
+            event.duration_micros / 1_000_000
+        )
+        MONGO_COMMAND_FAILURES.labels(collection, event.command_name).inc()
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    def pool_created(self, event: monitoring.PoolCreatedEvent) -> None:
+        pass
+
+    def pool_ready(self, event: monitoring.PoolReadyEvent) -> None:
+        pass
+
+    def pool_cleared(self, event: monitoring.PoolClearedEvent) -> None:
+        pass
+
+    def pool_closed(self, event: monitoring.PoolClosedEvent) -> None:
+        pass
+
+    def connection_created(self, event: monitoring.ConnectionCreatedEvent) -> None:
+        POOL_CONNECTIONS.labels(_address(event.address)).inc()
+
+    def connection_ready(self, event: monitoring.ConnectionReadyEvent) -> None:
+        pass
+
+    def connection_closed(self, event: monitoring.ConnectionClosedEvent) -> None:
+        POOL_CONNECTIONS.labels(_address(event.address)).dec()
+
+    def connection_check_out_started(
+        self, event: monitoring.ConnectionCheckOutStartedEvent
+    ) -> None:
+        pass
+
+    def connection_check_out_failed(
+        self, event: monitoring.ConnectionCheckOutFailedEvent
+    ) -> None:
+        POOL_CHECKOUT_FAILURES.labels(_address(event.address), event.reason).inc()
+
+    def connection_checked_out(
+        self, event: monitoring.ConnectionCheckedOutEvent
+    ) -> None:
+        address = _address(event.address)
+        POOL_CONNECTIONS_IN_USE.labels(address).inc()
+        POOL_CHECKOUT_DURATION.labels(address).observe(event.duration)
+
+    def connection_checked_in(self, event: monitoring.ConnectionCheckedInEvent) -> None:
+        POOL_CONNECTIONS_IN_USE.labels(_address(event.address)).dec()
+
+
+def mongo_listeners() -> list:
+    return [CommandMetricsListener(), PoolMetricsListener()]
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    if "PROMETHEUS_MULTIPROC_DIR" in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return Response(generate_latest(registry), media_type=CONTENT_TYPE_LATEST)
@@ -0,0 +1,94 @@
+import re
+
+# Harakat, Quranic annotation marks and tatweel. They are combining marks, so
+# leaving them in would split words apart during tokenization.
+_DIACRITICS = re.compile("[\u0610-\u061a\u064b-\u065f\u0670\u06d6-\u06ed\u0640]")
+_LETTERS = str.maketrans(
+    {
+        "آ": "ا",  # alef with madda
+        "أ": "ا",  # alef with hamza above
+        "إ": "ا",  # alef with hamza below
+        "ٱ": "ا",  # alef wasla
+        "ة": "ه",  # ta marbuta -> ha
+        "ى": "ي",  # alef maqsura -> ya
+    }
+)
+_TOKEN = re.compile(r"\w+")
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_arabic(text: str) -> str:
+    """Strip diacritics and fold letter variants that users type interchangeably."""
+    text = _DIACRITICS.sub("", text).translate(_LETTERS).lower()
+    return _WHITESPACE.sub(" ", text).strip()
+
+
+def tokenize(text: str) -> list[str]:
+    return _TOKEN.findall(normalize_arabic(text))
+
+
+def unique_tokens(text: str) -> list[str]:
+    return sorted(set(tokenize(text)))
+
+
+def hadith_search_fields(doc: dict) -> dict:
+    """Derived fields stored alongside a hadith document."""
+    full_text_plain = doc.get("full_text_plain", "")
+    tokens = tokenize(full_text_plain)
+    return {
+        # Tokens in order, single-spaced, so a phrase is a plain substring.
+        "full_text_norm": " ".join(tokens),
+        "text_tokens": sorted(set(tokens)),
+    }
+
+
+def narrator_search_fields(doc: dict) -> dict:
+    """Derived fields stored alongside a narrator document."""
+    fields = {}
+    for source, prefix in (
+        ("name_plain", "name"),
+        ("kunya", "kunya"),
+        ("nasab", "nasab"),
+    ):
+        value = doc.get(source, "")
+        fields[f"{prefix}_norm"] = normalize_arabic(value)
+        fields[f"{prefix}_tokens"] = unique_tokens(value)
+    return fields
+
+
+def folding_pattern(token: str) -> str:
+    """Regex matching ``token`` in text that is not normalized.
+
+    Each letter also matches the variants ``normalize_arabic`` folds into
+    it, and diacritics may appear between letters. Use it case-insensitively.
+    """
+    variants: dict[str, str] = {}
+    for source, target in _LETTERS.items():
+        variants[target] = variants.get(target, target) + chr(source)
+    letters = [f"[{variants[c]}]" if c in variants else re.escape(c) for c in token]
+    return f"{_DIACRITICS.pattern}*".join(letters)
+
+
+def phrase_pattern(phrase: list[str]) -> str:
+    """Regex matching the tokens of ``phrase`` in sequence in ``full_text_norm``."""
+    return f"(?:^| ){re.escape(' '.join(phrase))}(?: |$)"
+
+
+def tokens_query(field: str, text: str, prefix_last: bool = False) -> dict | None:
+    """Build a filter requiring every token of ``text`` in the ``field`` array.
+
+    With ``prefix_last`` the final token only has to prefix a stored token,
+    which suits search-as-you-type. The anchored regex still uses the index.
+    Returns ``None`` when ``text`` has no tokens.
+    """
+    tokens = tokenize(text)
+    if not tokens:
+        return None
+    if not prefix_last:
+        return {field: {"$all": tokens}}
+
+    *exact, last = tokens
+    conditions: list[dict] = [{field: {"$regex": f"^{re.escape(last)}"}}]
+    if exact:
+        conditions.insert(0, {field: {"$all": exact}})
+    return conditions[0] if len(conditions) == 1 else {"$and": conditions}
@@ -0,0 +1,39 @@
+import base64
+import binascii
+import json
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(values: list) -> str:
+    """Encode the sort key of the last returned item as an opaque token."""
+    raw = json.dumps(values, separators=(",", ":"), default=str).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, length: int) -> list:
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        values = json.loads(raw)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidCursorError("Invalid cursor.")
+    if not isinstance(values, list) or len(values) != length:
+        raise InvalidCursorError("Invalid cursor.")
+    return values
+
+
+def keyset_query(sort: list[tuple[str, int]], values: list) -> dict:
+    """Filter for documents strictly after ``values`` in ``sort`` order.
+
+    For a sort on (a, b, c) this is
+    ``a > va OR (a == va AND b > vb) OR (a == va AND b == vb AND c > vc)``,
+    which MongoDB answers with bounded scans of the matching compound index.
+    """
+    branches = []
+    for i, (field, direction) in enumerate(sort):
+        branch = {sort[j][0]: values[j] for j in range(i)}
+        branch[field] = {"$gt" if direction == 1 else "$lt": values[i]}
+        branches.append(branch)
+    return {"$or": branches}
@@ -1,3 +1,6 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta, timezone
 
 import jwt
@@ -5,11 +8,81 @@ from jwt.exceptions import InvalidTokenError  # noqa: F401 (re-exported for depe
 from pwdlib import PasswordHash
 from pwdlib.hashers.bcrypt import BcryptHasher
 
+from app.core.cache import TTLCache
 from app.core.config import get_settings
 
 password_hash = PasswordHash((BcryptHasher(),))
 
-DUMMY_HASH = password_hash.hash("__dummy__")
+
+class PasswordHashingBusyError(Exception):
+    """Raised when the password hashing queue is full."""
+
+
+class PasswordHashingPool:
+    """Runs bcrypt in worker threads so it never blocks the event loop.
+
+    bcrypt releases the GIL, so ``workers`` hashes run in parallel while the
+    loop keeps serving requests. At most ``max_queue`` more calls may wait
+    for a worker; beyond that ``PasswordHashingBusyError`` is raised instead
+    of letting a login burst pile up unbounded work.
+    """
+
+    def __init__(self, workers: int, max_queue: int) -> None:
+        self.workers = workers
+        self.limit = workers + max_queue
+        self._executor: ThreadPoolExecutor | None = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    async def run(self, fn, *args):
+        with self._lock:
+            if self._pending >= self.limit:
+                raise PasswordHashingBusyError(
+                    "Too many login attempts in progress. Try again shortly."
+                )
+            self._pending += 1
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(
+                max_workers=self.workers, thread_name_prefix="password-hash"
+            )
+        try:
+            future = self._executor.submit(fn, *args)
+        except BaseException:
+            self._release()
+            raise
+        # Released when the hash finishes, even if the caller was cancelled,
+        # so the limit always reflects work actually held by the threads.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+_settings = get_settings()
+hashing_pool = PasswordHashingPool(
+    workers=_settings.PASSWORD_HASH_WORKERS,
+    max_queue=_settings.PASSWORD_HASH_MAX_QUEUE,
+)
+
+_dummy_hash: str | None = None
+
+# Decoded payloads by raw token. Each entry expires with its token, so an
+# expired token is never served from here.
+_token_cache = TTLCache(
+    maxsize=_settings.TOKEN_CACHE_SIZE,
+    ttl=_settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+)
 
 
 def create_access_token(
@@ -28,13 +101,31 @@ def create_access_token(
 
 
 def decode_access_token(token: str) -> dict:
+    payload = _token_cache.get(token)
+    if payload is not None:
+        return payload
     settings = get_settings()
-    return jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    if "exp" in payload:
+        ttl = payload["exp"] - datetime.now(timezone.utc).timestamp()
+        if ttl > 0:
+            _token_cache.set(token, payload, ttl=min(ttl, _token_cache.ttl))
+    return payload
+
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    return await hashing_pool.run(
+        password_hash.verify, plain_password, hashed_password
+    )
 
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return password_hash.verify(plain_password, hashed_password)
+async def get_password_hash(password: str) -> str:
+    return await hashing_pool.run(password_hash.hash, password)
 
 
-def get_password_hash(password: str) -> str:
-    return password_hash.hash(password)
+async def verify_dummy_password(plain_password: str) -> None:
+    """Spend the same time as a real check, for emails that do not exist."""
+    global _dummy_hash
+    if _dummy_hash is None:
+        _dummy_hash = await get_password_hash("__dummy__")
+    await verify_password(plain_password, _dummy_hash)
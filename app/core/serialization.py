@@ -0,0 +1,102 @@
+from fastapi import Response
+from pydantic import BaseModel
+from pydantic_core import to_json
+
+from app.core.config import get_settings
+
+
+def hadith_payload(doc: dict) -> dict:
+    """Map a hadith document to the ``HadithResponse`` shape as a plain dict."""
+    return {
+        "id": str(doc["_id"]),
+        "book_id": doc["book_id"],
+        "page_number": doc["page_number"],
+        "full_text": doc["full_text"],
+        "full_text_plain": doc["full_text_plain"],
+        "matn": doc["matn"],
+        "matn_plain": doc["matn_plain"],
+        "narrators": [
+            {"id": n["id"], "name": n["name"], "name_plain": n["name_plain"]}
+            for n in doc.get("narrators", [])
+        ],
+    }
+
+
+def hadith_fields_payload(doc: dict, fields: list[str]) -> dict:
+    """Like ``hadith_payload`` but for a projected document with only ``fields``."""
+    payload = {}
+    for field in fields:
+        if field == "id":
+            payload["id"] = str(doc["_id"])
+        elif field == "narrators":
+            payload["narrators"] = [
+                {"id": n["id"], "name": n["name"], "name_plain": n["name_plain"]}
+                for n in doc.get("narrators", [])
+            ]
+        else:
+            payload[field] = doc.get(field)
+    return payload
+
+
+def hadith_summary_payload(doc: dict) -> dict:
+    """Map a summary projection to the ``HadithSummaryResponse`` shape."""
+    return {
+        "id": str(doc["_id"]),
+        "book_id": doc["book_id"],
+        "page_number": doc["page_number"],
+        "narrators": [
+            {"id": n["id"], "name": n["name"]} for n in doc.get("narrators", [])
+        ],
+        "snippet": doc.get("snippet") or "",
+    }
+
+
+def narrator_payload(doc: dict) -> dict:
+    """Map a narrator document to the ``NarratorResponse`` shape as a plain dict."""
+    return {
+        "id": str(doc["_id"]),
+        "narrator_id": doc["narrator_id"],
+        "name": doc["name"],
+        "name_plain": doc["name_plain"],
+        "kunya": doc.get("kunya", ""),
+        "nasab": doc.get("nasab", ""),
+        "death_date": doc.get("death_date", ""),
+        "tabaqa": doc.get("tabaqa", ""),
+        "rank_ibn_hajar": doc.get("rank_ibn_hajar", ""),
+        "rank_dhahabi": doc.get("rank_dhahabi", ""),
+        "relations": doc.get("relations", ""),
+        "jarh_wa_tadil": [
+            {"scholar": j["scholar"], "quotes": j.get("quotes", [])}
+            for j in doc.get("jarh_wa_tadil", [])
+        ],
+    }
+
+
+def dump_json(payload: dict | list, model: type[BaseModel] | None = None) -> bytes:
+    """Encode a response payload straight to JSON bytes.
+
+    Payloads are built from trusted documents in the shape of ``model``, so
+    validating them again is skipped unless ``VALIDATE_RESPONSES`` is set.
+    Validation does not add fields the payload leaves out.
+    """
+    if model is not None and get_settings().VALIDATE_RESPONSES:
+        validated = model.model_validate(payload)
+        return validated.model_dump_json(exclude_unset=True).encode()
+    return to_json(payload)
+
+
+def json_response(
+    payload: dict | list,
+    model: type[BaseModel] | None = None,
+    headers: dict[str, str] | None = None,
+) -> Response:
+    """Return ``payload`` as JSON, bypassing FastAPI's response_model pass.
+
+    Routes keep declaring ``response_model`` so the OpenAPI schema is
+    unchanged; returning a ``Response`` makes FastAPI send it as is.
+    """
+    return Response(
+        content=dump_json(payload, model),
+        media_type="application/json",
+        headers=headers,
+    )
@@ -0,0 +1,52 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Hashable
+from typing import Any
+
+
+class _Flight:
+    __slots__ = ("task", "waiters")
+
+    def __init__(self, task: asyncio.Task) -> None:
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent identical calls into one execution.
+
+    The first caller for a key starts the call as a task; callers arriving
+    while it runs await that same task and receive its result or exception.
+    Cancelling a caller only abandons its own wait; the shared call is
+    cancelled once no caller is waiting for it. Nothing is kept after the
+    call finishes, so this is not a cache: results are shared, and must not
+    be mutated, only between callers that overlapped.
+
+    Safe to share between coroutines on one event loop.
+    """
+
+    def __init__(self) -> None:
+        self._flights: dict[Hashable, _Flight] = {}
+
+    def __len__(self) -> int:
+        return len(self._flights)
+
+    async def do(self, key: Hashable, call: Callable[[], Awaitable[Any]]) -> Any:
+        flight = self._flights.get(key)
+        if flight is None:
+            flight = _Flight(asyncio.ensure_future(call()))
+            self._flights[key] = flight
+            flight.task.add_done_callback(lambda _: self._land(key, flight))
+        flight.waiters += 1
+        try:
+            return await asyncio.shield(flight.task)
+        finally:
+            flight.waiters -= 1
+            if not flight.waiters and not flight.task.done():
+                # Forget it first, so a new caller starts afresh rather than
+                # joining a call that is being cancelled.
+                self._land(key, flight)
+                flight.task.cancel()
+
+    def _land(self, key: Hashable, flight: _Flight) -> None:
+        if self._flights.get(key) is flight:
+            del self._flights[key]
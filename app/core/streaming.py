@@ -0,0 +1,51 @@
+import zlib
+from collections.abc import AsyncIterable, AsyncIterator
+
+from fastapi import Request
+
+
+def accepts_gzip(request: Request) -> bool:
+    for coding in request.headers.get("accept-encoding", "").split(","):
+        name, _, params = coding.strip().partition(";")
+        if name.strip().lower() in ("gzip", "x-gzip"):
+            return params.replace(" ", "").lower() not in ("q=0", "q=0.0", "q=0.00")
+    return False
+
+
+async def started(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Run ``chunks`` up to its first chunk before the response starts.
+
+    An error raised before any output, such as a shed request or a failed
+    query, then becomes an error response instead of a truncated stream.
+    """
+    try:
+        first = await anext(chunks)
+    except StopAsyncIteration:
+        first = None
+
+    async def rest() -> AsyncIterator[bytes]:
+        try:
+            if first is not None:
+                yield first
+            async for chunk in chunks:
+                yield chunk
+        finally:
+            await chunks.aclose()
+
+    return rest()
+
+
+async def gzip_stream(
+    chunks: AsyncIterable[bytes], level: int = 6
+) -> AsyncIterator[bytes]:
+    """Gzip a byte stream incrementally, flushing after every chunk.
+
+    Flushing keeps the client receiving data as it is produced instead of
+    waiting for the compressor's internal buffer to fill.
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS | 16)
+    async for chunk in chunks:
+        data = compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+        if data:
+            yield data
+    yield compressor.flush()
@@ -0,0 +1,125 @@
+from array import array
+from bisect import bisect_left, bisect_right
+
+
+class ChainIndex:
+    """Narrator -> (hadith ordinal, chain position) postings.
+
+    Each narrator's postings are kept sorted by ordinal and then position, so
+    chain queries are answered by merging sorted lists rather than by
+    inspecting every hadith a narrator appears in. The chains themselves are
+    kept too, concatenated, for per-hadith lookups.
+    """
+
+    def __init__(self) -> None:
+        self._doc_ids: dict[int, array] = {}
+        self._positions: dict[int, array] = {}
+        self._last_ordinal = -1
+        self._chain_offsets = array("I", [0])
+        self._chain_ids = array("I")
+
+    def add_chain(self, ordinal: int, narrator_ids: list[int]) -> None:
+        if ordinal <= self._last_ordinal:
+            raise ValueError("Chains must be added in ordinal order.")
+        self._last_ordinal = ordinal
+        while len(self._chain_offsets) <= ordinal:
+            self._chain_offsets.append(len(self._chain_ids))
+        self._chain_ids.extend(narrator_ids)
+        self._chain_offsets.append(len(self._chain_ids))
+
+        for position, narrator_id in enumerate(narrator_ids):
+            doc_ids = self._doc_ids.get(narrator_id)
+            if doc_ids is None:
+                doc_ids = self._doc_ids[narrator_id] = array("I")
+                self._positions[narrator_id] = array("H")
+            doc_ids.append(ordinal)
+            self._positions[narrator_id].append(position)
+
+    def chain(self, ordinal: int) -> array:
+        """The narrator ids of one hadith's chain, in chain order."""
+        if ordinal + 1 >= len(self._chain_offsets):
+            return array("I")
+        return self._chain_ids[
+            self._chain_offsets[ordinal] : self._chain_offsets[ordinal + 1]
+        ]
+
+    def frequency(self, narrator_id: int) -> int:
+        """Number of chain positions the narrator occupies across the corpus."""
+        doc_ids = self._doc_ids.get(narrator_id)
+        return 0 if doc_ids is None else len(doc_ids)
+
+    def match(
+        self,
+        narrator_ids: list[int],
+        ordered: bool = False,
+        contiguous: bool = False,
+    ) -> list[int]:
+        """Return the sorted ordinals of chains containing ``narrator_ids``.
+
+        ``ordered`` requires the narrators to appear in the given order;
+        ``contiguous`` additionally requires them to be adjacent, i.e. the
+        query is an exact segment of the chain.
+        """
+        if not narrator_ids:
+            return []
+        unique_ids = list(dict.fromkeys(narrator_ids))
+        if any(narrator_id not in self._doc_ids for narrator_id in unique_ids):
+            return []
+
+        by_length = sorted(unique_ids, key=lambda n: len(self._doc_ids[n]))
+        driver, others = by_length[0], by_length[1:]
+        driver_docs = self._doc_ids[driver]
+        cursors = dict.fromkeys(others, 0)
+
+        results: list[int] = []
+        previous = -1
+        for ordinal in driver_docs:
+            if ordinal == previous:
+                continue
+            previous = ordinal
+
+            spans: dict[int, tuple[int, int]] = {}
+            for narrator_id in others:
+                doc_ids = self._doc_ids[narrator_id]
+                start = bisect_left(doc_ids, ordinal, cursors[narrator_id])
+                cursors[narrator_id] = start
+                if start == len(doc_ids) or doc_ids[start] != ordinal:
+                    break
+                spans[narrator_id] = (start, bisect_right(doc_ids, ordinal, start))
+            else:
+                if not (ordered or contiguous):
+                    results.append(ordinal)
+                    continue
+                start = bisect_left(driver_docs, ordinal)
+                spans[driver] = (start, bisect_right(driver_docs, ordinal, start))
+                positions = {
+                    narrator_id: self._positions[narrator_id][start:end]
+                    for narrator_id, (start, end) in spans.items()
+                }
+                if contiguous:
+                    if self._is_segment(narrator_ids, positions):
+                        results.append(ordinal)
+                elif self._is_ordered(narrator_ids, positions):
+                    results.append(ordinal)
+
+        return results
+
+    @staticmethod
+    def _is_ordered(narrator_ids: list[int], positions: dict[int, array]) -> bool:
+        # Greedily take the earliest occurrence after the previous narrator.
+        current = -1
+        for narrator_id in narrator_ids:
+            candidates = positions[narrator_id]
+            i = bisect_right(candidates, current)
+            if i == len(candidates):
+                return False
+            current = candidates[i]
+        return True
+
+    @staticmethod
+    def _is_segment(narrator_ids: list[int], positions: dict[int, array]) -> bool:
+        rest = [set(positions[narrator_id]) for narrator_id in narrator_ids[1:]]
+        return any(
+            all(start + offset in found for offset, found in enumerate(rest, 1))
+            for start in positions[narrator_ids[0]]
+        )
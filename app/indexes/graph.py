@@ -0,0 +1,197 @@
+from array import array
+from collections import deque
+
+# Paths longer than this are not searched for; real chains are far shorter.
+MAX_PATH_LENGTH = 12
+
+
+class TransmissionGraph:
+    """Teacher -> student graph implied by consecutive chain members.
+
+    In a chain each narrator heard the hadith from the next one, so every
+    adjacent pair is an edge from ``narrators[i + 1]`` to ``narrators[i]``
+    weighted by how many chains contain it. Edges are stored in CSR form:
+    node ``i``'s students are ``targets[offsets[i]:offsets[i + 1]]``,
+    strongest first, with a mirrored layout for teachers.
+    """
+
+    def __init__(self) -> None:
+        self.narrator_ids = array("I")
+        self.names: list[str] = []
+        self._index: dict[int, int] = {}
+        self._student_offsets = array("I", [0])
+        self._students = array("I")
+        self._student_weights = array("I")
+        self._teacher_offsets = array("I", [0])
+        self._teachers = array("I")
+        self._teacher_weights = array("I")
+        self._transmissions = array("I")
+        self._by_transmissions = array("I")
+        # Pair counts while building, keyed by teacher << 32 | student.
+        self._counts: dict[int, int] = {}
+
+    def __len__(self) -> int:
+        return len(self.narrator_ids)
+
+    def add_chain(self, narrator_ids: list[int]) -> None:
+        counts = self._counts
+        for student, teacher in zip(narrator_ids, narrator_ids[1:]):
+            if student != teacher:
+                key = teacher << 32 | student
+                counts[key] = counts.get(key, 0) + 1
+
+    def finalize(self, names: dict[int, str]) -> None:
+        """Lay the counted edges out as arrays; ``names`` adds isolated nodes."""
+        edges = [(key >> 32, key & 0xFFFFFFFF, n) for key, n in self._counts.items()]
+        self._counts = {}
+        ids = set(names)
+        for teacher, student, _ in edges:
+            ids.add(teacher)
+            ids.add(student)
+        self.narrator_ids = array("I", sorted(ids))
+        self._index = {nid: i for i, nid in enumerate(self.narrator_ids)}
+        self.names = [names.get(nid, "") for nid in self.narrator_ids]
+
+        index = self._index
+        edges = [(index[t], index[s], n) for t, s, n in edges]
+        self._student_offsets, self._students, self._student_weights = self._csr(
+            edges
+        )
+        self._teacher_offsets, self._teachers, self._teacher_weights = self._csr(
+            [(s, t, n) for t, s, n in edges]
+        )
+
+        transmissions = array("I", bytes(4 * len(self.narrator_ids)))
+        for teacher, _, n in edges:
+            transmissions[teacher] += n
+        self._transmissions = transmissions
+        offsets = self._student_offsets
+        self._by_transmissions = array(
+            "I",
+            sorted(
+                (i for i in range(len(transmissions)) if transmissions[i]),
+                key=lambda i: (-transmissions[i], offsets[i] - offsets[i + 1], i),
+            ),
+        )
+
+    def _csr(self, edges: list[tuple[int, int, int]]) -> tuple[array, array, array]:
+        edges.sort(key=lambda edge: (edge[0], -edge[2], edge[1]))
+        offsets = array("I", bytes(4 * (len(self.narrator_ids) + 1)))
+        for source, _, _ in edges:
+            offsets[source + 1] += 1
+        for i in range(1, len(offsets)):
+            offsets[i] += offsets[i - 1]
+        targets = array("I", (target for _, target, _ in edges))
+        weights = array("I", (n for _, _, n in edges))
+        return offsets, targets, weights
+
+    def __contains__(self, narrator_id: int) -> bool:
+        return narrator_id in self._index
+
+    def name(self, narrator_id: int) -> str:
+        return self.names[self._index[narrator_id]]
+
+    def students(self, narrator_id: int, limit: int) -> list[tuple[int, int]]:
+        """``(narrator_id, weight)`` of those who heard from the narrator."""
+        return self._neighbors(
+            narrator_id,
+            self._student_offsets,
+            self._students,
+            self._student_weights,
+            limit,
+        )
+
+    def teachers(self, narrator_id: int, limit: int) -> list[tuple[int, int]]:
+        """``(narrator_id, weight)`` of those the narrator heard from."""
+        return self._neighbors(
+            narrator_id,
+            self._teacher_offsets,
+            self._teachers,
+            self._teacher_weights,
+            limit,
+        )
+
+    def degree(self, narrator_id: int) -> tuple[int, int]:
+        """Number of distinct teachers and students."""
+        i = self._index[narrator_id]
+        return (
+            self._teacher_offsets[i + 1] - self._teacher_offsets[i],
+            self._student_offsets[i + 1] - self._student_offsets[i],
+        )
+
+    def _neighbors(
+        self,
+        narrator_id: int,
+        offsets: array,
+        targets: array,
+        weights: array,
+        limit: int,
+    ) -> list[tuple[int, int]]:
+        i = self._index[narrator_id]
+        start = offsets[i]
+        end = min(offsets[i + 1], start + limit)
+        return [
+            (self.narrator_ids[targets[e]], weights[e]) for e in range(start, end)
+        ]
+
+    def top_transmitters(self, limit: int) -> list[tuple[int, int, int]]:
+        """``(narrator_id, students, transmissions)``, most transmissions first.
+
+        ``transmissions`` counts chain links from the narrator to a student.
+        """
+        offsets = self._student_offsets
+        return [
+            (
+                self.narrator_ids[i],
+                offsets[i + 1] - offsets[i],
+                self._transmissions[i],
+            )
+            for i in self._by_transmissions[:limit]
+        ]
+
+    def path(
+        self, source: int, target: int, directed: bool = True
+    ) -> list[tuple[int, int]] | None:
+        """Shortest chain of transmission from ``source`` down to ``target``.
+
+        Returns ``(narrator_id, weight)`` pairs from source to target, where
+        ``weight`` is that of the link to the previous narrator (0 for the
+        source), or ``None`` if there is no path of at most
+        ``MAX_PATH_LENGTH`` links. Undirected paths may also follow links
+        from student to teacher. Neighbors are expanded strongest first, so
+        among equally short paths well-attested links are preferred.
+        """
+        start, goal = self._index[source], self._index[target]
+        if start == goal:
+            return [(source, 0)]
+
+        adjacency = [(self._student_offsets, self._students, self._student_weights)]
+        if not directed:
+            adjacency.append(
+                (self._teacher_offsets, self._teachers, self._teacher_weights)
+            )
+        parents = {start: (-1, 0)}
+        frontier = deque([(start, 0)])
+        while frontier:
+            node, depth = frontier.popleft()
+            if depth == MAX_PATH_LENGTH:
+                break
+            for offsets, targets, weights in adjacency:
+                for e in range(offsets[node], offsets[node + 1]):
+                    following = targets[e]
+                    if following in parents:
+                        continue
+                    parents[following] = (node, weights[e])
+                    if following == goal:
+                        return self._walk_back(parents, goal)
+                    frontier.append((following, depth + 1))
+        return None
+
+    def _walk_back(self, parents: dict, node: int) -> list[tuple[int, int]]:
+        steps = []
+        while node != -1:
+            parent, weight = parents[node]
+            steps.append((self.narrator_ids[node], weight))
+            node = parent
+        steps.reverse()
+        return steps
@@ -0,0 +1,148 @@
+import asyncio
+import logging
+from array import array
+from bisect import bisect_right
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+
+from app.indexes.chain import ChainIndex
+from app.indexes.graph import TransmissionGraph
+from app.indexes.suggest import PrefixIndex
+from app.indexes.text import InvertedIndex
+from app.indexes.trigram import TrigramIndex
+
+logger = logging.getLogger(__name__)
+
+# The corpus is loaded in a stable order so that ordinals, and therefore
+# every posting list, follow (book_id, page_number, _id).
+HADITH_SORT = [("book_id", 1), ("page_number", 1), ("_id", 1)]
+
+
+class SearchIndexes:
+    """In-memory search structures built from the corpus at startup.
+
+    Building runs in the background; until ``ready`` is set, services fall
+    back to querying MongoDB directly.
+    """
+
+    def __init__(self) -> None:
+        self.ready = False
+        self.hadith_ids: list[ObjectId] = []
+        self.book_ids = array("I")
+        self.page_numbers = array("I")
+        self.text = InvertedIndex()
+        self.chains = ChainIndex()
+        self.narrator_names = PrefixIndex()
+        self.narrator_trigrams = TrigramIndex()
+        self.graph = TransmissionGraph()
+        self._task: asyncio.Task | None = None
+
+    async def start(self, db: AsyncIOMotorDatabase) -> None:
+        self._task = asyncio.create_task(self._build(db))
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _build(self, db: AsyncIOMotorDatabase) -> None:
+        try:
+            await self.build(db)
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Building search indexes failed; using MongoDB queries.")
+
+    async def build(self, db: AsyncIOMotorDatabase) -> None:
+        hadith_ids: list[ObjectId] = []
+        book_ids = array("I")
+        page_numbers = array("I")
+        text = InvertedIndex()
+        chains = ChainIndex()
+        graph = TransmissionGraph()
+
+        projection = {
+            "book_id": 1,
+            "page_number": 1,
+            "full_text_plain": 1,
+            "narrators.id": 1,
+        }
+        cursor = db.hadiths.find({}, projection).sort(HADITH_SORT).allow_disk_use(True)
+        async for doc in cursor:
+            ordinal = len(hadith_ids)
+            hadith_ids.append(doc["_id"])
+            book_ids.append(doc["book_id"])
+            page_numbers.append(doc["page_number"])
+            text.add_document(ordinal, doc.get("full_text_plain", ""))
+            chain = [n["id"] for n in doc.get("narrators", [])]
+            chains.add_chain(ordinal, chain)
+            graph.add_chain(chain)
+            if ordinal % 1000 == 999:
+                # Tokenizing is CPU-bound; give request handlers a turn.
+                await asyncio.sleep(0)
+        text.finalize()
+
+        narrator_names = PrefixIndex()
+        narrator_trigrams = TrigramIndex()
+        names: dict[int, str] = {}
+        projection = {
+            "narrator_id": 1,
+            "name": 1,
+            "name_plain": 1,
+            "kunya": 1,
+            "nasab": 1,
+        }
+        async for doc in db.narrators.find({}, projection):
+            weight = chains.frequency(doc["narrator_id"])
+            narrator_names.add(
+                doc["narrator_id"],
+                doc["name"],
+                doc.get("name_plain", ""),
+                doc.get("kunya", ""),
+                doc.get("nasab", ""),
+                weight=weight,
+            )
+            narrator_trigrams.add(
+                doc["narrator_id"], doc.get("name_plain", ""), weight=weight
+            )
+            names[doc["narrator_id"]] = doc["name"]
+        narrator_names.finalize()
+        graph.finalize(names)
+
+        self.hadith_ids = hadith_ids
+        self.book_ids = book_ids
+        self.page_numbers = page_numbers
+        self.text = text
+        self.chains = chains
+        self.narrator_names = narrator_names
+        self.narrator_trigrams = narrator_trigrams
+        self.graph = graph
+        self.ready = True
+        logger.info(
+            "Search indexes ready: %d hadiths, %d narrators.",
+            len(hadith_ids),
+            len(narrator_names),
+        )
+
+    def sort_key(self, ordinal: int) -> tuple[int, int, ObjectId]:
+        return (
+            self.book_ids[ordinal],
+            self.page_numbers[ordinal],
+            self.hadith_ids[ordinal],
+        )
+
+    def ordinal_after(self, key: tuple[int, int, ObjectId]) -> int:
+        """Return the first ordinal whose sort key is greater than ``key``."""
+        return bisect_right(range(len(self.hadith_ids)), key, key=self.sort_key)
+
+
+search_indexes = SearchIndexes()
+
+
+def get_search_indexes() -> SearchIndexes:
+    return search_indexes
@@ -0,0 +1,105 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+
+from app.core.normalization import normalize_arabic, tokenize
+
+# Single-token queries up to this many characters are answered from
+# precomputed top-k lists, since their prefix ranges are the widest.
+SHORT_PREFIX = 3
+MAX_SUGGESTIONS = 50
+
+
+class PrefixIndex:
+    """Narrator name autocomplete over sorted arrays of normalized keys.
+
+    Keys are the tokens of ``name_plain``, ``kunya`` and ``nasab`` plus the
+    whole normalized name, so both "هرير" and "ابو هرير" find Abu Hurayra.
+    A prefix is a contiguous range of the sorted key array.
+    """
+
+    def __init__(self) -> None:
+        self.narrator_ids = array("I")
+        self.names: list[str] = []
+        self._weights = array("I")
+        self._keys: list[str] = []
+        self._slots = array("I")
+        self._short: dict[str, list[int]] = {}
+
+    def __len__(self) -> int:
+        return len(self.narrator_ids)
+
+    def add(
+        self,
+        narrator_id: int,
+        name: str,
+        name_plain: str,
+        kunya: str = "",
+        nasab: str = "",
+        weight: int = 0,
+    ) -> None:
+        slot = len(self.narrator_ids)
+        self.narrator_ids.append(narrator_id)
+        self.names.append(name)
+        self._weights.append(weight)
+
+        keys = set(tokenize(name_plain)) | set(tokenize(kunya)) | set(tokenize(nasab))
+        if full := normalize_arabic(name_plain):
+            keys.add(full)
+        for key in keys:
+            self._keys.append(key)
+            self._slots.append(slot)
+
+    def finalize(self) -> None:
+        order = sorted(range(len(self._keys)), key=self._keys.__getitem__)
+        self._keys = [self._keys[i] for i in order]
+        self._slots = array("I", (self._slots[i] for i in order))
+
+        candidates: dict[str, set[int]] = {}
+        for key, slot in zip(self._keys, self._slots):
+            for length in range(1, min(SHORT_PREFIX, len(key)) + 1):
+                candidates.setdefault(key[:length], set()).add(slot)
+        self._short = {
+            prefix: self._top(slots, MAX_SUGGESTIONS)
+            for prefix, slots in candidates.items()
+        }
+
+    def suggest(self, query: str, limit: int = 10) -> list[tuple[int, str]]:
+        """Return up to ``limit`` ``(narrator_id, name)`` pairs, most cited first.
+
+        Every token but the last must match a key exactly; the last token,
+        or the whole query, is matched as a prefix.
+        """
+        normalized = normalize_arabic(query)
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        if len(tokens) == 1 and len(tokens[0]) <= SHORT_PREFIX:
+            slots = self._short.get(tokens[0], [])[:limit]
+        else:
+            matches = self._prefix(tokens[-1])
+            for token in tokens[:-1]:
+                matches &= self._exact(token)
+            if len(tokens) > 1:
+                matches |= self._prefix(normalized)
+            slots = self._top(matches, limit)
+
+        return [(self.narrator_ids[slot], self.names[slot]) for slot in slots]
+
+    def _prefix(self, prefix: str) -> set[int]:
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix + "\U0010ffff", start)
+        return set(self._slots[start:end])
+
+    def _exact(self, key: str) -> set[int]:
+        start = bisect_left(self._keys, key)
+        end = bisect_right(self._keys, key, start)
+        return set(self._slots[start:end])
+
+    def _top(self, slots: set[int], limit: int) -> list[int]:
+        return heapq.nsmallest(
+            limit,
+            slots,
+            key=lambda slot: (-self._weights[slot], len(self.names[slot]), slot),
+        )
@@ -0,0 +1,168 @@
+import math
+import re
+from array import array
+from bisect import bisect_left
+
+from app.core.normalization import tokenize
+
+_PHRASE = re.compile(r'"([^"]*)"')
+
+
+def parse_query(query: str) -> tuple[list[str], list[list[str]]]:
+    """Split a query into required terms and quoted phrases.
+
+    Every token is a required term; tokens inside double quotes must also
+    appear next to each other, in order.
+    """
+    phrases = [
+        tokens for tokens in map(tokenize, _PHRASE.findall(query)) if len(tokens) > 1
+    ]
+    terms = tokenize(query.replace('"', " "))
+    return terms, phrases
+
+
+class PostingList:
+    """Sorted document ordinals for one term, with the term's positions.
+
+    Positions of ``doc_ids[i]`` are ``positions[offsets[i]:offsets[i + 1]]``.
+    """
+
+    __slots__ = ("doc_ids", "offsets", "positions")
+
+    def __init__(self) -> None:
+        self.doc_ids = array("I")
+        self.offsets = array("I", [0])
+        self.positions = array("I")
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    def term_frequency(self, i: int) -> int:
+        return self.offsets[i + 1] - self.offsets[i]
+
+    def positions_at(self, i: int) -> array:
+        return self.positions[self.offsets[i] : self.offsets[i + 1]]
+
+
+class InvertedIndex:
+    """Token -> posting list index with AND/phrase matching and BM25 ranking.
+
+    Documents are identified by dense ordinals and must be added in
+    increasing ordinal order, which keeps every posting list sorted without a
+    separate sort pass.
+    """
+
+    K1 = 1.2
+    B = 0.75
+
+    def __init__(self) -> None:
+        self._postings: dict[str, PostingList] = {}
+        self._doc_lengths = array("I")
+        self._avg_doc_length = 0.0
+
+    def __len__(self) -> int:
+        return len(self._doc_lengths)
+
+    def add_document(self, ordinal: int, text: str) -> None:
+        if ordinal != len(self._doc_lengths):
+            raise ValueError("Documents must be added in ordinal order.")
+
+        tokens = tokenize(text)
+        positions: dict[str, list[int]] = {}
+        for position, token in enumerate(tokens):
+            positions.setdefault(token, []).append(position)
+
+        for token, token_positions in positions.items():
+            posting = self._postings.get(token)
+            if posting is None:
+                posting = self._postings[token] = PostingList()
+            posting.doc_ids.append(ordinal)
+            posting.positions.extend(token_positions)
+            posting.offsets.append(len(posting.positions))
+
+        self._doc_lengths.append(len(tokens))
+
+    def finalize(self) -> None:
+        if self._doc_lengths:
+            self._avg_doc_length = sum(self._doc_lengths) / len(self._doc_lengths)
+
+    def search(self, query: str) -> list[tuple[int, float]]:
+        """Return ``(ordinal, score)`` pairs matching every term, best first."""
+        terms, phrases = parse_query(query)
+        unique_terms = list(dict.fromkeys(terms))
+        if not unique_terms:
+            return []
+
+        postings = [self._postings.get(term) for term in unique_terms]
+        if any(posting is None for posting in postings):
+            return []
+
+        # Drive the intersection from the rarest term so the number of
+        # probes into the longer lists is bounded by its length.
+        order = sorted(range(len(postings)), key=lambda i: len(postings[i]))
+        driver = postings[order[0]]
+        others = order[1:]
+        cursors = [0] * len(postings)
+
+        matches: list[tuple[int, list[int]]] = []
+        for driver_index, ordinal in enumerate(driver.doc_ids):
+            indices = [0] * len(postings)
+            indices[order[0]] = driver_index
+            for i in others:
+                doc_ids = postings[i].doc_ids
+                j = bisect_left(doc_ids, ordinal, cursors[i])
+                cursors[i] = j
+                if j == len(doc_ids) or doc_ids[j] != ordinal:
+                    break
+                indices[i] = j
+            else:
+                matches.append((ordinal, indices))
+
+        if phrases:
+            term_slots = {term: i for i, term in enumerate(unique_terms)}
+            matches = [
+                (ordinal, indices)
+                for ordinal, indices in matches
+                if all(
+                    self._contains_phrase(phrase, postings, indices, term_slots)
+                    for phrase in phrases
+                )
+            ]
+
+        total_docs = len(self._doc_lengths)
+        idf = [
+            math.log(1 + (total_docs - len(posting) + 0.5) / (len(posting) + 0.5))
+            for posting in postings
+        ]
+        avg_length = self._avg_doc_length or 1.0
+
+        results = []
+        for ordinal, indices in matches:
+            length_norm = self.K1 * (
+                1 - self.B + self.B * self._doc_lengths[ordinal] / avg_length
+            )
+            score = 0.0
+            for i, posting in enumerate(postings):
+                tf = posting.term_frequency(indices[i])
+                score += idf[i] * tf * (self.K1 + 1) / (tf + length_norm)
+            results.append((ordinal, score))
+
+        results.sort(key=lambda item: (-item[1], item[0]))
+        return results
+
+    @staticmethod
+    def _contains_phrase(
+        phrase: list[str],
+        postings: list[PostingList],
+        indices: list[int],
+        term_slots: dict[str, int],
+    ) -> bool:
+        slots = [term_slots[term] for term in phrase]
+        first = postings[slots[0]].positions_at(indices[slots[0]])
+        rest = [
+            set(postings[slot].positions_at(indices[slot])) for slot in slots[1:]
+        ]
+        return any(
+            all(start + offset in positions for offset, positions in enumerate(rest, 1))
+            for start in first
+        )
@@ -0,0 +1,129 @@
+import math
+from array import array
+
+from app.core.normalization import normalize_arabic
+
+SIMILARITY_THRESHOLD = 0.3
+MAX_CANDIDATES = 5_000
+
+
+def word_trigrams(word: str) -> set[str]:
+    """Character trigrams of one word, padded like PostgreSQL's pg_trgm."""
+    padded = f"  {word} "
+    return {padded[i : i + 3] for i in range(len(padded) - 2)}
+
+
+def trigrams(text: str) -> set[str]:
+    """Character trigrams of each word of ``text``."""
+    grams = set()
+    for word in normalize_arabic(text).split():
+        grams.update(word_trigrams(word))
+    return grams
+
+
+class TrigramIndex:
+    """Character-trigram index for typo-tolerant narrator name matching.
+
+    Like pg_trgm's ``word_similarity``, a query is compared with the part of
+    a name that matches it best rather than with the whole name, so one word
+    or a partial name still finds the narrator. A name's similarity is the
+    best ``shared / (|query| + |window| - shared)`` over the trigram sets of
+    its windows of as many consecutive words as the query has.
+
+    A window scoring at least ``t`` shares ``ceil(t * |query|)`` trigrams
+    with the query, so its name contains one of the rarest
+    ``|query| - ceil(t * |query|) + 1`` query trigrams. Only those posting
+    lists are scanned to collect candidates, which are then scored exactly.
+    """
+
+    def __init__(self) -> None:
+        self.narrator_ids = array("I")
+        self._grams: list[frozenset[int]] = []
+        self._words: list[tuple[frozenset[int], ...]] = []
+        self._weights = array("I")
+        self._vocabulary: dict[str, int] = {}
+        self._postings: list[array] = []
+
+    def __len__(self) -> int:
+        return len(self.narrator_ids)
+
+    def add(self, narrator_id: int, name_plain: str, weight: int = 0) -> None:
+        slot = len(self.narrator_ids)
+        words = []
+        for word in normalize_arabic(name_plain).split():
+            gram_ids = set()
+            for gram in word_trigrams(word):
+                gram_id = self._vocabulary.get(gram)
+                if gram_id is None:
+                    gram_id = self._vocabulary[gram] = len(self._postings)
+                    self._postings.append(array("I"))
+                gram_ids.add(gram_id)
+            words.append(frozenset(gram_ids))
+        grams = frozenset().union(*words)
+        for gram_id in grams:
+            self._postings[gram_id].append(slot)
+        self.narrator_ids.append(narrator_id)
+        self._grams.append(grams)
+        self._words.append(tuple(words))
+        self._weights.append(weight)
+
+    def search(
+        self,
+        query: str,
+        threshold: float = SIMILARITY_THRESHOLD,
+        max_candidates: int = MAX_CANDIDATES,
+    ) -> list[tuple[int, float]]:
+        """Return ``(narrator_id, similarity)`` pairs at or above ``threshold``.
+
+        Best matches come first; ties go to the more frequently cited
+        narrator. At most ``max_candidates`` names are scored.
+        """
+        query_grams = trigrams(query)
+        if not query_grams:
+            return []
+        known = sorted(
+            (self._vocabulary[g] for g in query_grams if g in self._vocabulary),
+            key=lambda gram_id: len(self._postings[gram_id]),
+        )
+        required = math.ceil(threshold * len(query_grams))
+        prefix_length = len(known) - required + 1
+        if prefix_length <= 0:
+            return []
+
+        candidates: set[int] = set()
+        for gram_id in known[:prefix_length]:
+            candidates.update(self._postings[gram_id])
+            if len(candidates) >= max_candidates:
+                break
+
+        query_ids = frozenset(known)
+        size = len(query_grams)
+        scored = []
+        span = len(normalize_arabic(query).split())
+        for slot in candidates:
+            name = self._grams[slot]
+            shared = len(query_ids & name)
+            # No window shares more trigrams with the query than the name.
+            if shared < required:
+                continue
+            words = self._words[slot]
+            if span >= len(words):
+                similarity = shared / (size + len(name) - shared)
+            else:
+                windows = (
+                    words
+                    if span == 1
+                    else (
+                        frozenset().union(*words[start : start + span])
+                        for start in range(len(words) - span + 1)
+                    )
+                )
+                similarity = 0.0
+                for grams in windows:
+                    shared = len(query_ids & grams)
+                    similarity = max(similarity, shared / (size + len(grams) - shared))
+            if similarity >= threshold:
+                scored.append((similarity, self._weights[slot], slot))
+
+        scored.sort(reverse=True)
+        return [(self.narrator_ids[slot], similarity) for similarity, _, slot in scored]
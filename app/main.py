@@ -1,18 +1,83 @@
+import asyncio
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
+from pymongo.errors import ConnectionFailure, ExecutionTimeout
 
 from app.api.v1.router import api_router
 from app.core.config import get_settings
 from app.core.database import database
+from app.core.limits import OverloadedError
+from app.core.metrics import MetricsMiddleware, metrics_endpoint
+from app.core.security import PasswordHashingBusyError, hashing_pool
+from app.indexes.registry import search_indexes
+from app.storage.backend import corpus_snapshot
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    await database.connect()
+    settings = get_settings()
+    # Accounts stay in MongoDB whichever backend serves the corpus.
+    await database.connect(ensure_indexes=False)
+    if settings.STORAGE_BACKEND == "snapshot":
+        # Opening scans the snapshot once; keep the loop free meanwhile.
+        await asyncio.to_thread(corpus_snapshot.open, settings.SNAPSHOT_PATH)
+        corpus_db = corpus_snapshot.db
+        collections = ["users"]
+    else:
+        corpus_db = database.corpus_db
+        collections = None
+    # Index builds can take minutes on a large corpus; queries work (more
+    # slowly) meanwhile, so they are not allowed to delay startup.
+    index_task = asyncio.create_task(database.ensure_indexes(collections))
+    if settings.SEARCH_INDEX_ENABLED:
+        await search_indexes.start(corpus_db)
     yield
+    await search_indexes.stop()
+    index_task.cancel()
+    hashing_pool.shutdown()
     await database.disconnect()
+    corpus_snapshot.close()
+
+
+async def password_hashing_busy_handler(
+    request: Request, exc: PasswordHashingBusyError
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+async def overloaded_handler(request: Request, exc: OverloadedError) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": str(exc)},
+        headers={"Retry-After": "1"},
+    )
+
+
+async def database_unavailable_handler(
+    request: Request, exc: ConnectionFailure
+) -> JSONResponse:
+    # Includes waiting too long for a pooled connection or for a server.
+    return JSONResponse(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        content={"detail": "The database is busy or unavailable. Try again shortly."},
+        headers={"Retry-After": "1"},
+    )
+
+
+async def query_timeout_handler(
+    request: Request, exc: ExecutionTimeout
+) -> JSONResponse:
+    return JSONResponse(
+        status_code=status.HTTP_504_GATEWAY_TIMEOUT,
+        content={"detail": "The query took too long. Try a narrower search."},
+    )
 
 
 def create_app() -> FastAPI:
@@ -32,6 +97,15 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
+    if settings.METRICS_ENABLED:
+        app.add_middleware(MetricsMiddleware)
+        app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+
+    app.add_exception_handler(PasswordHashingBusyError, password_hashing_busy_handler)
+    app.add_exception_handler(OverloadedError, overloaded_handler)
+    app.add_exception_handler(ConnectionFailure, database_unavailable_handler)
+    app.add_exception_handler(ExecutionTimeout, query_timeout_handler)
+
     app.include_router(api_router, prefix=settings.API_V1_PREFIX)
 
     return app
@@ -27,3 +27,7 @@ class HadithDocument(BaseModel):
     matn: str
     matn_plain: str
     narrators: list[HadithNarrator] = []
+
+    # Derived by app.core.normalization.hadith_search_fields
+    full_text_norm: str = ""
+    text_tokens: list[str] = []
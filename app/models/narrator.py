@@ -30,3 +30,11 @@ class NarratorDocument(BaseModel):
     rank_dhahabi: str = ""
     relations: str = ""
     jarh_wa_tadil: list[JarhWaTadil] = []
+
+    # Derived by app.core.normalization.narrator_search_fields
+    name_norm: str = ""
+    kunya_norm: str = ""
+    nasab_norm: str = ""
+    name_tokens: list[str] = []
+    kunya_tokens: list[str] = []
+    nasab_tokens: list[str] = []
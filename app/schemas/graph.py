@@ -0,0 +1,36 @@
+from pydantic import BaseModel
+
+
+class GraphNarrator(BaseModel):
+    narrator_id: int
+    name: str
+
+
+class GraphNeighbor(GraphNarrator):
+    """A linked narrator; ``weight`` is the number of chains with the link."""
+
+    weight: int
+
+
+class NarratorGraphResponse(GraphNarrator):
+    teacher_count: int
+    student_count: int
+    teachers: list[GraphNeighbor]
+    students: list[GraphNeighbor]
+
+
+class TopTransmitter(GraphNarrator):
+    students: int
+    transmissions: int
+
+
+class TopTransmittersResponse(BaseModel):
+    items: list[TopTransmitter]
+
+
+class TransmissionPathResponse(BaseModel):
+    """Narrators from source to target; each ``weight`` is that of the link
+    from the previous narrator (0 for the source)."""
+
+    hops: int
+    narrators: list[GraphNeighbor]
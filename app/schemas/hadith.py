@@ -1,4 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
+
+from app.schemas.narrator import NarratorResponse
 
 
 class HadithNarratorResponse(BaseModel):
@@ -18,6 +20,104 @@ class HadithResponse(BaseModel):
     narrators: list[HadithNarratorResponse] = []
 
 
+class HadithExpandedNarratorResponse(HadithNarratorResponse):
+    details: NarratorResponse | None = None
+
+
+class HadithExpandedResponse(HadithResponse):
+    narrators: list[HadithExpandedNarratorResponse] = []
+
+
+class BookFacet(BaseModel):
+    book_id: int
+    count: int
+
+
+class NarratorFacet(BaseModel):
+    narrator_id: int
+    name: str
+    count: int
+
+
+class HadithFacets(BaseModel):
+    """Counts over all matches: every book, and the most frequent narrators."""
+
+    books: list[BookFacet]
+    narrators: list[NarratorFacet]
+
+
 class HadithListResponse(BaseModel):
     items: list[HadithResponse]
-    total: int
+    total: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+    facets: HadithFacets | None = None
+
+
+class HadithPartialResponse(BaseModel):
+    """A hadith restricted to the requested ``fields``; the others are absent."""
+
+    id: str | None = None
+    book_id: int | None = None
+    page_number: int | None = None
+    full_text: str | None = None
+    full_text_plain: str | None = None
+    matn: str | None = None
+    matn_plain: str | None = None
+    narrators: list[HadithNarratorResponse] | None = None
+
+
+class HadithPartialListResponse(BaseModel):
+    items: list[HadithPartialResponse]
+    total: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+    facets: HadithFacets | None = None
+
+
+class HadithNarratorSummaryResponse(BaseModel):
+    id: int
+    name: str
+
+
+class HadithSummaryResponse(BaseModel):
+    id: str
+    book_id: int
+    page_number: int
+    narrators: list[HadithNarratorSummaryResponse] = []
+    snippet: str
+
+
+class HadithSummaryListResponse(BaseModel):
+    items: list[HadithSummaryResponse]
+    total: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+    facets: HadithFacets | None = None
+
+
+class SimilarHadith(BaseModel):
+    id: str
+    book_id: int
+    page_number: int
+    # Estimated Jaccard similarity of the two matns' character shingles.
+    similarity: float
+
+
+class SimilarHadithsResponse(BaseModel):
+    id: str
+    # Hadiths linked to this one through chains of similar pairs, itself
+    # included.
+    cluster_size: int
+    items: list[SimilarHadith]
+
+
+class HadithBatchRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=500)
+
+
+class HadithBatchResponse(BaseModel):
+    """Results in request order; ids that were not found map to ``null``."""
+
+    items: list[HadithResponse | None]
+    missing: list[str]
@@ -1,4 +1,4 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 
 
 class JarhWaTadilResponse(BaseModel):
@@ -23,4 +23,26 @@ class NarratorResponse(BaseModel):
 
 class NarratorListResponse(BaseModel):
     items: list[NarratorResponse]
-    total: int
+    total: int | None
+    has_more: bool = False
+    next_cursor: str | None = None
+
+
+class NarratorBatchRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, max_length=500)
+
+
+class NarratorBatchResponse(BaseModel):
+    """Results in request order; ids that were not found map to ``null``."""
+
+    items: list[NarratorResponse | None]
+    missing: list[str]
+
+
+class NarratorSuggestion(BaseModel):
+    narrator_id: int
+    name: str
+
+
+class NarratorSuggestResponse(BaseModel):
+    items: list[NarratorSuggestion]
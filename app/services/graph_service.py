@@ -0,0 +1,75 @@
+from app.indexes.registry import SearchIndexes
+
+
+class GraphNotReadyError(ValueError):
+    pass
+
+
+class UnknownNarratorError(ValueError):
+    pass
+
+
+class GraphService:
+    """Narrator transmission queries, answered from the in-memory graph."""
+
+    def __init__(self, indexes: SearchIndexes) -> None:
+        if not indexes.ready:
+            raise GraphNotReadyError(
+                "The narrator graph is still loading. Try again shortly."
+            )
+        self.graph = indexes.graph
+
+    def _check(self, *narrator_ids: int) -> None:
+        for narrator_id in narrator_ids:
+            if narrator_id not in self.graph:
+                raise UnknownNarratorError(f"Narrator {narrator_id} not found.")
+
+    def _neighbors(self, pairs: list[tuple[int, int]]) -> list[dict]:
+        return [
+            {"narrator_id": nid, "name": self.graph.name(nid), "weight": weight}
+            for nid, weight in pairs
+        ]
+
+    async def get_neighbors(self, narrator_id: int, limit: int = 20) -> dict:
+        """Teachers and students of a narrator, strongest links first.
+
+        Returns a payload in the ``NarratorGraphResponse`` shape.
+        """
+        self._check(narrator_id)
+        graph = self.graph
+        teacher_count, student_count = graph.degree(narrator_id)
+        return {
+            "narrator_id": narrator_id,
+            "name": graph.name(narrator_id),
+            "teacher_count": teacher_count,
+            "student_count": student_count,
+            "teachers": self._neighbors(graph.teachers(narrator_id, limit)),
+            "students": self._neighbors(graph.students(narrator_id, limit)),
+        }
+
+    async def get_top_transmitters(self, limit: int = 20) -> dict:
+        """Returns a payload in the ``TopTransmittersResponse`` shape."""
+        return {
+            "items": [
+                {
+                    "narrator_id": nid,
+                    "name": self.graph.name(nid),
+                    "students": students,
+                    "transmissions": transmissions,
+                }
+                for nid, students, transmissions in self.graph.top_transmitters(limit)
+            ]
+        }
+
+    async def find_path(
+        self, source: int, target: int, directed: bool = True
+    ) -> dict | None:
+        """Shortest transmission path, or ``None`` if the two are not linked.
+
+        Returns a payload in the ``TransmissionPathResponse`` shape.
+        """
+        self._check(source, target)
+        steps = self.graph.path(source, target, directed=directed)
+        if steps is None:
+            return None
+        return {"hops": len(steps) - 1, "narrators": self._neighbors(steps)}
@@ -1,37 +1,335 @@
-import re
+import asyncio
+import heapq
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from collections.abc import AsyncIterator, Callable
 
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.schemas.hadith import HadithListResponse, HadithNarratorResponse, HadithResponse
-
-
-def _doc_to_response(doc: dict) -> HadithResponse:
-    return HadithResponse(
-        id=str(doc["_id"]),
-        book_id=doc["book_id"],
-        page_number=doc["page_number"],
-        full_text=doc["full_text"],
-        full_text_plain=doc["full_text_plain"],
-        matn=doc["matn"],
-        matn_plain=doc["matn_plain"],
-        narrators=[
-            HadithNarratorResponse(
-                id=n["id"],
-                name=n["name"],
-                name_plain=n["name_plain"],
-            )
-            for n in doc.get("narrators", [])
-        ],
-    )
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.counting import query_key, total_counter
+from app.core.http_cache import CachedBody
+from app.core.limits import search_limiter
+from app.core.normalization import (
+    folding_pattern,
+    normalize_arabic,
+    phrase_pattern,
+    tokenize,
+    tokens_query,
+)
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_query,
+)
+from app.core.serialization import (
+    dump_json,
+    hadith_fields_payload,
+    hadith_payload,
+    hadith_summary_payload,
+)
+from app.core.singleflight import SingleFlight
+from app.indexes.registry import HADITH_SORT, SearchIndexes
+from app.indexes.text import parse_query
+from app.schemas.hadith import HadithExpandedResponse, HadithResponse
+from app.services.narrator_loader import NarratorLoader
+from app.services.narrator_service import NarratorService
+
+
+def _decode_hadith_cursor(cursor: str) -> tuple[float | None, list]:
+    """Decode a cursor into its score and ``[book_id, page_number, _id]``.
+
+    Relevance-ranked pages carry the last score; the score is ``None`` for
+    cursors of pages in (book_id, page_number, _id) order.
+    """
+    try:
+        values = decode_cursor(cursor, len(HADITH_SORT) + 1)
+    except InvalidCursorError:
+        values = [None, *decode_cursor(cursor, len(HADITH_SORT))]
+    score, *numbers, last_id = values
+    if (
+        not all(
+            isinstance(n, (int, float)) and not isinstance(n, bool)
+            for n in [*numbers, 0 if score is None else score]
+        )
+        or not (isinstance(last_id, str) and ObjectId.is_valid(last_id))
+    ):
+        raise InvalidCursorError("Invalid cursor.")
+    return score, [*numbers, ObjectId(last_id)]
+
+
+def _parse_narrator_ids(narrators: str | None) -> list[int]:
+    if not narrators:
+        return []
+    return [int(nid.strip()) for nid in narrators.split(",") if nid.strip()]
+
+
+def _narrators_query(
+    narrator_ids: list[int],
+    narrators_ordered: bool,
+    narrators_contiguous: bool = False,
+) -> dict:
+    # All narrators must exist
+    query: dict = {"narrators.id": {"$all": narrator_ids}}
+    if (narrators_ordered or narrators_contiguous) and len(narrator_ids) > 1:
+        # A narrator may recur in a chain; any occurrence can satisfy the
+        # order, as in ChainIndex.match.
+        chain = {"$ifNull": ["$narrators.id", []]}
+        if narrators_contiguous:
+            # The narrators are a slice of the chain, starting anywhere
+            starts = {"$range": [0, {"$size": chain}]}
+            query["$expr"] = {
+                "$in": [
+                    {"$literal": narrator_ids},
+                    {
+                        "$map": {
+                            "input": starts,
+                            "as": "start",
+                            "in": {"$slice": [chain, "$$start", len(narrator_ids)]},
+                        }
+                    },
+                ]
+            }
+        else:
+            # Find each narrator after the previous one's position; the
+            # value is where to search from next, or -1 once one is missing.
+            after = {
+                "$let": {
+                    "vars": {"at": {"$indexOfArray": [chain, "$$this", "$$value"]}},
+                    "in": {"$cond": [{"$lt": ["$$at", 0]}, -1, {"$add": ["$$at", 1]}]},
+                }
+            }
+            query["$expr"] = {
+                "$gt": [
+                    {
+                        "$reduce": {
+                            "input": {"$literal": narrator_ids},
+                            "initialValue": 0,
+                            "in": {"$cond": [{"$lt": ["$$value", 0]}, -1, after]},
+                        }
+                    },
+                    0,
+                ]
+            }
+    return query
+
+
+def _search_query(
+    full_text_plain: str | None,
+    book_id: int | None,
+    narrator_ids: list[int],
+    narrators_ordered: bool,
+    narrators_contiguous: bool,
+) -> dict:
+    query: dict = {}
+
+    if full_text_plain:
+        text_query = tokens_query("text_tokens", full_text_plain)
+        if text_query:
+            query.update(text_query)
+        # Quoted phrases, which the in-memory index checks by token position.
+        phrases = parse_query(full_text_plain)[1]
+        if phrases:
+            query["$and"] = [
+                {"full_text_norm": {"$regex": phrase_pattern(phrase)}}
+                for phrase in phrases
+            ]
+
+    if book_id is not None:
+        query["book_id"] = book_id
+
+    if narrator_ids:
+        query.update(
+            _narrators_query(narrator_ids, narrators_ordered, narrators_contiguous)
+        )
+    return query
+
+
+SNIPPET_LENGTH = 160
+
+
+def _snippet_window(text: str, at) -> dict:
+    """Expression for about ``SNIPPET_LENGTH`` code points of ``text``.
+
+    The window starts a third of its length before ``at``, and both ends are
+    moved inward to whitespace so no word is cut. One code point on either
+    side is read too, to tell whether a word is cut at the edge.
+    """
+    start = {"$max": [0, {"$subtract": [at, SNIPPET_LENGTH // 3]}]}
+    window = {
+        "$substrCP": [
+            text,
+            {"$max": [0, {"$subtract": ["$$start", 1]}]},
+            {"$add": [SNIPPET_LENGTH + 1, {"$min": ["$$start", 1]}]},
+        ]
+    }
+    # Drop the word cut by the start, and the one cut by the end if the text
+    # goes on. Text without whitespace is kept as is.
+    head = {
+        "$cond": [
+            {"$gt": ["$$start", 0]},
+            _capture("$$window", r"\s(\S[\s\S]*)$"),
+            "$$window",
+        ]
+    }
+    body = {
+        "$cond": [
+            {
+                "$gt": [
+                    {"$add": ["$$start", SNIPPET_LENGTH]},
+                    {"$strLenCP": {"$ifNull": [text, ""]}},
+                ]
+            },
+            head,
+            _capture(head, r"^([\s\S]*\S)\s"),
+        ]
+    }
+    return {
+        "$let": {
+            "vars": {"start": start},
+            "in": {
+                "$let": {
+                    "vars": {"window": window},
+                    "in": {"$substrCP": [body, 0, SNIPPET_LENGTH]},
+                }
+            },
+        }
+    }
+
+
+def _capture(text, regex: str) -> dict:
+    """Expression for the first group of ``regex`` in ``text``, else ``text``."""
+    return {
+        "$let": {
+            "vars": {"found": {"$regexFind": {"input": text, "regex": regex}}},
+            "in": {"$ifNull": [{"$arrayElemAt": ["$$found.captures", 0]}, text]},
+        }
+    }
+
+
+def _snippet_expression(full_text_plain: str | None) -> dict:
+    """Projection expression cutting a keyword-in-context window server-side.
+
+    The window is cut from the matn around its first match of a query token,
+    or else from the full text around its first match, so readers see the
+    stored text rather than the normalized one. Matches ignore diacritics
+    and letter variants like the search does. Without a text query (or a
+    match) it is the start of the matn.
+    """
+    preview = _snippet_window("$matn_plain", 0)
+    tokens = tokenize(full_text_plain) if full_text_plain else []
+    if not tokens:
+        return preview
+    regex = "|".join(folding_pattern(token) for token in dict.fromkeys(tokens))
+
+    def around_match(text: str, otherwise) -> dict:
+        found = {"$regexFind": {"input": text, "regex": regex, "options": "i"}}
+        return {
+            "$let": {
+                "vars": {"found": found},
+                "in": {
+                    "$cond": [
+                        {"$eq": ["$$found", None]},
+                        otherwise,
+                        _snippet_window(text, "$$found.idx"),
+                    ]
+                },
+            }
+        }
+
+    return around_match("$matn_plain", around_match("$full_text_plain", preview))
+
+
+def _result_view(
+    full_text_plain: str | None,
+    fields: list[str] | None,
+    view: str,
+) -> tuple[dict | None, Callable[[dict], dict]]:
+    """Return the MongoDB projection and payload mapper for a result view.
+
+    The sort key fields are always projected so cursors can be built.
+    """
+    if view == "summary":
+        projection = {
+            "book_id": 1,
+            "page_number": 1,
+            "narrators.id": 1,
+            "narrators.name": 1,
+            "snippet": _snippet_expression(full_text_plain),
+        }
+        return projection, hadith_summary_payload
+    if fields:
+        projection = {field: 1 for field in fields if field != "id"}
+        projection.update(book_id=1, page_number=1)
+        return projection, lambda doc: hadith_fields_payload(doc, fields)
+    return None, hadith_payload
+
+
+settings = get_settings()
+
+# Serialized detail responses keyed by (ObjectId string, expanded).
+_detail_cache = TTLCache(
+    maxsize=settings.DETAIL_CACHE_SIZE,
+    ttl=settings.DETAIL_CACHE_TTL_SECONDS,
+)
+
+# Facet counts (with the total) keyed by source and normalized query.
+_facet_cache = TTLCache(
+    maxsize=settings.FACET_CACHE_SIZE,
+    ttl=settings.COUNT_CACHE_TTL_SECONDS,
+)
+
+# Identical searches in flight at the same time share one execution.
+_search_flights = SingleFlight()
+
+# Ordinals processed between yields to the event loop while counting facets.
+FACET_YIELD_EVERY = 10_000
+
+
+def _facets_pipeline(query: dict) -> list[dict]:
+    """One pass over the matches counting the total, books and narrators.
+
+    A narrator is counted once per hadith even if they recur in its chain.
+    """
+    narrators = [
+        {"$unwind": "$narrators"},
+        {"$group": {"_id": {"hadith": "$_id", "narrator": "$narrators.id"}}},
+        {"$group": {"_id": "$_id.narrator", "count": {"$sum": 1}}},
+        {"$sort": {"count": -1, "_id": 1}},
+        {"$limit": settings.FACET_NARRATOR_LIMIT},
+    ]
+    books = [
+        {"$group": {"_id": "$book_id", "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+    ]
+    return [
+        {"$match": query},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "books": books,
+                "narrators": narrators,
+            }
+        },
+    ]
 
 
 class HadithService:
     COLLECTION = "hadiths"
+    # Written by app.commands.find_similar_hadiths, keyed by hadith _id.
+    SIMILAR_COLLECTION = "hadith_similar"
 
-    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        indexes: SearchIndexes | None = None,
+    ) -> None:
         self.db = db
         self.collection = db[self.COLLECTION]
+        self.indexes = indexes
 
     async def search_hadiths(
         self,
@@ -39,50 +337,556 @@ class HadithService:
         book_id: int | None = None,
         narrators: str | None = None,
         narrators_ordered: bool = False,
+        narrators_contiguous: bool = False,
         skip: int = 0,
         limit: int = 20,
-    ) -> HadithListResponse:
-        query: dict = {}
+        cursor: str | None = None,
+        include_total: bool = True,
+        fields: list[str] | None = None,
+        view: str = "full",
+        facets: bool = False,
+    ) -> dict:
+        """Search hadiths, paginated by ``skip`` or by an opaque ``cursor``.
+
+        Results are ordered by (book_id, page_number, _id), or by relevance
+        for text searches answered from the in-memory index. ``skip`` is
+        ignored when a cursor is given, and cursors from either order are
+        accepted. Quoted phrases must appear as such; a text without any
+        searchable token does not filter. With ``include_total=False`` no
+        count is run and ``total`` may be ``None``; use ``has_more``.
+
+        With ``facets=True`` the payload also carries match counts per book
+        and for the most frequent narrators, over all matches; they are
+        cached per query, so only the first page pays for them.
+
+        Concurrent calls for the same normalized query and page are
+        coalesced: they await one execution and share its payload. Only
+        that execution takes a ``search_limiter`` slot.
+
+        Returns a payload in the ``HadithListResponse`` shape, restricted to
+        ``fields`` if given, or in the ``HadithSummaryListResponse`` shape
+        for ``view="summary"``.
+        """
+        narrator_ids = _parse_narrator_ids(narrators)
+        if full_text_plain is not None and not tokenize(full_text_plain):
+            # Nothing searchable, e.g. only punctuation: no text filter.
+            full_text_plain = None
+        key = (
+            normalize_arabic(full_text_plain or ""),
+            book_id,
+            tuple(narrator_ids),
+            narrators_ordered,
+            narrators_contiguous,
+            skip,
+            limit,
+            cursor,
+            include_total,
+            tuple(fields) if fields else None,
+            view,
+            facets,
+        )
+
+        async def search() -> dict:
+            async with search_limiter:
+                return await self._search_hadiths(
+                    full_text_plain=full_text_plain,
+                    book_id=book_id,
+                    narrator_ids=narrator_ids,
+                    narrators_ordered=narrators_ordered,
+                    narrators_contiguous=narrators_contiguous,
+                    skip=skip,
+                    limit=limit,
+                    cursor=cursor,
+                    include_total=include_total,
+                    fields=fields,
+                    view=view,
+                    facets=facets,
+                )
+
+        return await _search_flights.do(key, search)
+
+    async def _search_hadiths(
+        self,
+        full_text_plain: str | None,
+        book_id: int | None,
+        narrator_ids: list[int],
+        narrators_ordered: bool,
+        narrators_contiguous: bool,
+        skip: int,
+        limit: int,
+        cursor: str | None,
+        include_total: bool,
+        fields: list[str] | None,
+        view: str,
+        facets: bool,
+    ) -> dict:
+        projection, to_payload = _result_view(full_text_plain, fields, view)
+        query = _search_query(
+            full_text_plain,
+            book_id,
+            narrator_ids,
+            narrators_ordered,
+            narrators_contiguous,
+        )
+        matches = None
+        if (
+            (full_text_plain or narrator_ids)
+            and self.indexes is not None
+            and self.indexes.ready
+        ):
+            matches = self._index_matches(
+                full_text_plain,
+                book_id,
+                narrator_ids,
+                narrators_ordered,
+                narrators_contiguous,
+            )
+
+        facet_counts = None
+        if facets:
+            facet_counts = await self._facets(query, book_id, matches)
+
+        if matches is not None:
+            payload = await self._search_indexed(
+                matches=matches,
+                ranked=bool(full_text_plain),
+                skip=skip,
+                limit=limit,
+                cursor=cursor,
+                projection=projection,
+                to_payload=to_payload,
+            )
+            if facet_counts is not None:
+                payload["facets"] = facet_counts["facets"]
+            return payload
+
+        total = None
+        if facet_counts is not None:
+            total = facet_counts["total"]
+        elif include_total:
+            total = await total_counter.count(self.collection, query)
+
+        page_query = query
+        if cursor is not None:
+            # A ranked cursor from the index continues in this order.
+            _, after = _decode_hadith_cursor(cursor)
+            after_query = keyset_query(HADITH_SORT, after)
+            page_query = {"$and": [query, after_query]} if query else after_query
+            skip = 0
+
+        # One extra row tells whether another page exists without a count.
+        docs = await (
+            self.collection.find(page_query, projection)
+            .sort(HADITH_SORT)
+            .skip(skip)
+            .limit(limit + 1)
+            .max_time_ms(settings.SEARCH_QUERY_TIMEOUT_MS)
+            .to_list(length=limit + 1)
+        )
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = None
+        if has_more:
+            last = docs[-1]
+            next_cursor = encode_cursor(
+                [last["book_id"], last["page_number"], last["_id"]]
+            )
+
+        payload = {
+            "items": [to_payload(doc) for doc in docs],
+            "total": total,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        }
+        if facet_counts is not None:
+            payload["facets"] = facet_counts["facets"]
+        return payload
+
+    async def _facets(
+        self,
+        query: dict,
+        book_id: int | None,
+        matches: list[tuple[int, float]] | None,
+    ) -> dict:
+        """``{"total", "facets"}`` over every match of a search.
+
+        Counted in memory when the indexes are ready, from ``matches`` when
+        the search was answered by them, otherwise by a single ``$facet``
+        aggregation. Narrator names come from the narrator records either
+        way.
+        """
+        indexed = self.indexes is not None and self.indexes.ready
+        key = (indexed, query_key(query))
+        cached = _facet_cache.get(key)
+        if cached is None:
+            if indexed:
+                cached = await self._count_facets(book_id, matches)
+            else:
+                [result] = await self.collection.aggregate(
+                    _facets_pipeline(query),
+                    maxTimeMS=settings.COUNT_QUERY_TIMEOUT_MS,
+                    allowDiskUse=True,
+                ).to_list(length=1)
+                # Names from the narrator records, as the in-memory count
+                # takes them, not from the copies embedded in the chains.
+                records = await NarratorService(self.db).get_narrators_by_narrator_ids(
+                    [n["_id"] for n in result["narrators"]]
+                )
+                names = {nid: r["name"] for nid, r in records.items() if r is not None}
+                cached = {
+                    "total": result["total"][0]["count"] if result["total"] else 0,
+                    "facets": {
+                        "books": [
+                            {"book_id": b["_id"], "count": b["count"]}
+                            for b in result["books"]
+                        ],
+                        "narrators": [
+                            {
+                                "narrator_id": n["_id"],
+                                "name": names.get(n["_id"], ""),
+                                "count": n["count"],
+                            }
+                            for n in result["narrators"]
+                        ],
+                    },
+                }
+            _facet_cache.set(key, cached)
+        return cached
+
+    async def _count_facets(
+        self,
+        book_id: int | None,
+        matches: list[tuple[int, float]] | None,
+    ) -> dict:
+        indexes = self.indexes
+        if matches is not None:
+            ordinals = [o for o, _ in matches]
+        elif book_id is not None:
+            # book_ids follow HADITH_SORT, so one book is a contiguous range.
+            ordinals = range(
+                bisect_left(indexes.book_ids, book_id),
+                bisect_right(indexes.book_ids, book_id),
+            )
+        else:
+            ordinals = range(len(indexes.hadith_ids))
+
+        books: Counter[int] = Counter()
+        narrators: Counter[int] = Counter()
+        for i, ordinal in enumerate(ordinals):
+            books[indexes.book_ids[ordinal]] += 1
+            narrators.update(set(indexes.chains.chain(ordinal)))
+            if i % FACET_YIELD_EVERY == FACET_YIELD_EVERY - 1:
+                await asyncio.sleep(0)
+
+        top = heapq.nsmallest(
+            settings.FACET_NARRATOR_LIMIT,
+            narrators.items(),
+            key=lambda item: (-item[1], item[0]),
+        )
+        graph = indexes.graph
+        return {
+            "total": len(ordinals),
+            "facets": {
+                "books": [{"book_id": b, "count": n} for b, n in sorted(books.items())],
+                "narrators": [
+                    {
+                        "narrator_id": nid,
+                        "name": graph.name(nid) if nid in graph else "",
+                        "count": n,
+                    }
+                    for nid, n in top
+                ],
+            },
+        }
+
+    async def _search_indexed(
+        self,
+        matches: list[tuple[int, float]],
+        ranked: bool,
+        skip: int,
+        limit: int,
+        cursor: str | None,
+        projection: dict | None,
+        to_payload: Callable[[dict], dict],
+    ) -> dict:
+        """Page through ``_index_matches`` results of a text or chain search.
+
+        ``ranked`` matches are ordered by BM25, the others by corpus order.
+        Only the requested page is fetched from MongoDB.
+        """
+        indexes = self.indexes
+        start = skip
+        if cursor is not None:
+            score, after = _decode_hadith_cursor(cursor)
+            ordinal = indexes.ordinal_after(tuple(after))
+            if ranked and score is None:
+                # A cursor issued before the index was ready: keep paging in
+                # the (book_id, page_number, _id) order it started in.
+                ranked = False
+                matches = sorted(matches)
+            if ranked:
+                start = bisect_right(
+                    matches,
+                    (-score, ordinal - 1),
+                    key=lambda match: (-match[1], match[0]),
+                )
+            else:
+                start = bisect_left(matches, ordinal, key=lambda match: match[0])
+
+        page = matches[start : start + limit]
+        page_ids = [indexes.hadith_ids[o] for o, _ in page]
+        docs = {
+            doc["_id"]: doc
+            async for doc in self.collection.find(
+                {"_id": {"$in": page_ids}},
+                projection,
+                max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+            )
+        }
+        items = [to_payload(docs[oid]) for oid in page_ids if oid in docs]
+
+        has_more = bool(page) and start + limit < len(matches)
+        next_cursor = None
+        if has_more:
+            last, score = page[-1]
+            key = list(indexes.sort_key(last))
+            next_cursor = encode_cursor([score, *key] if ranked else key)
+
+        # The match list is already materialized, so the total is free.
+        return {
+            "items": items,
+            "total": len(matches),
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        }
+
+    def _index_matches(
+        self,
+        full_text_plain: str | None,
+        book_id: int | None,
+        narrator_ids: list[int],
+        narrators_ordered: bool,
+        narrators_contiguous: bool,
+    ) -> list[tuple[int, float]]:
+        """All ``(ordinal, score)`` matches, best first for text searches.
+
+        Unranked results all score 0 and so stay in corpus order.
+        """
+        indexes = self.indexes
+        chain_matches = None
+        if narrator_ids:
+            chain_matches = indexes.chains.match(
+                narrator_ids,
+                ordered=narrators_ordered,
+                contiguous=narrators_contiguous,
+            )
 
         if full_text_plain:
-            query["full_text_plain"] = {
-                "$regex": re.escape(full_text_plain),
-                "$options": "i",
-            }
+            matches = indexes.text.search(full_text_plain)
+            if chain_matches is not None:
+                in_chain = set(chain_matches)
+                matches = [(o, score) for o, score in matches if o in in_chain]
+        else:
+            matches = [(o, 0.0) for o in chain_matches]
 
         if book_id is not None:
-            query["book_id"] = book_id
-
-        if narrators:
-            narrator_ids = [int(nid.strip()) for nid in narrators.split(",") if nid.strip()]
-            if narrator_ids:
-                if narrators_ordered and len(narrator_ids) > 1:
-                    # All narrators must exist
-                    query["narrators.id"] = {"$all": narrator_ids}
-                    # Each narrator must appear before the next in the array
-                    order_conditions = [
-                        {
-                            "$lt": [
-                                {"$indexOfArray": ["$narrators.id", narrator_ids[i]]},
-                                {"$indexOfArray": ["$narrators.id", narrator_ids[i + 1]]},
-                            ]
+            matches = [
+                (o, score) for o, score in matches if indexes.book_ids[o] == book_id
+            ]
+        return matches
+
+    async def export_hadiths(
+        self,
+        full_text_plain: str | None = None,
+        book_id: int | None = None,
+        narrators: str | None = None,
+        narrators_ordered: bool = False,
+        narrators_contiguous: bool = False,
+        fields: list[str] | None = None,
+    ) -> AsyncIterator[bytes]:
+        """Stream every match as NDJSON, in the order ``search_hadiths`` uses.
+
+        Documents are read in batches of ``EXPORT_BATCH_SIZE`` from a single
+        cursor and yielded as chunks of about ``EXPORT_CHUNK_BYTES``. The
+        next batch is only fetched once the consumer takes the previous
+        chunks, so memory stays flat however large the export is.
+
+        The export holds a ``search_limiter`` slot until it ends, from the
+        first chunk requested; MongoDB stops it after
+        ``EXPORT_QUERY_TIMEOUT_MS``.
+        """
+        async with search_limiter:
+            narrator_ids = _parse_narrator_ids(narrators)
+            projection, to_payload = _result_view(None, fields, "full")
+            batch_size = settings.EXPORT_BATCH_SIZE
+
+            if (
+                (full_text_plain or narrator_ids)
+                and self.indexes is not None
+                and self.indexes.ready
+            ):
+                matches = self._index_matches(
+                    full_text_plain,
+                    book_id,
+                    narrator_ids,
+                    narrators_ordered,
+                    narrators_contiguous,
+                )
+                ordinals = [o for o, _ in matches]
+
+                async def documents() -> AsyncIterator[dict]:
+                    for start in range(0, len(ordinals), batch_size):
+                        ids = [
+                            self.indexes.hadith_ids[o]
+                            for o in ordinals[start : start + batch_size]
+                        ]
+                        docs = {
+                            doc["_id"]: doc
+                            async for doc in self.collection.find(
+                                {"_id": {"$in": ids}},
+                                projection,
+                                batch_size=batch_size,
+                                max_time_ms=settings.SEARCH_QUERY_TIMEOUT_MS,
+                            )
                         }
-                        for i in range(len(narrator_ids) - 1)
-                    ]
-                    query["$expr"] = {"$and": order_conditions}
-                else:
-                    query["narrators.id"] = {"$all": narrator_ids}
+                        for oid in ids:
+                            if oid in docs:
+                                yield docs[oid]
 
-        total = await self.collection.count_documents(query)
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        items = [_doc_to_response(doc) async for doc in cursor]
+                source = documents()
+                cursor = None
+            else:
+                query = _search_query(
+                    full_text_plain,
+                    book_id,
+                    narrator_ids,
+                    narrators_ordered,
+                    narrators_contiguous,
+                )
+                cursor = (
+                    self.collection.find(query, projection)
+                    .sort(HADITH_SORT)
+                    .batch_size(batch_size)
+                    .max_time_ms(settings.EXPORT_QUERY_TIMEOUT_MS)
+                )
+                source = cursor
 
-        return HadithListResponse(items=items, total=total)
+            chunk = bytearray()
+            try:
+                async for doc in source:
+                    chunk += dump_json(to_payload(doc))
+                    chunk += b"\n"
+                    if len(chunk) >= settings.EXPORT_CHUNK_BYTES:
+                        yield bytes(chunk)
+                        chunk.clear()
+                if chunk:
+                    yield bytes(chunk)
+            finally:
+                # Free the server-side cursor if the client goes away mid-export.
+                if cursor is not None:
+                    await cursor.close()
 
-    async def get_hadith_by_id(self, hadith_id: str) -> HadithResponse | None:
+    async def get_hadith_by_id(self, hadith_id: str) -> dict | None:
         if not ObjectId.is_valid(hadith_id):
             return None
-        doc = await self.collection.find_one({"_id": ObjectId(hadith_id)})
+        doc = await self.collection.find_one(
+            {"_id": ObjectId(hadith_id)}, max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS
+        )
         if doc is None:
             return None
-        return _doc_to_response(doc)
+        return hadith_payload(doc)
+
+    async def get_similar_hadiths(self, hadith_id: str, limit: int) -> dict | None:
+        """Precomputed near-duplicate narrations, most similar first.
+
+        Served by ``_id`` from ``SIMILAR_COLLECTION``; a hadith with no
+        entry there has no similar narrations. Returns a payload in the
+        ``SimilarHadithsResponse`` shape, or ``None`` if the hadith does
+        not exist.
+        """
+        if not ObjectId.is_valid(hadith_id):
+            return None
+        object_id = ObjectId(hadith_id)
+        doc = await self.db[self.SIMILAR_COLLECTION].find_one(
+            {"_id": object_id}, max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS
+        )
+        if doc is None:
+            exists = await self.collection.find_one(
+                {"_id": object_id},
+                {"_id": 1},
+                max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+            )
+            if exists is None:
+                return None
+            doc = {"cluster_size": 1, "similar": []}
+        return {
+            "id": str(object_id),
+            "cluster_size": doc["cluster_size"],
+            "items": [
+                {
+                    "id": str(item["id"]),
+                    "book_id": item["book_id"],
+                    "page_number": item["page_number"],
+                    "similarity": item["similarity"],
+                }
+                for item in doc["similar"][:limit]
+            ],
+        }
+
+    async def get_hadiths_by_ids(self, hadith_ids: list[str]) -> dict:
+        """Resolve many ids with one ``$in`` query, keeping request order.
+
+        Returns a payload in the ``HadithBatchResponse`` shape.
+        """
+        object_ids = {
+            hadith_id: ObjectId(hadith_id)
+            for hadith_id in hadith_ids
+            if ObjectId.is_valid(hadith_id)
+        }
+        docs = {
+            doc["_id"]: doc
+            async for doc in self.collection.find(
+                {"_id": {"$in": list(set(object_ids.values()))}},
+                max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+            )
+        }
+        items = []
+        missing = []
+        for hadith_id in hadith_ids:
+            doc = docs.get(object_ids.get(hadith_id))
+            if doc is None:
+                missing.append(hadith_id)
+                items.append(None)
+            else:
+                items.append(hadith_payload(doc))
+        return {"items": items, "missing": missing}
+
+    async def get_hadith_body(
+        self,
+        hadith_id: str,
+        narrator_loader: NarratorLoader | None = None,
+    ) -> CachedBody | None:
+        """Serialized detail response, served from the detail cache when warm.
+
+        With a ``narrator_loader`` every chain member is expanded with its
+        full narrator record, resolved in one batched query.
+        """
+        if not ObjectId.is_valid(hadith_id):
+            return None
+        expand = narrator_loader is not None
+        key = (str(ObjectId(hadith_id)), expand)
+        cached = _detail_cache.get(key)
+        if cached is None:
+            hadith = await self.get_hadith_by_id(key[0])
+            if hadith is None:
+                return None
+            if expand:
+                details = await narrator_loader.load_many(
+                    [n["id"] for n in hadith["narrators"]]
+                )
+                for narrator, detail in zip(hadith["narrators"], details):
+                    narrator["details"] = detail
+            model = HadithExpandedResponse if expand else HadithResponse
+            cached = CachedBody.from_bytes(dump_json(hadith, model))
+            _detail_cache.set(key, cached)
+        return cached
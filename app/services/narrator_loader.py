@@ -0,0 +1,23 @@
+from app.services.narrator_service import NarratorService
+
+
+class NarratorLoader:
+    """Request-scoped loader that batches and deduplicates narrator lookups.
+
+    Every narrator_id is resolved at most once per request, and each
+    ``load_many`` call costs at most one query for the ids not seen yet.
+    """
+
+    def __init__(self, narrator_service: NarratorService) -> None:
+        self.narrator_service = narrator_service
+        self._loaded: dict[int, dict | None] = {}
+
+    async def load_many(self, narrator_ids: list[int]) -> list[dict | None]:
+        pending = [
+            nid for nid in dict.fromkeys(narrator_ids) if nid not in self._loaded
+        ]
+        if pending:
+            self._loaded.update(
+                await self.narrator_service.get_narrators_by_narrator_ids(pending)
+            )
+        return [self._loaded[nid] for nid in narrator_ids]
@@ -1,44 +1,61 @@
-import re
-
 from bson import ObjectId
 from motor.motor_asyncio import AsyncIOMotorDatabase
 
-from app.schemas.narrator import (
-    JarhWaTadilResponse,
-    NarratorListResponse,
-    NarratorResponse,
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.counting import total_counter
+from app.core.http_cache import CachedBody
+from app.core.normalization import tokens_query
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_query,
 )
+from app.core.serialization import dump_json, narrator_payload
+from app.indexes.registry import SearchIndexes
+from app.schemas.narrator import NarratorResponse
 
+NARRATOR_SORT = [("narrator_id", 1), ("_id", 1)]
 
-def _doc_to_response(doc: dict) -> NarratorResponse:
-    return NarratorResponse(
-        id=str(doc["_id"]),
-        narrator_id=doc["narrator_id"],
-        name=doc["name"],
-        name_plain=doc["name_plain"],
-        kunya=doc.get("kunya", ""),
-        nasab=doc.get("nasab", ""),
-        death_date=doc.get("death_date", ""),
-        tabaqa=doc.get("tabaqa", ""),
-        rank_ibn_hajar=doc.get("rank_ibn_hajar", ""),
-        rank_dhahabi=doc.get("rank_dhahabi", ""),
-        relations=doc.get("relations", ""),
-        jarh_wa_tadil=[
-            JarhWaTadilResponse(
-                scholar=j["scholar"],
-                quotes=j.get("quotes", []),
-            )
-            for j in doc.get("jarh_wa_tadil", [])
-        ],
-    )
+
+def _decode_narrator_cursor(cursor: str) -> list:
+    narrator_id, last_id = decode_cursor(cursor, len(NARRATOR_SORT))
+    if not (
+        isinstance(narrator_id, int)
+        and isinstance(last_id, str)
+        and ObjectId.is_valid(last_id)
+    ):
+        raise InvalidCursorError("Invalid cursor.")
+    return [narrator_id, ObjectId(last_id)]
+
+
+settings = get_settings()
+
+# Serialized detail responses keyed by ObjectId string.
+_detail_cache = TTLCache(
+    maxsize=settings.DETAIL_CACHE_SIZE,
+    ttl=settings.DETAIL_CACHE_TTL_SECONDS,
+)
+
+# Narrator payloads keyed by narrator_id, shared by all requests.
+_record_cache = TTLCache(
+    maxsize=settings.NARRATOR_CACHE_SIZE,
+    ttl=settings.DETAIL_CACHE_TTL_SECONDS,
+)
 
 
 class NarratorService:
     COLLECTION = "narrators"
 
-    def __init__(self, db: AsyncIOMotorDatabase) -> None:
+    def __init__(
+        self,
+        db: AsyncIOMotorDatabase,
+        indexes: SearchIndexes | None = None,
+    ) -> None:
         self.db = db
         self.collection = db[self.COLLECTION]
+        self.indexes = indexes
 
     async def search_narrators(
         self,
@@ -47,28 +64,233 @@ class NarratorService:
         nasab: str | None = None,
         skip: int = 0,
         limit: int = 20,
-    ) -> NarratorListResponse:
-        query: dict = {}
+        cursor: str | None = None,
+        include_total: bool = True,
+        fuzzy: bool = False,
+    ) -> dict:
+        """Search narrators ordered by narrator_id.
+
+        ``skip`` is ignored when a cursor from a previous page is given.
+        With ``include_total=False`` no count is run and ``total`` is
+        ``None``; use ``has_more``. With ``fuzzy`` the name is matched by
+        trigram similarity instead, best match first; those pages are only
+        reached with ``skip``, so a cursor raises ``InvalidCursorError`` and
+        ``next_cursor`` is ``None``.
+
+        Returns a payload in the ``NarratorListResponse`` shape.
+        """
+        if fuzzy and cursor is not None:
+            raise InvalidCursorError("Fuzzy searches are paged with skip, not cursor.")
+        if fuzzy and name_plain and self.indexes is not None and self.indexes.ready:
+            return await self._search_fuzzy(
+                name_plain, kunya, nasab, skip, limit, include_total
+            )
+
+        conditions = []
+        for field, value in (
+            ("name_tokens", name_plain),
+            ("kunya_tokens", kunya),
+            ("nasab_tokens", nasab),
+        ):
+            if value and (condition := tokens_query(field, value, prefix_last=True)):
+                conditions.append(condition)
+        query: dict = {"$and": conditions} if conditions else {}
 
-        if name_plain:
-            query["name_plain"] = {"$regex": re.escape(name_plain), "$options": "i"}
+        total = None
+        if include_total:
+            total = await total_counter.count(self.collection, query)
 
-        if kunya:
-            query["kunya"] = {"$regex": re.escape(kunya), "$options": "i"}
+        page_query = query
+        if cursor is not None:
+            after_query = keyset_query(NARRATOR_SORT, _decode_narrator_cursor(cursor))
+            page_query = {"$and": [query, after_query]} if query else after_query
+            skip = 0
 
-        if nasab:
-            query["nasab"] = {"$regex": re.escape(nasab), "$options": "i"}
+        docs = await (
+            self.collection.find(page_query)
+            .sort(NARRATOR_SORT)
+            .skip(skip)
+            .limit(limit + 1)
+            .max_time_ms(settings.SEARCH_QUERY_TIMEOUT_MS)
+            .to_list(length=limit + 1)
+        )
+        has_more = len(docs) > limit
+        docs = docs[:limit]
+        next_cursor = None
+        # Until the index is ready fuzzy searches land here; keep them on skip.
+        if has_more and not fuzzy:
+            next_cursor = encode_cursor([docs[-1]["narrator_id"], docs[-1]["_id"]])
 
-        total = await self.collection.count_documents(query)
-        cursor = self.collection.find(query).skip(skip).limit(limit)
-        items = [_doc_to_response(doc) async for doc in cursor]
+        return {
+            "items": [narrator_payload(doc) for doc in docs],
+            "total": total,
+            "has_more": has_more,
+            "next_cursor": next_cursor,
+        }
+
+    async def _search_fuzzy(
+        self,
+        name_plain: str,
+        kunya: str | None,
+        nasab: str | None,
+        skip: int,
+        limit: int,
+        include_total: bool,
+    ) -> dict:
+        """Rank narrators by name similarity using the in-memory trigram index.
 
-        return NarratorListResponse(items=items, total=total)
+        kunya/nasab filters are checked with one query over the bounded
+        candidate list; only the requested page is then fetched. The total
+        counts every narrator similar enough to be ranked.
+        """
+        ranked = [
+            narrator_id
+            for narrator_id, _ in self.indexes.narrator_trigrams.search(name_plain)
+        ]
 
-    async def get_narrator_by_id(self, narrator_id: str) -> NarratorResponse | None:
+        conditions = [
+            condition
+            for field, value in (("kunya_tokens", kunya), ("nasab_tokens", nasab))
+            if value and (condition := tokens_query(field, value, prefix_last=True))
+        ]
+        if conditions and ranked:
+            query = {"$and": [{"narrator_id": {"$in": ranked}}, *conditions]}
+            matching = {
+                doc["narrator_id"]
+                async for doc in self.collection.find(
+                    query,
+                    {"narrator_id": 1},
+                    max_time_ms=settings.SEARCH_QUERY_TIMEOUT_MS,
+                )
+            }
+            ranked = [narrator_id for narrator_id in ranked if narrator_id in matching]
+
+        page = ranked[skip : skip + limit]
+        docs = {
+            doc["narrator_id"]: doc
+            async for doc in self.collection.find(
+                {"narrator_id": {"$in": page}},
+                max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+            )
+        }
+        return {
+            "items": [narrator_payload(docs[nid]) for nid in page if nid in docs],
+            "total": len(ranked) if include_total else None,
+            "has_more": skip + limit < len(ranked),
+            "next_cursor": None,
+        }
+
+    async def suggest_narrators(self, q: str, limit: int = 10) -> dict:
+        """Autocomplete narrator names, most cited narrators first.
+
+        Served from the in-memory prefix index without touching MongoDB;
+        until it is ready, falls back to a token-prefix query.
+        Returns a payload in the ``NarratorSuggestResponse`` shape.
+        """
+        if self.indexes is not None and self.indexes.ready:
+            suggestions = self.indexes.narrator_names.suggest(q, limit)
+            return {
+                "items": [
+                    {"narrator_id": narrator_id, "name": name}
+                    for narrator_id, name in suggestions
+                ]
+            }
+
+        # Like the prefix index, match the name, the kunya or the nasab.
+        conditions = [
+            condition
+            for field in ("name_tokens", "kunya_tokens", "nasab_tokens")
+            if (condition := tokens_query(field, q, prefix_last=True))
+        ]
+        if not conditions:
+            return {"items": []}
+        query = {"$or": conditions}
+        docs = (
+            self.collection.find(query, {"narrator_id": 1, "name": 1})
+            .limit(limit)
+            .max_time_ms(settings.SEARCH_QUERY_TIMEOUT_MS)
+        )
+        return {
+            "items": [
+                {"narrator_id": doc["narrator_id"], "name": doc["name"]}
+                async for doc in docs
+            ]
+        }
+
+    async def get_narrator_by_id(self, narrator_id: str) -> dict | None:
         if not ObjectId.is_valid(narrator_id):
             return None
-        doc = await self.collection.find_one({"_id": ObjectId(narrator_id)})
+        doc = await self.collection.find_one(
+            {"_id": ObjectId(narrator_id)},
+            max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+        )
         if doc is None:
             return None
-        return _doc_to_response(doc)
+        return narrator_payload(doc)
+
+    async def get_narrators_by_ids(self, narrator_ids: list[str]) -> dict:
+        """Resolve many ids with one ``$in`` query, keeping request order.
+
+        Returns a payload in the ``NarratorBatchResponse`` shape.
+        """
+        object_ids = {
+            narrator_id: ObjectId(narrator_id)
+            for narrator_id in narrator_ids
+            if ObjectId.is_valid(narrator_id)
+        }
+        docs = {
+            doc["_id"]: doc
+            async for doc in self.collection.find(
+                {"_id": {"$in": list(set(object_ids.values()))}},
+                max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+            )
+        }
+        items = []
+        missing = []
+        for narrator_id in narrator_ids:
+            doc = docs.get(object_ids.get(narrator_id))
+            if doc is None:
+                missing.append(narrator_id)
+                items.append(None)
+            else:
+                items.append(narrator_payload(doc))
+        return {"items": items, "missing": missing}
+
+    async def get_narrators_by_narrator_ids(
+        self, narrator_ids: list[int]
+    ) -> dict[int, dict | None]:
+        """Resolve narrator_ids to payloads, querying only cache misses.
+
+        All misses are fetched with one ``$in`` query on ``narrator_id``.
+        """
+        found: dict[int, dict | None] = {}
+        misses = []
+        for narrator_id in dict.fromkeys(narrator_ids):
+            payload = _record_cache.get(narrator_id)
+            if payload is None:
+                misses.append(narrator_id)
+            found[narrator_id] = payload
+
+        if misses:
+            async for doc in self.collection.find(
+                {"narrator_id": {"$in": misses}},
+                max_time_ms=settings.LOOKUP_QUERY_TIMEOUT_MS,
+            ):
+                payload = narrator_payload(doc)
+                _record_cache.set(doc["narrator_id"], payload)
+                found[doc["narrator_id"]] = payload
+        return found
+
+    async def get_narrator_body(self, narrator_id: str) -> CachedBody | None:
+        """Serialized detail response, served from the detail cache when warm."""
+        if not ObjectId.is_valid(narrator_id):
+            return None
+        key = str(ObjectId(narrator_id))
+        cached = _detail_cache.get(key)
+        if cached is None:
+            narrator = await self.get_narrator_by_id(key)
+            if narrator is None:
+                return None
+            cached = CachedBody.from_bytes(dump_json(narrator, NarratorResponse))
+            _detail_cache.set(key, cached)
+        return cached
@@ -5,9 +5,27 @@ from motor.motor_asyncio import AsyncIOMotorDatabase
 from pymongo import ReturnDocument
 from pymongo.errors import DuplicateKeyError
 
-from app.core.security import DUMMY_HASH, get_password_hash, verify_password
+from app.core.cache import TTLCache
+from app.core.config import get_settings
+from app.core.security import (
+    get_password_hash,
+    verify_dummy_password,
+    verify_password,
+)
 from app.schemas.user import UserCreate, UserResponse, UserUpdate
 
+settings = get_settings()
+
+# Resolved users by id, so authenticated requests skip the users lookup.
+# Only found users are cached; update_user invalidates its entry.
+_user_cache = TTLCache(
+    maxsize=settings.USER_CACHE_SIZE, ttl=settings.USER_CACHE_TTL_SECONDS
+)
+# Incremented after every completed user write. A read only fills the cache
+# if no write completed while it fetched, so it cannot cache a document that
+# a write has already replaced.
+_user_writes = 0
+
 
 def _doc_to_response(doc: dict) -> UserResponse:
     return UserResponse(
@@ -32,7 +50,7 @@ class UserService:
         document = {
             "email": user_in.email,
             "full_name": user_in.full_name,
-            "hashed_password": get_password_hash(user_in.password),
+            "hashed_password": await get_password_hash(user_in.password),
             "is_active": True,
             "created_at": now,
             "updated_at": now,
@@ -50,19 +68,26 @@ class UserService:
     ) -> UserResponse | None:
         doc = await self.collection.find_one({"email": email})
         if doc is None:
-            verify_password(password, DUMMY_HASH)
+            await verify_dummy_password(password)
             return None
-        if not verify_password(password, doc["hashed_password"]):
+        if not await verify_password(password, doc["hashed_password"]):
             return None
         return _doc_to_response(doc)
 
     async def get_user_by_id(self, user_id: str) -> UserResponse | None:
         if not ObjectId.is_valid(user_id):
             return None
+        cached = _user_cache.get(user_id)
+        if cached is not None:
+            return cached
+        writes = _user_writes
         doc = await self.collection.find_one({"_id": ObjectId(user_id)})
         if doc is None:
             return None
-        return _doc_to_response(doc)
+        user = _doc_to_response(doc)
+        if writes == _user_writes:
+            _user_cache.set(user_id, user)
+        return user
 
     async def get_user_by_email(self, email: str) -> UserResponse | None:
         doc = await self.collection.find_one({"email": email})
@@ -73,6 +98,7 @@ class UserService:
     async def update_user(
         self, user_id: str, user_in: UserUpdate
     ) -> UserResponse | None:
+        global _user_writes
         if not ObjectId.is_valid(user_id):
             return None
 
@@ -81,17 +107,23 @@ class UserService:
             return await self.get_user_by_id(user_id)
 
         if "password" in update_data:
-            update_data["hashed_password"] = get_password_hash(
+            update_data["hashed_password"] = await get_password_hash(
                 update_data.pop("password")
             )
 
         update_data["updated_at"] = datetime.now(timezone.utc)
 
-        result = await self.collection.find_one_and_update(
-            {"_id": ObjectId(user_id)},
-            {"$set": update_data},
-            return_document=ReturnDocument.AFTER,
-        )
+        try:
+            result = await self.collection.find_one_and_update(
+                {"_id": ObjectId(user_id)},
+                {"$set": update_data},
+                return_document=ReturnDocument.AFTER,
+            )
+        finally:
+            # Invalidate once the write is done (or its outcome is unknown):
+            # earlier, a concurrent read could cache the old document again.
+            _user_writes += 1
+            _user_cache.pop(user_id)
         if result is None:
             return None
         return _doc_to_response(result)
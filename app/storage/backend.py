@@ -0,0 +1,380 @@
+import asyncio
+import time
+from collections.abc import Iterator, Sequence
+
+from bson import ObjectId
+from motor.motor_asyncio import AsyncIOMotorDatabase
+from pymongo.errors import ExecutionTimeout
+
+from app.core.database import database
+from app.core.pagination import keyset_query
+from app.storage.query import matches, project, run_pipeline, sort_documents
+from app.storage.snapshot import Snapshot, SnapshotData
+
+# Documents decoded between yields to the event loop while scanning.
+SCAN_YIELD_EVERY = 500
+
+
+def _conjuncts(query: dict) -> list[dict]:
+    conjuncts = []
+    for key, value in query.items():
+        if key == "$and":
+            for sub in value:
+                conjuncts.extend(_conjuncts(sub))
+        else:
+            conjuncts.append({key: value})
+    return conjuncts
+
+
+def _deadline(max_time_ms: int | None) -> float | None:
+    return None if not max_time_ms else time.monotonic() + max_time_ms / 1000
+
+
+def _check_deadline(deadline: float | None) -> None:
+    """Fail like a MongoDB query that ran past its ``maxTimeMS``."""
+    if deadline is not None and time.monotonic() > deadline:
+        raise ExecutionTimeout("operation exceeded time limit", code=50)
+
+
+def _as_list(condition) -> list | None:
+    """Values an equality or ``$in`` condition accepts, else ``None``."""
+    if isinstance(condition, dict):
+        if set(condition) == {"$in"}:
+            return list(condition["$in"])
+        if set(condition) == {"$eq"}:
+            return [condition["$eq"]]
+        return None
+    return [condition]
+
+
+class SnapshotCollection:
+    """Read-only stand-in for a Motor collection, served from a snapshot.
+
+    Supports the read calls the services make. Filters are planned against
+    the snapshot's key arrays (``_id``, the leading sort field, keyset
+    cursors and array paths such as ``narrators.id``); whatever the plan does
+    not settle is checked on the decoded documents.
+    """
+
+    def __init__(self, data: SnapshotData) -> None:
+        self.data = data
+        self.name = data.name
+
+    def find(
+        self,
+        filter: dict | None = None,
+        projection: dict | None = None,
+        batch_size: int | None = None,
+        max_time_ms: int | None = None,
+    ) -> "SnapshotCursor":
+        cursor = SnapshotCursor(self, filter or {}, projection)
+        return cursor.max_time_ms(max_time_ms)
+
+    async def find_one(
+        self,
+        filter: dict | None = None,
+        projection: dict | None = None,
+        max_time_ms: int | None = None,
+    ) -> dict | None:
+        cursor = self.find(filter, projection, max_time_ms=max_time_ms).limit(1)
+        docs = await cursor.to_list(length=1)
+        return docs[0] if docs else None
+
+    async def count_documents(self, filter: dict, maxTimeMS: int | None = None) -> int:
+        positions, exact = self.plan(filter)
+        if exact:
+            return len(positions)
+        count = 0
+        for count, _ in enumerate(
+            self._matching(positions, filter, _deadline(maxTimeMS)), 1
+        ):
+            if count % SCAN_YIELD_EVERY == 0:
+                await asyncio.sleep(0)
+        return count
+
+    async def estimated_document_count(self, maxTimeMS: int | None = None) -> int:
+        return self.data.count
+
+    def aggregate(
+        self,
+        pipeline: list[dict],
+        maxTimeMS: int | None = None,
+        allowDiskUse: bool = False,
+    ) -> "SnapshotAggregation":
+        return SnapshotAggregation(self, pipeline, maxTimeMS)
+
+    def plan(self, query: dict) -> tuple[Sequence[int], bool]:
+        """Candidate positions in sort order, and whether they are exact.
+
+        Every plannable conjunct narrows the candidates; they are exact when
+        all conjuncts could be planned, so no document has to be checked.
+        """
+        conjuncts = _conjuncts(query)
+        plans = [self._plan_one(conjunct) for conjunct in conjuncts]
+        planned = sorted((p for p in plans if p is not None), key=len)
+        if not planned:
+            return range(self.data.count), not conjuncts
+
+        best = planned[0]
+        for other in planned[1:]:
+            if isinstance(best, range) and isinstance(other, range):
+                best = range(max(best.start, other.start), min(best.stop, other.stop))
+            elif isinstance(other, range):
+                best = [p for p in best if p in other]
+            else:
+                keep = set(other)
+                best = [p for p in best if p in keep]
+        return best, len(planned) == len(conjuncts)
+
+    def _plan_one(self, conjunct: dict) -> Sequence[int] | None:
+        data = self.data
+        key, condition = next(iter(conjunct.items()))
+        if key == "_id":
+            values = _as_list(condition)
+            if values is None:
+                return None
+            positions = {data.position_of(v) for v in values if isinstance(v, ObjectId)}
+            positions.discard(None)
+            return sorted(positions)
+        if key == data.sort[0][0] and key != "_id":
+            values = _as_list(condition)
+            if values is None or not all(isinstance(v, int) for v in values):
+                return None
+            if len(values) == 1:
+                return data.key_range(values[0])
+            positions = []
+            for value in sorted(set(values)):
+                positions.extend(data.key_range(value))
+            return positions
+        if key in data.multi:
+            if isinstance(condition, dict) and set(condition) == {"$all"}:
+                required = list(dict.fromkeys(condition["$all"]))
+                if not required or not all(isinstance(v, int) for v in required):
+                    return None
+                postings = data.postings(key)
+                lists = sorted((postings.get(v, ()) for v in required), key=len)
+                common = set(lists[0])
+                for other in lists[1:]:
+                    common.intersection_update(other)
+                return sorted(common)
+            values = _as_list(condition)
+            if values is None or not all(isinstance(v, int) for v in values):
+                return None
+            postings = data.postings(key)
+            return sorted({p for v in values for p in postings.get(v, ())})
+        if key == "$or":
+            return self._plan_keyset(condition)
+        return None
+
+    def _plan_keyset(self, branches: list) -> Sequence[int] | None:
+        """Recognize the filter built by ``keyset_query`` for the native sort."""
+        sort = self.data.sort
+        if len(branches) != len(sort) or not all(isinstance(b, dict) for b in branches):
+            return None
+        last = branches[-1]
+        try:
+            values = [last[field] for field, _ in sort[:-1]]
+            values.append(last[sort[-1][0]]["$gt"])
+        except (KeyError, TypeError):
+            return None
+        if keyset_query(sort, values) != {"$or": branches}:
+            return None
+        try:
+            start = self.data.after(tuple(values))
+        except TypeError:
+            return None
+        return range(start, self.data.count)
+
+    def _matching(
+        self,
+        positions: Sequence[int],
+        query: dict,
+        deadline: float | None = None,
+    ) -> Iterator[dict]:
+        for checked, position in enumerate(positions, 1):
+            if checked % SCAN_YIELD_EVERY == 0:
+                _check_deadline(deadline)
+            doc = self.data.document(position)
+            if matches(doc, query):
+                yield doc
+
+
+class SnapshotCursor:
+    """Lazy cursor over a ``SnapshotCollection`` with Motor's chaining API."""
+
+    def __init__(
+        self,
+        collection: SnapshotCollection,
+        filter: dict,
+        projection: dict | None,
+    ) -> None:
+        self.collection = collection
+        self.filter = filter
+        self.projection = projection
+        self._sort: list[tuple[str, int]] | None = None
+        self._skip = 0
+        self._limit = 0
+        self._max_time_ms: int | None = None
+
+    def sort(self, key_or_list, direction: int | None = None) -> "SnapshotCursor":
+        if isinstance(key_or_list, str):
+            key_or_list = [(key_or_list, direction or 1)]
+        self._sort = [tuple(item) for item in key_or_list]
+        return self
+
+    def skip(self, skip: int) -> "SnapshotCursor":
+        self._skip = skip
+        return self
+
+    def limit(self, limit: int) -> "SnapshotCursor":
+        self._limit = limit
+        return self
+
+    def max_time_ms(self, max_time_ms: int | None) -> "SnapshotCursor":
+        self._max_time_ms = max_time_ms
+        return self
+
+    def batch_size(self, batch_size: int) -> "SnapshotCursor":
+        return self
+
+    def allow_disk_use(self, allow_disk_use: bool) -> "SnapshotCursor":
+        return self
+
+    async def close(self) -> None:
+        pass
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        docs = []
+        async for doc in self:
+            docs.append(doc)
+            if length is not None and len(docs) >= length:
+                break
+        return docs
+
+    def _sorted(self, positions: Sequence[int], deadline: float | None) -> list[dict]:
+        docs = list(self.collection._matching(positions, self.filter, deadline))
+        return sort_documents(docs, self._sort)
+
+    async def __aiter__(self):
+        collection = self.collection
+        deadline = _deadline(self._max_time_ms)
+        positions, exact = collection.plan(self.filter)
+        native = self._sort is None or self._sort == collection.data.sort
+
+        if not native:
+            # Non-native orders are rare here; sort the matches in memory, off
+            # the event loop since every match is decoded.
+            docs = await asyncio.to_thread(self._sorted, positions, deadline)
+            end = self._skip + self._limit if self._limit else None
+            for doc in docs[self._skip : end]:
+                yield project(doc, self.projection)
+            return
+
+        if exact:
+            end = self._skip + self._limit if self._limit else None
+            selected = positions[self._skip : end]
+            docs = (collection.data.document(p) for p in selected)
+            skip = 0
+        else:
+            docs = collection._matching(positions, self.filter, deadline)
+            skip = self._skip
+
+        produced = 0
+        for scanned, doc in enumerate(docs, 1):
+            if scanned % SCAN_YIELD_EVERY == 0:
+                _check_deadline(deadline)
+                await asyncio.sleep(0)
+            if skip:
+                skip -= 1
+                continue
+            yield project(doc, self.projection)
+            produced += 1
+            if self._limit and produced >= self._limit:
+                return
+
+
+class SnapshotAggregation:
+    """Result of ``SnapshotCollection.aggregate``, evaluated when consumed.
+
+    A leading ``$match`` is planned like a ``find``; the remaining stages
+    run in memory on the matching documents. The whole evaluation runs in a
+    worker thread, as it decodes every match.
+    """
+
+    def __init__(
+        self,
+        collection: SnapshotCollection,
+        pipeline: list[dict],
+        max_time_ms: int | None,
+    ) -> None:
+        self.collection = collection
+        self.pipeline = pipeline
+        self.max_time_ms = max_time_ms
+
+    async def to_list(self, length: int | None = None) -> list[dict]:
+        docs = await asyncio.to_thread(self._run)
+        return docs if length is None else docs[:length]
+
+    def _run(self) -> list[dict]:
+        stages = self.pipeline
+        query = {}
+        if stages and "$match" in stages[0]:
+            query, stages = stages[0]["$match"], stages[1:]
+        collection = self.collection
+        positions, _ = collection.plan(query)
+        docs = collection._matching(positions, query, _deadline(self.max_time_ms))
+        return run_pipeline(list(docs), stages)
+
+    async def __aiter__(self):
+        for doc in await self.to_list():
+            yield doc
+
+
+class SnapshotDatabase:
+    """Maps collection names to ``SnapshotCollection`` objects."""
+
+    def __init__(self, snapshot: Snapshot) -> None:
+        self._collections = {
+            name: SnapshotCollection(data)
+            for name, data in snapshot.collections.items()
+        }
+
+    def __getitem__(self, name: str) -> SnapshotCollection:
+        try:
+            return self._collections[name]
+        except KeyError:
+            raise KeyError(f"Collection {name!r} is not in the snapshot.") from None
+
+    def __getattr__(self, name: str) -> SnapshotCollection:
+        if name.startswith("_"):
+            raise AttributeError(name)
+        return self[name]
+
+
+class CorpusSnapshot:
+    """Holds the mapped snapshot when ``STORAGE_BACKEND`` is ``snapshot``."""
+
+    snapshot: Snapshot | None = None
+    db: SnapshotDatabase | None = None
+
+    def open(self, path: str) -> None:
+        self.snapshot = Snapshot(path)
+        self.db = SnapshotDatabase(self.snapshot)
+
+    def close(self) -> None:
+        if self.snapshot is not None:
+            self.db = None
+            self.snapshot.close()
+            self.snapshot = None
+
+
+corpus_snapshot = CorpusSnapshot()
+
+
+async def get_corpus_database() -> AsyncIOMotorDatabase | SnapshotDatabase:
+    """Database serving hadiths and narrators: the snapshot, or MongoDB."""
+    if corpus_snapshot.db is not None:
+        return corpus_snapshot.db
+    if database.corpus_db is None:
+        raise RuntimeError("Database not initialized. Check lifespan events.")
+    return database.corpus_db
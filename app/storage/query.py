@@ -0,0 +1,380 @@
+import re
+from collections.abc import Iterator
+
+
+class UnsupportedQueryError(ValueError):
+    pass
+
+
+def _path_values(doc: dict, path: str) -> Iterator:
+    """Values at a dotted path, descending into arrays like MongoDB does.
+
+    A terminal array yields each element and then the array itself, so both
+    element and whole-array comparisons can match.
+    """
+    current = [doc]
+    for part in path.split("."):
+        following = []
+        for value in current:
+            if isinstance(value, list):
+                following.extend(
+                    item[part]
+                    for item in value
+                    if isinstance(item, dict) and part in item
+                )
+            elif isinstance(value, dict) and part in value:
+                following.append(value[part])
+        current = following
+    for value in current:
+        if isinstance(value, list):
+            yield from value
+        yield value
+
+
+def _compare(op: str, left, right) -> bool:
+    try:
+        if op == "$gt":
+            return left > right
+        if op == "$gte":
+            return left >= right
+        if op == "$lt":
+            return left < right
+        return left <= right
+    except TypeError:
+        # MongoDB only compares values of the same type.
+        return False
+
+
+def _match_operators(values: list, operators: dict) -> bool:
+    # A missing field equals null, as in MongoDB.
+    present = values or [None]
+    for op, operand in operators.items():
+        if op == "$eq":
+            ok = operand in present
+        elif op == "$ne":
+            ok = operand not in present
+        elif op == "$in":
+            ok = any(value in present for value in operand)
+        elif op == "$nin":
+            ok = not any(value in present for value in operand)
+        elif op == "$all":
+            ok = bool(operand) and all(value in values for value in operand)
+        elif op in ("$gt", "$gte", "$lt", "$lte"):
+            ok = any(_compare(op, value, operand) for value in values)
+        elif op == "$regex":
+            flags = re.IGNORECASE if "i" in operators.get("$options", "") else 0
+            pattern = re.compile(operand, flags)
+            ok = any(isinstance(v, str) and pattern.search(v) for v in values)
+        elif op == "$options":
+            continue
+        elif op == "$exists":
+            ok = bool(values) == bool(operand)
+        else:
+            raise UnsupportedQueryError(f"Unsupported query operator {op}.")
+        if not ok:
+            return False
+    return True
+
+
+def matches(doc: dict, query: dict) -> bool:
+    """Evaluate a MongoDB filter against a decoded document."""
+    for key, condition in query.items():
+        if key == "$and":
+            ok = all(matches(doc, sub) for sub in condition)
+        elif key == "$or":
+            ok = any(matches(doc, sub) for sub in condition)
+        elif key == "$nor":
+            ok = not any(matches(doc, sub) for sub in condition)
+        elif key == "$expr":
+            ok = bool(evaluate(condition, doc))
+        elif key.startswith("$"):
+            raise UnsupportedQueryError(f"Unsupported query operator {key}.")
+        else:
+            values = list(_path_values(doc, key))
+            if isinstance(condition, dict) and any(
+                op.startswith("$") for op in condition
+            ):
+                ok = _match_operators(values, condition)
+            else:
+                ok = condition in (values or [None])
+        if not ok:
+            return False
+    return True
+
+
+def _field(doc: dict, path: str):
+    value = doc
+    for part in path.split("."):
+        if isinstance(value, list):
+            value = [
+                item[part] for item in value if isinstance(item, dict) and part in item
+            ]
+        elif isinstance(value, dict):
+            value = value.get(part)
+        else:
+            return None
+    return value
+
+
+def evaluate(expression, doc: dict, variables: dict | None = None):
+    """Evaluate the aggregation expressions the services use in projections.
+
+    Supports field paths, ``$$variables`` and a small set of operators;
+    anything else raises ``UnsupportedQueryError``.
+    """
+    variables = variables or {}
+    if isinstance(expression, str) and expression.startswith("$$"):
+        name, _, rest = expression[2:].partition(".")
+        value = variables[name]
+        return _field(value, rest) if rest else value
+    if isinstance(expression, str) and expression.startswith("$"):
+        return _field(doc, expression[1:])
+    if isinstance(expression, list):
+        return [evaluate(item, doc, variables) for item in expression]
+    if not isinstance(expression, dict):
+        return expression
+    if len(expression) != 1 or not next(iter(expression)).startswith("$"):
+        return {
+            key: evaluate(value, doc, variables) for key, value in expression.items()
+        }
+
+    op, operand = next(iter(expression.items()))
+    if op == "$literal":
+        return operand
+    if op == "$let":
+        bound = {
+            **variables,
+            **{k: evaluate(v, doc, variables) for k, v in operand["vars"].items()},
+        }
+        return evaluate(operand["in"], doc, bound)
+    if op == "$map":
+        items = evaluate(operand["input"], doc, variables)
+        if items is None:
+            return None
+        name = operand.get("as", "this")
+        return [
+            evaluate(operand["in"], doc, {**variables, name: item}) for item in items
+        ]
+    if op == "$reduce":
+        items = evaluate(operand["input"], doc, variables)
+        if items is None:
+            return None
+        value = evaluate(operand["initialValue"], doc, variables)
+        for item in items:
+            value = evaluate(
+                operand["in"], doc, {**variables, "value": value, "this": item}
+            )
+        return value
+    if op == "$cond":
+        if isinstance(operand, dict):
+            operand = [operand["if"], operand["then"], operand["else"]]
+        condition, then, otherwise = operand
+        branch = then if evaluate(condition, doc, variables) else otherwise
+        return evaluate(branch, doc, variables)
+
+    args = evaluate(operand, doc, variables)
+    if op == "$and":
+        return all(args)
+    if op == "$or":
+        return any(args)
+    if op == "$not":
+        return not args[0]
+    if op == "$eq":
+        return args[0] == args[1]
+    if op == "$ne":
+        return args[0] != args[1]
+    if op in ("$gt", "$gte", "$lt", "$lte"):
+        return _compare(op, args[0], args[1])
+    if op in ("$add", "$subtract"):
+        if any(arg is None for arg in args):
+            return None
+        return sum(args) if op == "$add" else args[0] - args[1]
+    if op == "$max":
+        return max((a for a in args if a is not None), default=None)
+    if op == "$min":
+        return min((a for a in args if a is not None), default=None)
+    if op == "$indexOfArray":
+        array, value = args[0], args[1]
+        if array is None:
+            return None
+        start = args[2] if len(args) > 2 else 0
+        return next((i for i in range(start, len(array)) if array[i] == value), -1)
+    if op == "$in":
+        return args[0] in args[1]
+    if op == "$size":
+        return len(args[0] if isinstance(operand, list) else args)
+    if op == "$range":
+        return list(range(*args))
+    if op == "$slice":
+        array, *bounds = args
+        if array is None:
+            return None
+        if len(bounds) == 1:
+            count = bounds[0]
+            return array[:count] if count >= 0 else array[count:]
+        position, count = bounds
+        if position < 0:
+            position = max(len(array) + position, 0)
+        return array[position : position + count]
+    if op == "$indexOfCP":
+        return None if args[0] is None else args[0].find(args[1])
+    if op == "$substrCP":
+        text, start, count = args
+        return "" if text is None else text[start : start + count]
+    if op == "$strLenCP":
+        return len(args[0] if isinstance(args, list) else args)
+    if op == "$ifNull":
+        return next((arg for arg in args if arg is not None), args[-1])
+    if op == "$arrayElemAt":
+        array, index = args
+        if array is None or not -len(array) <= index < len(array):
+            return None
+        return array[index]
+    if op == "$regexFind":
+        if args["input"] is None:
+            return None
+        flags = re.IGNORECASE if "i" in args.get("options", "") else 0
+        found = re.search(args["regex"], args["input"], flags)
+        if found is None:
+            return None
+        return {
+            "match": found[0],
+            "idx": found.start(),
+            "captures": list(found.groups()),
+        }
+    raise UnsupportedQueryError(f"Unsupported expression operator {op}.")
+
+
+def _include(value, tree):
+    if tree is True:
+        return value
+    if isinstance(value, list):
+        return [_include(item, tree) for item in value if isinstance(item, dict)]
+    if isinstance(value, dict):
+        return {
+            key: _include(value[key], subtree)
+            for key, subtree in tree.items()
+            if key in value
+        }
+    return value
+
+
+def project(doc: dict, projection: dict | None) -> dict:
+    """Apply an inclusion, exclusion or computed-field projection."""
+    if not projection:
+        return doc
+    include_id = projection.get("_id", 1) not in (0, False)
+    fields = {k: v for k, v in projection.items() if k != "_id"}
+    if fields and all(v in (0, False) for v in fields.values()):
+        if any("." in field for field in fields):
+            raise UnsupportedQueryError("Only top-level fields can be excluded.")
+        excluded = set(fields) | (set() if include_id else {"_id"})
+        return {k: v for k, v in doc.items() if k not in excluded}
+
+    tree: dict = {}
+    computed = {}
+    for path, spec in fields.items():
+        if spec in (1, True):
+            *parents, leaf = path.split(".")
+            node = tree
+            for part in parents:
+                child = node.setdefault(part, {})
+                if child is True:
+                    break
+                node = child
+            else:
+                node[leaf] = True
+        else:
+            computed[path] = spec
+
+    result = {"_id": doc["_id"]} if include_id and "_id" in doc else {}
+    result.update(_include(doc, tree))
+    for path, spec in computed.items():
+        result[path] = evaluate(spec, doc)
+    return result
+
+
+def sort_documents(docs: list[dict], sort: list[tuple[str, int]]) -> list[dict]:
+    """Sort like MongoDB on fields of one type, with null and missing first."""
+    for field, direction in reversed(sort):
+        docs.sort(
+            key=lambda doc: (
+                (value := _field(doc, field)) is not None,
+                value,
+            ),
+            reverse=direction == -1,
+        )
+    return docs
+
+
+def _group(docs: list[dict], spec: dict) -> list[dict]:
+    groups: dict = {}
+    for doc in docs:
+        key = evaluate(spec["_id"], doc)
+        hashable = tuple(sorted(key.items())) if isinstance(key, dict) else key
+        group = groups.get(hashable)
+        if group is None:
+            group = groups[hashable] = {"_id": key}
+            for field, accumulator in spec.items():
+                if field != "_id":
+                    op = next(iter(accumulator))
+                    group[field] = 0 if op == "$sum" else evaluate(accumulator[op], doc)
+        for field, accumulator in spec.items():
+            if field == "_id":
+                continue
+            op, operand = next(iter(accumulator.items()))
+            if op == "$sum":
+                group[field] += evaluate(operand, doc)
+            elif op != "$first":
+                raise UnsupportedQueryError(f"Unsupported accumulator {op}.")
+    return list(groups.values())
+
+
+def _unwind(docs: list[dict], path: str) -> list[dict]:
+    field = path.removeprefix("$")
+    if "." in field:
+        raise UnsupportedQueryError("Only top-level fields can be unwound.")
+    unwound = []
+    for doc in docs:
+        value = doc.get(field)
+        if isinstance(value, list):
+            unwound.extend({**doc, field: item} for item in value)
+        elif value is not None:
+            unwound.append(doc)
+    return unwound
+
+
+def run_pipeline(docs: list[dict], pipeline: list[dict]) -> list[dict]:
+    """Apply aggregation stages to already decoded documents.
+
+    Covers the stages the services use for facet counts; anything else
+    raises ``UnsupportedQueryError``.
+    """
+    for stage in pipeline:
+        op, spec = next(iter(stage.items()))
+        if op == "$match":
+            docs = [doc for doc in docs if matches(doc, spec)]
+        elif op == "$project":
+            docs = [project(doc, spec) for doc in docs]
+        elif op == "$sort":
+            docs = sort_documents(docs, list(spec.items()))
+        elif op == "$skip":
+            docs = docs[spec:]
+        elif op == "$limit":
+            docs = docs[:spec]
+        elif op == "$count":
+            docs = [{spec: len(docs)}] if docs else []
+        elif op == "$group":
+            docs = _group(docs, spec)
+        elif op == "$unwind":
+            docs = _unwind(docs, spec)
+        elif op == "$facet":
+            docs = [
+                {
+                    name: run_pipeline(list(docs), stages)
+                    for name, stages in spec.items()
+                }
+            ]
+        else:
+            raise UnsupportedQueryError(f"Unsupported pipeline stage {op}.")
+    return docs
@@ -0,0 +1,286 @@
+import json
+import mmap
+import os
+import shutil
+import struct
+import tempfile
+from array import array
+from bisect import bisect_left, bisect_right
+from collections.abc import AsyncIterable
+from pathlib import Path
+
+import bson
+from bson import ObjectId
+
+# File layout (integers in native byte order, little-endian on x86/ARM):
+#
+#   MAGIC | u32 header length | JSON header | padding | sections...
+#
+# The header describes each collection: its document count, sort order and
+# the (offset, length) of every section, relative to the first byte after
+# the padded header. Sections are 8-byte aligned so they can be viewed as
+# typed arrays straight from the mapping:
+#
+#   offsets      u64[n + 1]  document i is blob[offsets[i]:offsets[i + 1]]
+#   blob         BSON documents in sort order
+#   ids          12-byte ObjectIds in sort order
+#   id_order     u32[n]      positions sorted by ObjectId, for _id lookups
+#   key:<field>  i64[n]      each non-_id sort field
+#   multi:<path> u64[n + 1] offsets into i64 values, for array paths such as
+#                            narrators.id (values:<path>)
+MAGIC = b"IASNAP01"
+ALIGN = 8
+
+
+def _align(size: int) -> int:
+    return -size % ALIGN
+
+
+class SnapshotFormatError(ValueError):
+    pass
+
+
+class _CollectionWriter:
+    def __init__(
+        self,
+        name: str,
+        sort: list[tuple[str, int]],
+        multi_paths: list[str],
+        directory: str,
+    ) -> None:
+        self.name = name
+        self.sort = sort
+        self.key_fields = [field for field, _ in sort if field != "_id"]
+        self.multi_paths = multi_paths
+        self.blob = tempfile.TemporaryFile(dir=directory)
+        self.offsets = array("Q", [0])
+        self.ids = bytearray()
+        self.keys = {field: array("q") for field in self.key_fields}
+        self.multi_offsets = {path: array("Q", [0]) for path in multi_paths}
+        self.multi_values = {path: array("q") for path in multi_paths}
+        self._last_key: tuple | None = None
+
+    def add(self, doc: dict) -> None:
+        key = tuple(doc[field] for field, _ in self.sort)
+        if self._last_key is not None and key <= self._last_key:
+            raise ValueError(f"{self.name} documents must arrive in sort order.")
+        self._last_key = key
+
+        data = bson.encode(doc)
+        self.blob.write(data)
+        self.offsets.append(self.offsets[-1] + len(data))
+        self.ids += doc["_id"].binary
+        for field in self.key_fields:
+            self.keys[field].append(doc[field])
+        for path in self.multi_paths:
+            head, _, tail = path.partition(".")
+            values = [
+                item[tail]
+                for item in doc.get(head, [])
+                if isinstance(item, dict) and tail in item
+            ]
+            self.multi_values[path].extend(values)
+            self.multi_offsets[path].append(len(self.multi_values[path]))
+
+    def sections(self) -> list[tuple[str, object]]:
+        count = len(self.offsets) - 1
+        id_order = sorted(range(count), key=lambda i: self.ids[i * 12 : i * 12 + 12])
+        sections: list[tuple[str, object]] = [
+            ("offsets", self.offsets),
+            ("blob", self.blob),
+            ("ids", bytes(self.ids)),
+            ("id_order", array("I", id_order)),
+        ]
+        sections += [(f"key:{field}", self.keys[field]) for field in self.key_fields]
+        for path in self.multi_paths:
+            sections.append((f"multi:{path}", self.multi_offsets[path]))
+            sections.append((f"values:{path}", self.multi_values[path]))
+        return sections
+
+
+class SnapshotWriter:
+    """Writes collections into a snapshot file, atomically on ``close``."""
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._collections: list[_CollectionWriter] = []
+
+    async def add_collection(
+        self,
+        name: str,
+        docs: AsyncIterable[dict],
+        sort: list[tuple[str, int]],
+        multi_paths: list[str] | None = None,
+    ) -> int:
+        """Append every document of ``docs``, which must follow ``sort``."""
+        if any(direction != 1 for _, direction in sort):
+            raise ValueError("Snapshot sort orders must be ascending.")
+        writer = _CollectionWriter(name, sort, multi_paths or [], str(self.path.parent))
+        self._collections.append(writer)
+        async for doc in docs:
+            writer.add(doc)
+        return len(writer.offsets) - 1
+
+    def close(self) -> None:
+        header: dict = {"version": 1, "collections": {}}
+        layout: list[tuple[int, object]] = []
+        position = 0
+        for writer in self._collections:
+            entry = {
+                "count": len(writer.offsets) - 1,
+                "sort": writer.sort,
+                "multi_paths": writer.multi_paths,
+                "sections": {},
+            }
+            for section, data in writer.sections():
+                if hasattr(data, "seek"):
+                    data.seek(0, os.SEEK_END)
+                    size = data.tell()
+                elif isinstance(data, array):
+                    size = len(data) * data.itemsize
+                else:
+                    size = len(data)
+                entry["sections"][section] = [position, size]
+                layout.append((position, data))
+                position += size + _align(size)
+            header["collections"][writer.name] = entry
+
+        encoded = json.dumps(header).encode()
+        prefix = MAGIC + struct.pack("<I", len(encoded)) + encoded
+        prefix += b"\0" * _align(len(prefix))
+
+        tmp = self.path.with_name(self.path.name + ".tmp")
+        with tmp.open("wb") as f:
+            f.write(prefix)
+            for _, data in layout:
+                if hasattr(data, "seek"):
+                    data.seek(0)
+                    shutil.copyfileobj(data, f)
+                    data.close()
+                else:
+                    f.write(data)
+                f.write(b"\0" * _align(f.tell()))
+        # Readers that already mapped the old file keep their inode.
+        os.replace(tmp, self.path)
+
+
+class SnapshotData:
+    """Zero-copy view of one collection inside a mapped snapshot."""
+
+    def __init__(self, view: memoryview, name: str, entry: dict) -> None:
+        self.name = name
+        self.count: int = entry["count"]
+        self.sort = [tuple(item) for item in entry["sort"]]
+        self.key_fields = [field for field, _ in self.sort if field != "_id"]
+        self.multi_paths: list[str] = entry["multi_paths"]
+
+        self._views: list[memoryview] = []
+
+        def section(section_name: str, fmt: str | None = None) -> memoryview:
+            start, size = entry["sections"][section_name]
+            data = view[start : start + size]
+            self._views.append(data)
+            if fmt:
+                data = data.cast(fmt)
+                self._views.append(data)
+            return data
+
+        self.offsets = section("offsets", "Q")
+        self.blob = section("blob")
+        self.ids = section("ids")
+        self.id_order = section("id_order", "I")
+        self.keys = {field: section(f"key:{field}", "q") for field in self.key_fields}
+        self.multi = {
+            path: (section(f"multi:{path}", "Q"), section(f"values:{path}", "q"))
+            for path in self.multi_paths
+        }
+        # Built up front: planning a query must not stall on a corpus scan.
+        self._postings = {path: self._build_postings(path) for path in self.multi}
+
+    def document(self, position: int) -> dict:
+        start, end = self.offsets[position], self.offsets[position + 1]
+        return bson.decode(self.blob[start:end])
+
+    def id_at(self, position: int) -> bytes:
+        return bytes(self.ids[position * 12 : position * 12 + 12])
+
+    def position_of(self, object_id: ObjectId) -> int | None:
+        target = object_id.binary
+        i = bisect_left(
+            range(self.count), target, key=lambda k: self.id_at(self.id_order[k])
+        )
+        if i < self.count and self.id_at(self.id_order[i]) == target:
+            return self.id_order[i]
+        return None
+
+    def sort_key(self, position: int) -> tuple:
+        return tuple(
+            ObjectId(self.id_at(position))
+            if field == "_id"
+            else self.keys[field][position]
+            for field, _ in self.sort
+        )
+
+    def key_range(self, value: int) -> range:
+        """Positions whose leading sort field equals ``value``."""
+        leading = self.keys[self.sort[0][0]]
+        start = bisect_left(leading, value)
+        return range(start, bisect_right(leading, value, lo=start))
+
+    def after(self, key: tuple) -> int:
+        """First position whose full sort key is greater than ``key``."""
+        return bisect_right(range(self.count), key, key=self.sort_key)
+
+    def postings(self, path: str) -> dict[int, array]:
+        """Value -> sorted positions for an array path."""
+        return self._postings[path]
+
+    def _build_postings(self, path: str) -> dict[int, array]:
+        offsets, values = self.multi[path]
+        postings: dict[int, array] = {}
+        for position in range(self.count):
+            for value in set(values[offsets[position] : offsets[position + 1]]):
+                postings.setdefault(value, array("I")).append(position)
+        return postings
+
+    def release(self) -> None:
+        for view in reversed(self._views):
+            view.release()
+        self._views.clear()
+
+
+class Snapshot:
+    """A read-only snapshot file mapped into memory.
+
+    The mapping is shared through the page cache, so every worker process
+    that opens the same file reads the same physical pages. Opening builds
+    the array-path postings in one pass over the corpus; open it off the
+    event loop.
+    """
+
+    def __init__(self, path: str | Path) -> None:
+        self.path = Path(path)
+        with self.path.open("rb") as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        view = memoryview(self._mmap)
+        if view[: len(MAGIC)] != MAGIC:
+            raise SnapshotFormatError(f"{self.path} is not a corpus snapshot.")
+        (length,) = struct.unpack_from("<I", view, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(bytes(view[start : start + length]))
+        if header.get("version") != 1:
+            raise SnapshotFormatError(f"Unsupported snapshot version in {self.path}.")
+        data_start = start + length + _align(start + length)
+        self._view = view[data_start:]
+        self.collections = {
+            name: SnapshotData(self._view, name, entry)
+            for name, entry in header["collections"].items()
+        }
+
+    def close(self) -> None:
+        for data in self.collections.values():
+            data.release()
+        self.collections.clear()
+        self._view.release()
+        self._mmap.close()
@@ -0,0 +1,102 @@
+"""Latency and throughput of the public endpoints against a synthetic corpus.
+
+Usage: python -m benchmarks.endpoints [--backend snapshot|mongodb]
+           [--hadiths 20000] [--narrators 3000] [--requests 200]
+           [--concurrency 8] [--scenario NAME ...]
+           [--save FILE] [--compare FILE] [--threshold 0.2]
+
+The app runs in-process behind an ASGI transport, so the numbers cover
+routing, services, indexes and serialization but not the network. With
+the default snapshot backend no database is needed: the corpus is written
+to a temporary snapshot file and served the way STORAGE_BACKEND=snapshot
+serves it in production. --backend mongodb loads the same corpus into a
+throwaway database on --mongodb-url and drops it afterwards.
+
+--save writes the results as a baseline; --compare prints the change
+against one and exits with status 1 if any scenario's p99 grew by more
+than --threshold, so the suite can gate a change in CI.
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+
+
+async def main(args: argparse.Namespace) -> int:
+    from benchmarks.endpoints import report
+    from benchmarks.endpoints.backends import MongoBackend, SnapshotBackend
+    from benchmarks.endpoints.corpus import generate_corpus
+
+    if args.backend == "snapshot":
+        backend = SnapshotBackend()
+    else:
+        backend = MongoBackend(args.mongodb_url, keep=args.keep)
+    # Settings are read once on first import, so configure before loading app code.
+    os.environ.update(backend.environment())
+    os.environ["SEARCH_INDEX_ENABLED"] = "false" if args.no_index else "true"
+
+    corpus = generate_corpus(args.hadiths, args.narrators, seed=args.seed)
+    await backend.load(corpus)
+    try:
+        from benchmarks.endpoints.driver import drive
+
+        results = await drive(
+            corpus,
+            requests=args.requests,
+            concurrency=args.concurrency,
+            warmup=args.warmup,
+            selected=args.scenario,
+            seed=args.seed,
+        )
+    finally:
+        await backend.cleanup()
+
+    summary = report.summarize(results)
+    baseline = report.load(args.compare) if args.compare else None
+    print(
+        f"backend={backend.name} hadiths={args.hadiths} narrators={args.narrators}"
+        f" concurrency={args.concurrency}"
+    )
+    report.print_table(summary, baseline)
+    if args.save:
+        parameters = {
+            key: getattr(args, key)
+            for key in ("backend", "hadiths", "narrators", "requests", "concurrency")
+        }
+        report.save(args.save, summary, parameters)
+    if baseline:
+        found = report.regressions(summary, baseline, args.threshold)
+        for line in found:
+            print(f"REGRESSION {line}")
+        return 1 if found else 0
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument(
+        "--backend", choices=["snapshot", "mongodb"], default="snapshot"
+    )
+    parser.add_argument("--mongodb-url", default="mongodb://localhost:27017")
+    parser.add_argument("--keep", action="store_true", help="keep the database")
+    parser.add_argument("--hadiths", type=int, default=20_000)
+    parser.add_argument("--narrators", type=int, default=3_000)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--scenario", action="append", help="run scenarios whose name contains this"
+    )
+    parser.add_argument(
+        "--no-index", action="store_true", help="disable the in-memory indexes"
+    )
+    parser.add_argument("--save", metavar="FILE")
+    parser.add_argument("--compare", metavar="FILE")
+    parser.add_argument("--threshold", type=float, default=0.2)
+    args = parser.parse_args()
+    os.environ.setdefault("SECRET_KEY", "benchmark")
+    sys.exit(asyncio.run(main(args)))
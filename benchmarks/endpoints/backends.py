@@ -0,0 +1,87 @@
+import os
+import tempfile
+from pathlib import Path
+
+from benchmarks.endpoints.corpus import Corpus
+
+
+class SnapshotBackend:
+    """In-process stand-in: the corpus is served from a snapshot file.
+
+    No database is needed; the file is memory-mapped like in production
+    with ``STORAGE_BACKEND=snapshot``.
+    """
+
+    name = "snapshot"
+
+    def __init__(self) -> None:
+        self._directory = tempfile.TemporaryDirectory(prefix="bench-snapshot-")
+        self.path = Path(self._directory.name) / "corpus.snapshot"
+
+    def environment(self) -> dict[str, str]:
+        return {"STORAGE_BACKEND": "snapshot", "SNAPSHOT_PATH": str(self.path)}
+
+    async def load(self, corpus: Corpus) -> None:
+        from app.indexes.registry import HADITH_SORT
+        from app.services.narrator_service import NARRATOR_SORT
+        from app.storage.snapshot import SnapshotWriter
+
+        async def iterate(docs: list[dict]):
+            for doc in docs:
+                yield doc
+
+        writer = SnapshotWriter(self.path)
+        await writer.add_collection(
+            "hadiths", iterate(corpus.hadiths), HADITH_SORT, ["narrators.id"]
+        )
+        narrators = sorted(corpus.narrators, key=lambda d: (d["narrator_id"], d["_id"]))
+        await writer.add_collection("narrators", iterate(narrators), NARRATOR_SORT)
+        await writer.add_collection("hadith_similar", iterate([]), [("_id", 1)])
+        writer.close()
+
+    async def cleanup(self) -> None:
+        self._directory.cleanup()
+
+
+class MongoBackend:
+    """A local mongod, loaded into a throwaway database that is dropped after."""
+
+    name = "mongodb"
+
+    def __init__(self, url: str, keep: bool = False) -> None:
+        self.url = url
+        self.keep = keep
+        self.database_name = f"bench_{os.getpid()}"
+
+    def environment(self) -> dict[str, str]:
+        return {
+            "STORAGE_BACKEND": "mongodb",
+            "MONGODB_URL": self.url,
+            "DATABASE_NAME": self.database_name,
+        }
+
+    async def load(self, corpus: Corpus) -> None:
+        from app.core.database import database
+
+        await database.connect(ensure_indexes=False)
+        try:
+            for name, docs in (
+                ("hadiths", corpus.hadiths),
+                ("narrators", corpus.narrators),
+            ):
+                for start in range(0, len(docs), 1000):
+                    await database.db[name].insert_many(
+                        docs[start : start + 1000], ordered=False
+                    )
+            await database.ensure_indexes()
+        finally:
+            await database.disconnect()
+
+    async def cleanup(self) -> None:
+        if self.keep:
+            return
+        from motor.motor_asyncio import AsyncIOMotorClient
+
+        client = AsyncIOMotorClient(self.url)
+        await client.drop_database(self.database_name)
+        client.close()
@@ -0,0 +1,150 @@
+import random
+from dataclasses import dataclass, field
+
+from bson import ObjectId
+
+# Common words of hadith Arabic, most frequent first; the rest of the
+# vocabulary is synthetic and follows the same Zipf-like curve.
+COMMON_WORDS = (
+    "الله قال صلى عليه وسلم رسول عن في من ان لا ما على الى يا اذا هو كان "
+    "النبي الناس يوم الصلاة رجل فقال ثم حتى الا به له قد اني لم فلما "
+    "الجنة النار الاعمال بالنيات امرئ نوى هجرته دنيا يصيبها امراة ينكحها"
+).split()
+ISMS = (
+    "محمد عبد الله احمد عمر علي عثمان سفيان مالك يحيى اسماعيل ابراهيم "
+    "موسى سليمان حماد شعبة الزهري نافع عروة سعيد قتادة هشام"
+).split()
+NISBAS = (
+    "البصري الكوفي المدني المكي الشامي الدوسي القرشي الانصاري "
+    "التيمي الزهري الثوري الاسدي"
+).split()
+HARAKAT = "\u064e\u064f\u0650\u0651\u0652"  # fatha, damma, kasra, shadda, sukun
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+TRANSMISSION = ("حدثنا", "اخبرنا", "عن", "سمعت")
+
+# Chain lengths as they occur in the six books: mostly 4-6 narrators.
+CHAIN_LENGTHS = (2, 3, 4, 5, 6, 7, 8, 9)
+CHAIN_WEIGHTS = (2, 8, 20, 28, 22, 12, 6, 2)
+TABAQAT = 10
+
+
+@dataclass
+class Corpus:
+    hadiths: list[dict] = field(default_factory=list)
+    narrators: list[dict] = field(default_factory=list)
+    # Sample query inputs drawn from the generated data.
+    words: list[str] = field(default_factory=list)
+    chains: list[list[int]] = field(default_factory=list)
+
+
+def _zipf_weights(n: int, s: float = 1.1) -> list[float]:
+    return [1 / (rank + 1) ** s for rank in range(n)]
+
+
+def _diacritize(rng: random.Random, text: str) -> str:
+    return "".join(
+        ch + rng.choice(HARAKAT) if ch in LETTERS and rng.random() < 0.5 else ch
+        for ch in text
+    )
+
+
+def generate_corpus(
+    hadith_count: int,
+    narrator_count: int,
+    books: int = 10,
+    seed: int = 0,
+) -> Corpus:
+    """Generate hadiths and narrators shaped like the real collections.
+
+    Narrators are spread over generations (tabaqat); a chain takes at most
+    one narrator per generation, from later to earlier, picking popular
+    narrators far more often, so a few companions appear in most chains.
+    """
+    # Imported here so benchmark settings can be set before app modules load.
+    from app.core.normalization import hadith_search_fields, narrator_search_fields
+
+    rng = random.Random(seed)
+    corpus = Corpus()
+
+    synthetic = {
+        "".join(rng.choices(LETTERS, k=rng.randint(3, 7))) for _ in range(8_000)
+    }
+    vocabulary = list(COMMON_WORDS) + sorted(synthetic - set(COMMON_WORDS))
+    word_weights = _zipf_weights(len(vocabulary))
+    corpus.words = vocabulary[:300]
+
+    by_tabaqa: list[list[int]] = [[] for _ in range(TABAQAT)]
+    names: dict[int, str] = {}
+    for narrator_id in range(1, narrator_count + 1):
+        tabaqa = rng.randrange(TABAQAT)
+        by_tabaqa[tabaqa].append(narrator_id)
+        ism, father = rng.choice(ISMS), rng.choice(ISMS)
+        kunya = f"ابو {rng.choice(ISMS)}"
+        nisba = rng.choice(NISBAS)
+        name_plain = f"{ism} بن {father} {nisba}"
+        names[narrator_id] = name_plain
+        doc = {
+            "_id": ObjectId(),
+            "narrator_id": narrator_id,
+            "name": _diacritize(rng, name_plain),
+            "name_plain": name_plain,
+            "kunya": kunya,
+            "nasab": nisba,
+            "death_date": f"{rng.randint(50, 300)} هـ",
+            "tabaqa": str(tabaqa + 1),
+            "rank_ibn_hajar": rng.choice(["ثقة", "صدوق", "ثقة ثبت", "مقبول"]),
+            "rank_dhahabi": rng.choice(["ثقة", "حافظ", "صدوق"]),
+            "relations": "",
+            "jarh_wa_tadil": [
+                {"scholar": rng.choice(ISMS), "quotes": ["ثقة", "صدوق"]}
+                for _ in range(rng.randint(0, 3))
+            ],
+        }
+        doc.update(narrator_search_fields(doc))
+        corpus.narrators.append(doc)
+    tabaqa_weights = [_zipf_weights(len(ids)) for ids in by_tabaqa]
+
+    book_id = page = 0
+    for i in range(hadith_count):
+        if i * books // hadith_count + 1 != book_id:
+            book_id += 1
+            page = 0
+        page += 1
+        length = rng.choices(CHAIN_LENGTHS, CHAIN_WEIGHTS)[0]
+        levels = sorted(rng.sample(range(TABAQAT), length), reverse=True)
+        chain = [
+            rng.choices(by_tabaqa[level], tabaqa_weights[level])[0]
+            for level in levels
+            if by_tabaqa[level]
+        ]
+        if i % 50 == 0:
+            corpus.chains.append(chain)
+
+        words = rng.choices(vocabulary, word_weights, k=rng.randint(15, 80))
+        matn_plain = " ".join(words)
+        isnad = " ".join(
+            f"{rng.choice(TRANSMISSION)} {names[narrator_id]}" for narrator_id in chain
+        )
+        full_text_plain = f"{isnad} قال رسول الله صلى الله عليه وسلم {matn_plain}"
+        doc = {
+            "_id": ObjectId(),
+            "book_id": book_id,
+            "page_number": page,
+            "full_text": _diacritize(rng, full_text_plain),
+            "full_text_plain": full_text_plain,
+            "matn": _diacritize(rng, matn_plain),
+            "matn_plain": matn_plain,
+            "narrators": [
+                {
+                    "id": narrator_id,
+                    "name": names[narrator_id],
+                    "name_plain": names[narrator_id],
+                }
+                for narrator_id in chain
+            ],
+        }
+        doc.update(hadith_search_fields(doc))
+        corpus.hadiths.append(doc)
+
+    corpus.hadiths.sort(key=lambda d: (d["book_id"], d["page_number"], d["_id"]))
+    return corpus
@@ -0,0 +1,186 @@
+import asyncio
+import random
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+
+import httpx
+
+from benchmarks.endpoints.corpus import Corpus
+
+
+@dataclass
+class Scenario:
+    """One endpoint and query shape; ``make`` builds a request's arguments."""
+
+    name: str
+    make: Callable[[random.Random], dict]
+
+
+@dataclass
+class Result:
+    latencies_ms: list[float] = field(default_factory=list)
+    errors: int = 0
+    elapsed_s: float = 0.0
+
+
+def scenarios(corpus: Corpus) -> list[Scenario]:
+    words = corpus.words
+    chains = [chain for chain in corpus.chains if len(chain) >= 3]
+    hadith_ids = [str(doc["_id"]) for doc in corpus.hadiths]
+    narrator_ids = [str(doc["_id"]) for doc in corpus.narrators]
+    names = [doc["name_plain"] for doc in corpus.narrators]
+    books = sorted({doc["book_id"] for doc in corpus.hadiths})
+
+    def get(path: str, **params) -> dict:
+        return {"method": "GET", "url": path, "params": params}
+
+    def pair(rng: random.Random) -> str:
+        chain = rng.choice(chains)
+        i = rng.randrange(len(chain) - 1)
+        return f"{chain[i]},{chain[i + 1]}"
+
+    def spaced_pair(rng: random.Random) -> str:
+        chain = rng.choice(chains)
+        return f"{chain[0]},{chain[-1]}"
+
+    return [
+        Scenario(
+            "hadiths:list", lambda rng: get("/hadiths", skip=rng.randrange(500))
+        ),
+        Scenario(
+            "hadiths:book", lambda rng: get("/hadiths", book_id=rng.choice(books))
+        ),
+        Scenario(
+            "hadiths:text",
+            lambda rng: get("/hadiths", full_text_plain=" ".join(rng.sample(words, 2))),
+        ),
+        Scenario(
+            "hadiths:text-rare",
+            lambda rng: get("/hadiths", full_text_plain=rng.choice(words[150:])),
+        ),
+        Scenario(
+            "hadiths:phrase",
+            lambda rng: get("/hadiths", full_text_plain='"صلى الله عليه وسلم"'),
+        ),
+        Scenario(
+            "hadiths:summary",
+            lambda rng: get(
+                "/hadiths", full_text_plain=rng.choice(words), view="summary"
+            ),
+        ),
+        Scenario(
+            "hadiths:narrators",
+            lambda rng: get("/hadiths", narrators=spaced_pair(rng)),
+        ),
+        Scenario(
+            "hadiths:narrators-ordered",
+            lambda rng: get(
+                "/hadiths", narrators=spaced_pair(rng), narrators_ordered="true"
+            ),
+        ),
+        Scenario(
+            "hadiths:narrators-contiguous",
+            lambda rng: get(
+                "/hadiths", narrators=pair(rng), narrators_contiguous="true"
+            ),
+        ),
+        Scenario(
+            "hadiths:detail",
+            lambda rng: get(f"/hadiths/{rng.choice(hadith_ids)}"),
+        ),
+        Scenario(
+            "hadiths:detail-expanded",
+            lambda rng: get(f"/hadiths/{rng.choice(hadith_ids)}", expand="narrators"),
+        ),
+        Scenario(
+            "hadiths:batch",
+            lambda rng: {
+                "method": "POST",
+                "url": "/hadiths/batch",
+                "json": {"ids": rng.sample(hadith_ids, 50)},
+            },
+        ),
+        Scenario(
+            "narrators:search",
+            lambda rng: get("/narrators", name_plain=rng.choice(names).split()[0]),
+        ),
+        Scenario(
+            "narrators:suggest",
+            lambda rng: get("/narrators/suggest", q=rng.choice(names)[:3]),
+        ),
+        Scenario(
+            "narrators:fuzzy",
+            lambda rng: get("/narrators", name_plain=rng.choice(names), fuzzy="true"),
+        ),
+        Scenario(
+            "narrators:detail",
+            lambda rng: get(f"/narrators/{rng.choice(narrator_ids)}"),
+        ),
+    ]
+
+
+async def run_scenario(
+    client: httpx.AsyncClient,
+    scenario: Scenario,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    seed: int,
+) -> Result:
+    """Closed-loop load: ``concurrency`` clients share ``requests`` requests."""
+    rng = random.Random(seed)
+    for _ in range(warmup):
+        await client.request(**scenario.make(rng))
+
+    result = Result()
+    remaining = requests
+
+    async def worker() -> None:
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            request = scenario.make(rng)
+            start = time.perf_counter()
+            response = await client.request(**request)
+            result.latencies_ms.append((time.perf_counter() - start) * 1000)
+            if response.status_code >= 400:
+                result.errors += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    result.elapsed_s = time.perf_counter() - start
+    return result
+
+
+async def drive(
+    corpus: Corpus,
+    requests: int,
+    concurrency: int,
+    warmup: int,
+    selected: list[str] | None = None,
+    seed: int = 0,
+) -> dict[str, Result]:
+    """Start the app in-process and run every scenario against it in turn."""
+    from app.core.config import get_settings
+    from app.indexes.registry import search_indexes
+    from app.main import create_app
+
+    app = create_app()
+    prefix = get_settings().API_V1_PREFIX
+    results = {}
+    async with app.router.lifespan_context(app):
+        # Measure the steady state, not the MongoDB fallback during startup.
+        while get_settings().SEARCH_INDEX_ENABLED and not search_indexes.ready:
+            await asyncio.sleep(0.05)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(
+            transport=transport, base_url=f"http://bench{prefix}"
+        ) as client:
+            for scenario in scenarios(corpus):
+                if selected and not any(s in scenario.name for s in selected):
+                    continue
+                results[scenario.name] = await run_scenario(
+                    client, scenario, requests, concurrency, warmup, seed
+                )
+    return results
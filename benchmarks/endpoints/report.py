@@ -0,0 +1,75 @@
+import json
+import statistics
+from pathlib import Path
+
+from benchmarks.endpoints.driver import Result
+
+
+def _percentile(values: list[float], fraction: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def summarize(results: dict[str, Result]) -> dict[str, dict]:
+    summary = {}
+    for name, result in results.items():
+        latencies = result.latencies_ms
+        summary[name] = {
+            "requests": len(latencies),
+            "errors": result.errors,
+            "rps": round(len(latencies) / result.elapsed_s, 1),
+            "mean_ms": round(statistics.fmean(latencies), 2),
+            "p50_ms": round(_percentile(latencies, 0.50), 2),
+            "p95_ms": round(_percentile(latencies, 0.95), 2),
+            "p99_ms": round(_percentile(latencies, 0.99), 2),
+        }
+    return summary
+
+
+def print_table(summary: dict[str, dict], baseline: dict | None = None) -> None:
+    header = f"{'scenario':<30} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8} {'err':>5}"
+    if baseline:
+        header += f" {'p99 vs base':>12}"
+    print(header)
+    for name, row in summary.items():
+        line = (
+            f"{name:<30} {row['rps']:>8} {row['p50_ms']:>8} {row['p95_ms']:>8}"
+            f" {row['p99_ms']:>8} {row['errors']:>5}"
+        )
+        if baseline and name in baseline["scenarios"]:
+            before = baseline["scenarios"][name]["p99_ms"]
+            line += f" {(row['p99_ms'] - before) / before:>+11.0%}"
+        print(line)
+
+
+def save(path: str, summary: dict[str, dict], parameters: dict) -> None:
+    Path(path).write_text(
+        json.dumps({"parameters": parameters, "scenarios": summary}, indent=2) + "\n"
+    )
+
+
+def load(path: str) -> dict:
+    return json.loads(Path(path).read_text())
+
+
+def regressions(
+    summary: dict[str, dict], baseline: dict, threshold: float
+) -> list[str]:
+    """Scenarios whose p99 grew by more than ``threshold`` or that now fail.
+
+    Latencies under a millisecond are too noisy to compare, so a scenario
+    only regresses if it also got at least 1 ms slower.
+    """
+    found = []
+    for name, row in summary.items():
+        before = baseline["scenarios"].get(name)
+        if before is None:
+            continue
+        if row["errors"] > before["errors"]:
+            found.append(f"{name}: {row['errors']} errors (was {before['errors']})")
+        growth = row["p99_ms"] - before["p99_ms"]
+        if growth > 1 and growth > threshold * before["p99_ms"]:
+            found.append(
+                f"{name}: p99 {row['p99_ms']} ms (was {before['p99_ms']} ms)"
+            )
+    return found
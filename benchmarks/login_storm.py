@@ -0,0 +1,135 @@
+"""Search latency on one worker while a burst of logins is hashed.
+
+Usage: python -m benchmarks.login_storm [--seconds 3] [--rate 20]
+
+A probe issues an in-memory hadith search every few milliseconds and
+records the time from when it was due to when it finished, so event-loop
+stalls show up as latency. Three runs are compared: no logins, logins
+verifying bcrypt inline on the loop (the previous behaviour), and logins
+going through the password hashing pool.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import statistics
+import time
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from app.core.security import (  # noqa: E402
+    PasswordHashingBusyError,
+    hashing_pool,
+    password_hash,
+    verify_password,
+)
+from app.indexes.text import InvertedIndex  # noqa: E402
+
+LETTERS = "ابتثجحخدذرزسشصضطظعغفقكلمنهوي"
+
+
+def build_index(
+    documents: int, words: int, rng: random.Random
+) -> tuple[InvertedIndex, list[str]]:
+    vocabulary = [
+        "".join(rng.choices(LETTERS, k=rng.randint(3, 7))) for _ in range(20_000)
+    ]
+    # Zipf-like: a few very common words, a long tail of rare ones.
+    weights = [1 / (rank + 1) for rank in range(len(vocabulary))]
+    index = InvertedIndex()
+    for ordinal in range(documents):
+        text = " ".join(rng.choices(vocabulary, weights, k=words))
+        index.add_document(ordinal, text)
+    index.finalize()
+    queries = [" ".join(rng.sample(vocabulary[:2_000], 2)) for _ in range(100)]
+    return index, queries
+
+
+async def probe(
+    index: InvertedIndex, queries: list[str], seconds: float, interval: float
+) -> list[float]:
+    latencies = []
+    start = time.perf_counter()
+    due = start
+    while due - start < seconds:
+        await asyncio.sleep(max(0.0, due - time.perf_counter()))
+        index.search(queries[len(latencies) % len(queries)])
+        latencies.append((time.perf_counter() - due) * 1000)
+        due += interval
+    return latencies
+
+
+async def login(mode: str, hashed: str) -> bool:
+    if mode == "inline":
+        return password_hash.verify("wrong password", hashed)
+    return await verify_password("wrong password", hashed)
+
+
+async def storm(
+    mode: str, hashed: str, seconds: float, rate: float
+) -> tuple[int, int]:
+    """Start logins at ``rate`` per second for ``seconds``, as clients would."""
+    logins = []
+    start = time.perf_counter()
+    while time.perf_counter() - start < seconds:
+        logins.append(asyncio.create_task(login(mode, hashed)))
+        await asyncio.sleep(1 / rate)
+    results = await asyncio.gather(*logins, return_exceptions=True)
+    rejected = sum(isinstance(r, PasswordHashingBusyError) for r in results)
+    return len(results) - rejected, rejected
+
+
+async def scenario(
+    mode: str,
+    index: InvertedIndex,
+    queries: list[str],
+    hashed: str,
+    seconds: float,
+    interval: float,
+    rate: float,
+) -> None:
+    logins = None
+    if mode != "idle":
+        logins = asyncio.create_task(storm(mode, hashed, seconds, rate))
+    started = time.perf_counter()
+    latencies = await probe(index, queries, seconds, interval)
+    done, rejected = await logins if logins else (0, 0)
+    elapsed = time.perf_counter() - started
+
+    q = statistics.quantiles(latencies, n=100)
+    print(
+        f"{mode:>7}: p50 {q[49]:7.2f} ms  p95 {q[94]:7.2f} ms  "
+        f"p99 {q[98]:7.2f} ms  max {max(latencies):7.2f} ms  "
+        f"logins/s {done / elapsed:6.1f}  rejected {rejected}"
+    )
+
+
+async def run(args: argparse.Namespace) -> None:
+    index, queries = build_index(args.documents, args.words, random.Random(0))
+    hashed = password_hash.hash("correct password")
+    print(
+        f"{args.documents} documents, {args.rate:g} logins/s offered, "
+        f"{hashing_pool.workers} hashing workers, queue limit {hashing_pool.limit}"
+    )
+    for mode in ("idle", "inline", "pool"):
+        await scenario(
+            mode,
+            index,
+            queries,
+            hashed,
+            args.seconds,
+            args.interval / 1000,
+            args.rate,
+        )
+    hashing_pool.shutdown()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--seconds", type=float, default=3.0)
+    parser.add_argument("--interval", type=float, default=5.0, help="probe ms")
+    parser.add_argument("--rate", type=float, default=20.0, help="logins per second")
+    parser.add_argument("--documents", type=int, default=5_000)
+    parser.add_argument("--words", type=int, default=60, help="words per hadith")
+    asyncio.run(run(parser.parse_args()))
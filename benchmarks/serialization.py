@@ -0,0 +1,107 @@
+"""Per-item cost of serializing a GET /hadiths page, before and after.
+
+Usage: python -m benchmarks.serialization [--items 100] [--rounds 200]
+
+"pydantic" reproduces the previous path: build nested HadithResponse models,
+let FastAPI validate them against the route's response_model, and encode
+with the stdlib JSON encoder. "fast" is the current path: plain dicts from
+the BSON documents straight to JSON bytes.
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+
+from bson import ObjectId
+
+os.environ.setdefault("SECRET_KEY", "benchmark")
+
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import APIRoute, serialize_response  # noqa: E402
+
+from app.api.v1.endpoints.hadiths import search_hadiths  # noqa: E402
+from app.core.serialization import hadith_payload, json_response  # noqa: E402
+from app.schemas.hadith import (  # noqa: E402
+    HadithListResponse,
+    HadithNarratorResponse,
+    HadithResponse,
+)
+
+WORDS = "حدثنا اخبرنا عن قال رسول الله صلى عليه وسلم انما الاعمال بالنيات".split()
+
+
+def make_doc(rng: random.Random, words: int) -> dict:
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return {
+        "_id": ObjectId(),
+        "book_id": rng.randint(1, 20),
+        "page_number": rng.randint(1, 3000),
+        "full_text": text,
+        "full_text_plain": text,
+        "matn": text[: len(text) // 2],
+        "matn_plain": text[: len(text) // 2],
+        "narrators": [
+            {"id": rng.randint(1, 20000), "name": "راوي", "name_plain": "راوي"}
+            for _ in range(rng.randint(3, 8))
+        ],
+    }
+
+
+def pydantic_model(doc: dict) -> HadithResponse:
+    return HadithResponse(
+        id=str(doc["_id"]),
+        book_id=doc["book_id"],
+        page_number=doc["page_number"],
+        full_text=doc["full_text"],
+        full_text_plain=doc["full_text_plain"],
+        matn=doc["matn"],
+        matn_plain=doc["matn_plain"],
+        narrators=[HadithNarratorResponse(**n) for n in doc["narrators"]],
+    )
+
+
+async def run(items: int, rounds: int, words: int) -> None:
+    rng = random.Random(0)
+    docs = [make_doc(rng, words) for _ in range(items)]
+    # The same response field FastAPI builds for GET /hadiths.
+    route = APIRoute("/hadiths", search_hadiths, response_model=HadithListResponse)
+
+    async def pydantic_path() -> bytes:
+        content = HadithListResponse(
+            items=[pydantic_model(doc) for doc in docs], total=items
+        )
+        encoded = await serialize_response(
+            field=route.response_field, response_content=content
+        )
+        return JSONResponse(encoded).body
+
+    async def fast_path() -> bytes:
+        payload = {
+            "items": [hadith_payload(doc) for doc in docs],
+            "total": items,
+            "has_more": False,
+            "next_cursor": None,
+        }
+        return json_response(payload, HadithListResponse).body
+
+    results = {}
+    for name, path in (("pydantic", pydantic_path), ("fast", fast_path)):
+        await path()  # warm up
+        start = time.perf_counter()
+        for _ in range(rounds):
+            await path()
+        elapsed = time.perf_counter() - start
+        results[name] = elapsed / (rounds * items) * 1e6
+        print(f"{name:>8}: {results[name]:8.2f} µs/item")
+    print(f" speedup: {results['pydantic'] / results['fast']:8.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=100)
+    parser.add_argument("--rounds", type=int, default=200)
+    parser.add_argument("--words", type=int, default=400, help="words per hadith")
+    args = parser.parse_args()
+    asyncio.run(run(args.items, args.rounds, args.words))
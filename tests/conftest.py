@@ -0,0 +1,29 @@
+import os
+
+import pytest
+
+# Settings are read when app modules are imported.
+os.environ.setdefault("SECRET_KEY", "test-secret-key")
+
+
+@pytest.fixture
+def anyio_backend() -> str:
+    return "asyncio"
+
+
+@pytest.fixture(autouse=True)
+def _clear_caches():
+    """Tests build their own corpora; cached results must not leak between them."""
+    from app.core.counting import total_counter
+    from app.services import hadith_service, narrator_service
+
+    caches = [
+        total_counter.cache,
+        hadith_service._detail_cache,
+        hadith_service._facet_cache,
+        narrator_service._detail_cache,
+        narrator_service._record_cache,
+    ]
+    for cache in caches:
+        cache.clear()
+    yield
@@ -0,0 +1,82 @@
+import pytest
+
+from app.indexes.chain import ChainIndex
+from app.services.hadith_service import _narrators_query
+from app.storage.query import matches
+
+CHAINS = [
+    [1, 2, 3, 4],
+    [3, 2, 1],
+    [1, 5, 2, 3],
+    [2, 1, 2],
+    [6],
+]
+
+
+@pytest.fixture
+def index() -> ChainIndex:
+    index = ChainIndex()
+    for ordinal, chain in enumerate(CHAINS):
+        index.add_chain(ordinal, chain)
+    return index
+
+
+def test_unordered_match_needs_every_narrator(index):
+    assert index.match([1, 2]) == [0, 1, 2, 3]
+    assert index.match([1, 6]) == []
+    assert index.match([7]) == []
+    assert index.match([]) == []
+
+
+def test_ordered_match_respects_chain_order(index):
+    assert index.match([1, 2], ordered=True) == [0, 2, 3]
+    assert index.match([2, 1], ordered=True) == [1, 3]
+    assert index.match([1, 2, 3], ordered=True) == [0, 2]
+
+
+def test_ordered_match_uses_any_occurrence(index):
+    # Chain 3 is [2, 1, 2]: the second 2 follows the 1.
+    assert 3 in index.match([1, 2], ordered=True)
+    assert index.match([2, 1, 2], ordered=True) == [3]
+
+
+def test_contiguous_match_needs_an_exact_segment(index):
+    assert index.match([1, 2], contiguous=True) == [0, 3]
+    assert index.match([2, 3], contiguous=True) == [0, 2]
+    assert index.match([1, 2, 3], contiguous=True) == [0]
+
+
+@pytest.mark.parametrize(
+    ("query", "ordered", "contiguous"),
+    [
+        ([1, 2], True, False),
+        ([2, 1], True, False),
+        ([2, 1, 2], True, False),
+        ([1, 2, 3], True, False),
+        ([1, 2], False, True),
+        ([2, 1], False, True),
+        ([2, 3], False, True),
+        ([1, 2, 3], False, True),
+        ([3, 2], False, False),
+    ],
+)
+def test_mongodb_query_matches_the_same_chains(index, query, ordered, contiguous):
+    condition = _narrators_query(query, ordered, contiguous)
+    found = [
+        ordinal
+        for ordinal, chain in enumerate(CHAINS)
+        if matches({"narrators": [{"id": n} for n in chain]}, condition)
+    ]
+    assert found == index.match(query, ordered=ordered, contiguous=contiguous)
+
+
+def test_chain_and_frequency(index):
+    assert list(index.chain(2)) == [1, 5, 2, 3]
+    assert list(index.chain(len(CHAINS))) == []
+    assert index.frequency(2) == 5
+    assert index.frequency(7) == 0
+
+
+def test_chains_must_be_added_in_order(index):
+    with pytest.raises(ValueError):
+        index.add_chain(1, [1])
@@ -0,0 +1,64 @@
+import pytest
+
+pytest.importorskip("numpy")
+
+from app.commands.find_similar_hadiths import (  # noqa: E402
+    MinHasher,
+    normalize,
+    shingles,
+    similar_documents,
+)
+
+BASE = (
+    "إنما الأعمال بالنيات وإنما لكل امرئ ما نوى فمن كانت هجرته إلى الله "
+    "ورسوله فهجرته إلى الله ورسوله ومن كانت هجرته لدنيا يصيبها أو امرأة "
+    "ينكحها فهجرته إلى ما هاجر إليه"
+)
+MATNS = [
+    BASE,
+    "من حسن إسلام المرء تركه ما لا يعنيه ومن كان يؤمن بالله واليوم الآخر "
+    "فليقل خيرا أو ليصمت",
+    # BASE with different punctuation and spacing, then with one word changed.
+    BASE.replace(" فمن", "، فمن").replace(" ومن", "؛  ومن") + ".",
+    BASE.replace("امرأة ينكحها", "امرأة يتزوجها"),
+    "لا يؤمن أحدكم حتى يحب لأخيه ما يحب لنفسه ولا يحل دم امرئ مسلم إلا بإحدى ثلاث",
+]
+
+
+def _documents(
+    matns: list[str], threshold: float = 0.7, bands: int = 16
+) -> dict[int, dict]:
+    keys = [{"id": i, "book_id": 1, "page_number": i} for i in range(len(matns))]
+    signatures = MinHasher(128).signatures([shingles(normalize(m)) for m in matns])
+    docs = similar_documents(keys, signatures, bands, threshold)
+    return {doc["_id"]: doc for doc in docs}
+
+
+def test_near_duplicates_share_a_cluster():
+    docs = _documents(MATNS)
+    assert sorted(docs) == [0, 2, 3]
+    assert {doc["cluster_id"] for doc in docs.values()} == {0}
+    assert {doc["cluster_size"] for doc in docs.values()} == {3}
+    # Punctuation and spacing are normalized away entirely.
+    assert docs[0]["similar"][0] == {
+        "id": 2,
+        "book_id": 1,
+        "page_number": 2,
+        "similarity": 1.0,
+    }
+    assert all(0.7 <= item["similarity"] < 1 for item in docs[3]["similar"][1:])
+
+
+def test_unrelated_matns_stay_apart():
+    assert _documents([MATNS[0], MATNS[1], MATNS[4]]) == {}
+
+
+def test_similar_pairs_chain_into_one_cluster():
+    # The first and last matns barely overlap; each is close to the middle one.
+    other = f"{MATNS[1]} {MATNS[4]}"
+    chain = [BASE, f"{BASE} {other}", other]
+    docs = _documents(chain, threshold=0.3, bands=64)
+    assert sorted(docs) == [0, 1, 2]
+    assert {doc["cluster_id"] for doc in docs.values()} == {0}
+    assert [item["id"] for item in docs[0]["similar"]] == [1]
+    assert [item["id"] for item in docs[2]["similar"]] == [1]
@@ -0,0 +1,162 @@
+import httpx
+import pytest
+from bson import ObjectId
+
+from app.indexes.registry import HADITH_SORT, SearchIndexes, get_search_indexes
+from app.main import create_app
+from app.services.graph_service import (
+    GraphNotReadyError,
+    GraphService,
+    UnknownNarratorError,
+)
+from app.services.narrator_service import NARRATOR_SORT
+from app.storage.backend import SnapshotDatabase
+from app.storage.snapshot import Snapshot, SnapshotWriter
+
+pytestmark = pytest.mark.anyio
+
+# Each narrator heard the hadith from the next one in the chain.
+CHAINS = [
+    [1, 2, 3],
+    [1, 2, 3],
+    [1, 4, 3],
+    [5, 1],
+    [6, 7],
+]
+# 8 has a record but appears in no chain.
+NAMES = {n: f"راوي {n}" for n in range(1, 9)}
+
+
+async def _hadiths():
+    for i, chain in enumerate(CHAINS):
+        yield {
+            "_id": ObjectId(f"{i:024x}"),
+            "book_id": 1,
+            "page_number": i,
+            "full_text_plain": "",
+            "narrators": [{"id": n, "name": NAMES[n]} for n in chain],
+        }
+
+
+async def _narrators():
+    for n, name in NAMES.items():
+        yield {"_id": ObjectId(f"{100 + n:024x}"), "narrator_id": n, "name": name}
+
+
+@pytest.fixture
+async def indexes(tmp_path):
+    writer = SnapshotWriter(tmp_path / "corpus.snapshot")
+    await writer.add_collection("hadiths", _hadiths(), HADITH_SORT, ["narrators.id"])
+    await writer.add_collection("narrators", _narrators(), NARRATOR_SORT)
+    writer.close()
+    snapshot = Snapshot(tmp_path / "corpus.snapshot")
+    indexes = SearchIndexes()
+    await indexes.build(SnapshotDatabase(snapshot))
+    yield indexes
+    snapshot.close()
+
+
+@pytest.fixture
+def service(indexes):
+    return GraphService(indexes)
+
+
+def _ids(narrators: list[dict]) -> list[tuple[int, int]]:
+    return [(n["narrator_id"], n["weight"]) for n in narrators]
+
+
+async def test_neighbors_strongest_first(service):
+    result = await service.get_neighbors(1)
+    assert result["name"] == NAMES[1]
+    assert (result["teacher_count"], result["student_count"]) == (2, 1)
+    assert _ids(result["teachers"]) == [(2, 2), (4, 1)]
+    assert _ids(result["students"]) == [(5, 1)]
+    assert _ids((await service.get_neighbors(1, limit=1))["teachers"]) == [(2, 2)]
+
+
+async def test_narrator_outside_every_chain_has_no_neighbors(service):
+    result = await service.get_neighbors(8)
+    assert result["name"] == NAMES[8]
+    assert result["teachers"] == result["students"] == []
+
+
+async def test_top_transmitters(service):
+    items = (await service.get_top_transmitters(3))["items"]
+    assert [(i["narrator_id"], i["students"], i["transmissions"]) for i in items] == [
+        (3, 2, 3),
+        (2, 1, 2),
+        (1, 1, 1),
+    ]
+
+
+async def test_path_follows_the_strongest_links(service):
+    result = await service.find_path(3, 5)
+    assert result["hops"] == 3
+    assert _ids(result["narrators"]) == [(3, 0), (2, 2), (1, 2), (5, 1)]
+
+
+async def test_path_against_the_direction_needs_undirected(service):
+    assert await service.find_path(5, 3) is None
+    result = await service.find_path(5, 3, directed=False)
+    assert [n["narrator_id"] for n in result["narrators"]] == [5, 1, 2, 3]
+
+
+@pytest.mark.parametrize("directed", [True, False])
+async def test_unconnected_narrators_have_no_path(service, directed):
+    assert await service.find_path(3, 6, directed) is None
+    assert await service.find_path(8, 1, directed) is None
+    assert (await service.find_path(8, 8, directed))["hops"] == 0
+
+
+async def test_unknown_narrator_is_reported(service):
+    with pytest.raises(UnknownNarratorError):
+        await service.get_neighbors(99)
+    with pytest.raises(UnknownNarratorError):
+        await service.find_path(1, 99)
+
+
+def test_service_needs_built_indexes():
+    with pytest.raises(GraphNotReadyError):
+        GraphService(SearchIndexes())
+
+
+def _client(indexes: SearchIndexes) -> httpx.AsyncClient:
+    app = create_app()
+    app.dependency_overrides[get_search_indexes] = lambda: indexes
+    transport = httpx.ASGITransport(app=app)
+    return httpx.AsyncClient(transport=transport, base_url="http://test/api/v1/graph")
+
+
+@pytest.fixture
+async def client(indexes):
+    async with _client(indexes) as client:
+        yield client
+
+
+async def test_endpoints_map_missing_narrators_and_paths_to_404(client):
+    response = await client.get("/narrators/1")
+    assert response.status_code == 200
+    assert response.json()["teacher_count"] == 2
+
+    response = await client.get("/narrators/99")
+    assert response.status_code == 404
+    assert response.json()["detail"] == "Narrator 99 not found."
+
+    response = await client.get("/path", params={"source": 3, "target": 6})
+    assert response.status_code == 404
+    assert response.json()["detail"] == "No transmission path between these narrators."
+
+    response = await client.get("/path", params={"source": 99, "target": 1})
+    assert response.status_code == 404
+
+    response = await client.get(
+        "/path", params={"source": 5, "target": 3, "directed": "false"}
+    )
+    assert response.json()["hops"] == 3
+
+
+async def test_endpoints_wait_for_the_graph():
+    async with _client(SearchIndexes()) as client:
+        response = await client.get("/top-transmitters")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "5"
@@ -0,0 +1,368 @@
+import gzip
+import hashlib
+import json
+
+import httpx
+import pytest
+from bson import ObjectId
+from pymongo.errors import AutoReconnect, ExecutionTimeout, ServerSelectionTimeoutError
+
+from app.core.config import get_settings
+from app.core.limits import ConcurrencyLimiter
+from app.core.normalization import hadith_search_fields, narrator_search_fields
+from app.indexes.registry import HADITH_SORT, SearchIndexes, get_search_indexes
+from app.main import create_app
+from app.schemas.hadith import HadithResponse
+from app.services import hadith_service
+from app.services.narrator_service import NARRATOR_SORT, NarratorService
+from app.storage.backend import SnapshotDatabase, get_corpus_database
+from app.storage.snapshot import Snapshot, SnapshotWriter
+
+pytestmark = pytest.mark.anyio
+
+NAMES = {n: f"راوي {n}" for n in range(1, 6)}
+
+
+def _hadiths() -> list[dict]:
+    hadiths = []
+    for i in range(30):
+        matn = f"قال رسول الله حديث {i}"
+        chain = [1 + i % 5, 1 + (i + 2) % 5]
+        text = f"حدثنا {NAMES[chain[0]]}، {matn}"
+        doc = {
+            "_id": ObjectId(f"{i:024x}"),
+            "book_id": 1 + i % 3,
+            "page_number": i,
+            "full_text": text,
+            "full_text_plain": text,
+            "matn": matn,
+            "matn_plain": matn,
+            "narrators": [
+                {"id": n, "name": NAMES[n], "name_plain": NAMES[n]} for n in chain
+            ],
+        }
+        hadiths.append({**doc, **hadith_search_fields(doc)})
+    hadiths.sort(key=lambda d: (d["book_id"], d["page_number"], d["_id"]))
+    return hadiths
+
+
+def _narrators() -> list[dict]:
+    narrators = []
+    for n, name in NAMES.items():
+        doc = {
+            "_id": ObjectId(f"{1000 + n:024x}"),
+            "narrator_id": n,
+            "name": name,
+            "name_plain": name,
+        }
+        narrators.append({**doc, **narrator_search_fields(doc)})
+    return narrators
+
+
+HADITHS = _hadiths()
+
+
+def _chain(doc: dict) -> list[int]:
+    return [n["id"] for n in doc["narrators"]]
+
+
+NARRATORS = _narrators()
+
+
+async def _aiter(docs):
+    for doc in docs:
+        yield doc
+
+
+@pytest.fixture
+async def client(tmp_path):
+    """An API client whose corpus is a snapshot, without MongoDB."""
+    writer = SnapshotWriter(tmp_path / "corpus.snapshot")
+    await writer.add_collection(
+        "hadiths", _aiter(HADITHS), HADITH_SORT, multi_paths=["narrators.id"]
+    )
+    await writer.add_collection("narrators", _aiter(NARRATORS), NARRATOR_SORT)
+    writer.close()
+    snapshot = Snapshot(tmp_path / "corpus.snapshot")
+    db = SnapshotDatabase(snapshot)
+    indexes = SearchIndexes()
+    await indexes.build(db)
+
+    app = create_app()
+    app.dependency_overrides[get_corpus_database] = lambda: db
+    app.dependency_overrides[get_search_indexes] = lambda: indexes
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://test/api/v1"
+    ) as client:
+        yield client
+    snapshot.close()
+
+
+def test_projected_search_has_its_own_schema():
+    schema = create_app().openapi()
+    responses = schema["paths"]["/api/v1/hadiths"]["get"]["responses"]
+    refs = {
+        ref["$ref"].rsplit("/", 1)[-1]
+        for ref in responses["200"]["content"]["application/json"]["schema"]["anyOf"]
+    }
+    assert "HadithPartialListResponse" in refs
+    partial = schema["components"]["schemas"]["HadithPartialResponse"]
+    assert "required" not in partial
+    assert set(partial["properties"]) == set(HadithResponse.model_fields)
+
+
+@pytest.mark.parametrize("validate", [False, True])
+async def test_projected_search_returns_only_the_fields(client, monkeypatch, validate):
+    monkeypatch.setattr(get_settings(), "VALIDATE_RESPONSES", validate)
+    response = await client.get("/hadiths", params={"fields": "id,matn", "limit": 3})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["items"] == [
+        {"id": str(d["_id"]), "matn": d["matn"]} for d in HADITHS[:3]
+    ]
+    assert body["total"] == len(HADITHS)
+
+
+async def test_unknown_fields_are_rejected(client):
+    response = await client.get("/hadiths", params={"fields": "id,isnad"})
+    assert response.status_code == 400
+
+
+def _lines(body: bytes) -> list[dict]:
+    assert body.endswith(b"\n")
+    return [json.loads(line) for line in body.split(b"\n")[:-1]]
+
+
+@pytest.fixture
+def small_chunks(monkeypatch):
+    settings = get_settings()
+    monkeypatch.setattr(settings, "EXPORT_BATCH_SIZE", 7)
+    monkeypatch.setattr(settings, "EXPORT_CHUNK_BYTES", 300)
+
+
+@pytest.mark.parametrize(
+    ("params", "expected"),
+    [
+        ({}, HADITHS),
+        ({"book_id": 2}, [d for d in HADITHS if d["book_id"] == 2]),
+        # Answered from the in-memory index, fetched by _id in batches.
+        ({"narrators": "3"}, [d for d in HADITHS if 3 in _chain(d)]),
+    ],
+)
+async def test_export_streams_one_hadith_per_line(
+    client, small_chunks, params, expected
+):
+    response = await client.get(
+        "/hadiths/export", params=params, headers={"Accept-Encoding": "identity"}
+    )
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert "content-encoding" not in response.headers
+    items = _lines(response.content)
+    assert [item["id"] for item in items] == [str(d["_id"]) for d in expected]
+    assert items[0]["matn"] == expected[0]["matn"]
+
+
+async def test_export_projects_fields(client):
+    response = await client.get(
+        "/hadiths/export",
+        params={"fields": "id,book_id"},
+        headers={"Accept-Encoding": "identity"},
+    )
+    items = _lines(response.content)
+    assert items == [{"id": str(d["_id"]), "book_id": d["book_id"]} for d in HADITHS]
+
+
+async def test_export_is_gzipped_when_accepted(client, small_chunks):
+    async with client.stream(
+        "GET", "/hadiths/export", headers={"Accept-Encoding": "gzip"}
+    ) as response:
+        assert response.headers["content-encoding"] == "gzip"
+        assert "Accept-Encoding" in response.headers["vary"]
+        raw = b"".join([chunk async for chunk in response.aiter_raw()])
+    items = _lines(gzip.decompress(raw))
+    assert [item["id"] for item in items] == [str(d["_id"]) for d in HADITHS]
+
+
+async def test_export_takes_a_search_slot(client, monkeypatch):
+    limiter = ConcurrencyLimiter(limit=1, max_queue=0, message="busy")
+    monkeypatch.setattr(hadith_service, "search_limiter", limiter)
+    await limiter.__aenter__()
+    response = await client.get("/hadiths/export")
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+
+    await limiter.__aexit__(None, None, None)
+    response = await client.get("/hadiths/export")
+    assert response.status_code == 200
+    assert limiter.pending == 0
+
+
+async def test_detail_has_a_strong_etag_of_its_body(client):
+    hadith = HADITHS[4]
+    response = await client.get(f"/hadiths/{hadith['_id']}")
+    assert response.status_code == 200
+    digest = hashlib.sha256(response.content).hexdigest()[:32]
+    assert response.headers["etag"] == f'"{digest}"'
+    max_age = get_settings().DETAIL_CACHE_MAX_AGE_SECONDS
+    assert response.headers["cache-control"] == f"public, max-age={max_age}"
+    assert response.json()["matn"] == hadith["matn"]
+
+
+@pytest.mark.parametrize(
+    "if_none_match",
+    ["{etag}", "W/{etag}", '"other", {etag}', "*"],
+)
+async def test_matching_if_none_match_gets_304(client, if_none_match):
+    url = f"/hadiths/{HADITHS[4]['_id']}"
+    etag = (await client.get(url)).headers["etag"]
+    response = await client.get(
+        url, headers={"If-None-Match": if_none_match.format(etag=etag)}
+    )
+    assert response.status_code == 304
+    assert response.content == b""
+    assert response.headers["etag"] == etag
+
+
+async def test_stale_if_none_match_gets_the_body(client):
+    url = f"/hadiths/{HADITHS[4]['_id']}"
+    response = await client.get(url, headers={"If-None-Match": '"stale"'})
+    assert response.status_code == 200
+    assert response.json()["id"] == str(HADITHS[4]["_id"])
+
+
+async def test_expanded_and_plain_details_are_cached_apart(client):
+    url = f"/hadiths/{HADITHS[4]['_id']}"
+    expanded = await client.get(url, params={"expand": "narrators"})
+    plain = await client.get(url)
+    assert expanded.headers["etag"] != plain.headers["etag"]
+    assert all("details" not in n for n in plain.json()["narrators"])
+    details = [n["details"] for n in expanded.json()["narrators"]]
+    assert [d["narrator_id"] for d in details] == _chain(HADITHS[4])
+
+    # Served again from the detail cache, each under its own key.
+    assert (await client.get(url)).content == plain.content
+    again = await client.get(url, params={"expand": "narrators"})
+    assert again.content == expanded.content
+    response = await client.get(
+        url,
+        params={"expand": "narrators"},
+        headers={"If-None-Match": plain.headers["etag"]},
+    )
+    assert response.status_code == 200
+
+
+async def test_narrator_detail_supports_if_none_match(client):
+    url = f"/narrators/{NARRATORS[0]['_id']}"
+    response = await client.get(url)
+    assert response.json()["narrator_id"] == NARRATORS[0]["narrator_id"]
+    response = await client.get(
+        url, headers={"If-None-Match": response.headers["etag"]}
+    )
+    assert response.status_code == 304
+
+
+@pytest.mark.parametrize("hadith_id", ["not-an-id", str(ObjectId())])
+async def test_unknown_hadith_is_404(client, hadith_id):
+    assert (await client.get(f"/hadiths/{hadith_id}")).status_code == 404
+
+
+async def test_batch_keeps_request_order_and_reports_missing(client):
+    unknown = str(ObjectId())
+    ids = [
+        str(HADITHS[7]["_id"]),
+        unknown,
+        str(HADITHS[2]["_id"]),
+        "not-an-id",
+        str(HADITHS[7]["_id"]),
+    ]
+    response = await client.post("/hadiths/batch", json={"ids": ids})
+    assert response.status_code == 200
+    body = response.json()
+    assert [item and item["id"] for item in body["items"]] == [
+        ids[0],
+        None,
+        ids[2],
+        None,
+        ids[0],
+    ]
+    assert body["items"][0]["matn"] == HADITHS[7]["matn"]
+    assert body["missing"] == [unknown, "not-an-id"]
+
+
+async def test_narrator_batch_keeps_request_order(client):
+    ids = [str(NARRATORS[3]["_id"]), str(ObjectId()), str(NARRATORS[0]["_id"])]
+    body = (await client.post("/narrators/batch", json={"ids": ids})).json()
+    assert [item and item["narrator_id"] for item in body["items"]] == [4, None, 1]
+    assert body["missing"] == [ids[1]]
+
+
+@pytest.mark.parametrize("path", ["/hadiths/batch", "/narrators/batch"])
+@pytest.mark.parametrize("count", [0, 501])
+async def test_batch_size_is_limited(client, path, count):
+    ids = [str(ObjectId()) for _ in range(count)]
+    response = await client.post(path, json={"ids": ids})
+    assert response.status_code == 422
+
+
+@pytest.mark.parametrize("path", ["/hadiths/batch", "/narrators/batch"])
+async def test_batch_at_the_limit_is_accepted(client, path):
+    ids = [str(ObjectId()) for _ in range(500)]
+    response = await client.post(path, json={"ids": ids})
+    assert response.status_code == 200
+    assert response.json()["missing"] == ids
+
+
+async def test_expansion_loads_the_chain_in_one_lookup(client, monkeypatch):
+    calls = []
+    lookup = NarratorService.get_narrators_by_narrator_ids
+
+    async def counted(self, narrator_ids):
+        calls.append(list(narrator_ids))
+        return await lookup(self, narrator_ids)
+
+    monkeypatch.setattr(NarratorService, "get_narrators_by_narrator_ids", counted)
+    hadith = HADITHS[4]
+    response = await client.get(
+        f"/hadiths/{hadith['_id']}", params={"expand": "narrators"}
+    )
+    narrators = response.json()["narrators"]
+    assert [n["details"]["name"] for n in narrators] == [
+        NAMES[n] for n in _chain(hadith)
+    ]
+    assert calls == [_chain(hadith)]
+
+
+async def test_search_is_shed_with_503_when_busy(client, monkeypatch):
+    limiter = ConcurrencyLimiter(limit=1, max_queue=0, message="busy")
+    monkeypatch.setattr(hadith_service, "search_limiter", limiter)
+    async with limiter:
+        response = await client.get("/hadiths", params={"q": "حديث"})
+    assert response.status_code == 503
+    assert response.headers["retry-after"] == "1"
+    assert response.json() == {"detail": "busy"}
+
+    response = await client.get("/hadiths", params={"q": "حديث"})
+    assert response.status_code == 200
+
+
+@pytest.mark.parametrize(
+    ("error", "status_code", "retry_after"),
+    [
+        (ExecutionTimeout("operation exceeded time limit", code=50), 504, None),
+        (ServerSelectionTimeoutError("no servers"), 503, "1"),
+        (AutoReconnect("connection reset"), 503, "1"),
+    ],
+)
+async def test_database_errors_map_to_status_codes(
+    client, monkeypatch, error, status_code, retry_after
+):
+    async def fail(self, *args, **kwargs):
+        raise error
+
+    monkeypatch.setattr(hadith_service.HadithService, "get_hadith_by_id", fail)
+    response = await client.get(f"/hadiths/{HADITHS[0]['_id']}")
+    assert response.status_code == status_code
+    assert response.headers.get("retry-after") == retry_after
+    assert "detail" in response.json()
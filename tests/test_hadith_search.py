@@ -0,0 +1,205 @@
+import random
+
+import pytest
+from bson import ObjectId
+
+from app.core.normalization import hadith_search_fields, narrator_search_fields
+from app.core.pagination import encode_cursor
+from app.indexes.registry import HADITH_SORT, SearchIndexes
+from app.services.hadith_service import HadithService
+from app.services.narrator_service import NARRATOR_SORT
+from app.storage.backend import SnapshotDatabase
+from app.storage.snapshot import Snapshot, SnapshotWriter
+
+pytestmark = pytest.mark.anyio
+
+WORDS = ["قال", "رسول", "الله", "صلى", "عليه", "وسلم", "الصلاة", "الصيام", "زكاة"]
+NAMES = {n: f"راوي {n}" for n in range(1, 13)}
+# Chains embed vocalized copies of the names, as in the corpus.
+CHAIN_NAMES = {n: f"رَاوِي {n}" for n in NAMES}
+
+
+def _hadith(i: int, book_id: int, page_number: int, matn: str, chain: list[int]):
+    text = f"حدثنا {NAMES[chain[0]]}، {matn}"
+    doc = {
+        "_id": ObjectId(f"{i:024x}"),
+        "book_id": book_id,
+        "page_number": page_number,
+        "full_text": text,
+        "full_text_plain": text,
+        "matn": matn,
+        "matn_plain": matn,
+        "narrators": [
+            {"id": n, "name": CHAIN_NAMES[n], "name_plain": NAMES[n]} for n in chain
+        ],
+    }
+    return {**doc, **hadith_search_fields(doc)}
+
+
+def _corpus() -> tuple[list[dict], list[dict]]:
+    rng = random.Random(3)
+    hadiths = []
+    for i in range(240):
+        matn = " ".join(rng.choices(WORDS, k=rng.randint(4, 12)))
+        # Narrators may recur in a chain, as they do in the corpus.
+        chain = rng.choices(sorted(NAMES), k=rng.randint(1, 5))
+        hadiths.append(_hadith(i, rng.randint(1, 4), rng.randint(1, 30), matn, chain))
+    hadiths.sort(key=lambda d: (d["book_id"], d["page_number"], d["_id"]))
+    narrators = []
+    for n, name in NAMES.items():
+        doc = {
+            "_id": ObjectId(f"{1000 + n:024x}"),
+            "narrator_id": n,
+            "name": name,
+            "name_plain": name,
+            "kunya": "",
+            "nasab": "",
+        }
+        narrators.append({**doc, **narrator_search_fields(doc)})
+    return hadiths, narrators
+
+
+HADITHS, NARRATORS = _corpus()
+
+
+async def _aiter(docs):
+    for doc in docs:
+        yield doc
+
+
+async def _open(path, hadiths: list[dict]) -> tuple[Snapshot, tuple]:
+    """A service answering from MongoDB queries, and one using the indexes."""
+    writer = SnapshotWriter(path)
+    await writer.add_collection(
+        "hadiths", _aiter(hadiths), HADITH_SORT, multi_paths=["narrators.id"]
+    )
+    await writer.add_collection("narrators", _aiter(NARRATORS), NARRATOR_SORT)
+    writer.close()
+    snapshot = Snapshot(path)
+    db = SnapshotDatabase(snapshot)
+    indexes = SearchIndexes()
+    await indexes.build(db)
+    assert indexes.ready
+    return snapshot, (HadithService(db), HadithService(db, indexes))
+
+
+@pytest.fixture
+async def services(tmp_path):
+    snapshot, services = await _open(tmp_path / "corpus.snapshot", HADITHS)
+    yield services
+    snapshot.close()
+
+
+async def all_pages(service: HadithService, cursor: str | None = None, **search):
+    ids = []
+    while True:
+        page = await service.search_hadiths(
+            limit=25, cursor=cursor, view="summary", **search
+        )
+        ids += [item["id"] for item in page["items"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            return ids, page["total"]
+
+
+SEARCHES = [
+    {"full_text_plain": "الصلاة"},
+    {"full_text_plain": "الصلاة زكاه"},
+    {"full_text_plain": '"صلى الله"'},
+    {"full_text_plain": '"الله صلى"'},
+    {"full_text_plain": '"الصيام زكاة" الله'},
+    {"full_text_plain": "الصلاة", "book_id": 2},
+    {"full_text_plain": "الصيام", "narrators": "3"},
+    {"full_text_plain": "!!", "narrators": "3,5"},
+    {"narrators": "3,5", "narrators_ordered": True},
+    {"narrators": "3,5", "narrators_contiguous": True},
+]
+
+
+def test_corpus_has_chains_repeating_a_narrator():
+    chains = [[n["id"] for n in d["narrators"]] for d in HADITHS]
+    assert any(len(set(chain)) < len(chain) for chain in chains)
+
+
+@pytest.mark.parametrize("search", SEARCHES)
+async def test_index_and_mongo_paths_find_the_same_hadiths(services, search):
+    mongo, indexed = services
+    mongo_ids, mongo_total = await all_pages(mongo, **search)
+    index_ids, index_total = await all_pages(indexed, **search)
+    assert sorted(mongo_ids) == sorted(index_ids)
+    assert len(set(index_ids)) == len(index_ids)
+    assert mongo_total == index_total == len(mongo_ids)
+
+
+async def test_phrases_must_appear_in_order(services):
+    mongo, _ = services
+    ids, _ = await all_pages(mongo, full_text_plain='"صلى الله"')
+    assert ids
+    texts = {str(d["_id"]): d["full_text_norm"] for d in HADITHS}
+    assert all("صلي الله" in texts[i] for i in ids)
+
+
+async def test_text_without_tokens_does_not_filter(services):
+    _, indexed = services
+    for service in services:
+        page = await service.search_hadiths(full_text_plain=" ؟! ", limit=5)
+        assert page["total"] == len(HADITHS)
+    page = await indexed.search_hadiths(full_text_plain="!", narrators="3")
+    assert page["total"] == sum(3 in [n["id"] for n in d["narrators"]] for d in HADITHS)
+
+
+async def test_cursor_from_before_the_index_keeps_its_order(services):
+    mongo, indexed = services
+    first = await mongo.search_hadiths(full_text_plain="الصيام", limit=10)
+    rest, _ = await all_pages(
+        indexed, cursor=first["next_cursor"], full_text_plain="الصيام"
+    )
+    ids = [item["id"] for item in first["items"]] + rest
+    expected, _ = await all_pages(mongo, full_text_plain="الصيام")
+    assert ids == expected
+
+
+async def test_ranked_cursor_continues_in_corpus_order(services):
+    mongo, indexed = services
+    first = await indexed.search_hadiths(full_text_plain="الصيام", limit=10)
+    last = next(d for d in HADITHS if str(d["_id"]) == first["items"][-1]["id"])
+    rest, _ = await all_pages(
+        mongo, cursor=first["next_cursor"], full_text_plain="الصيام"
+    )
+    expected, _ = await all_pages(mongo, full_text_plain="الصيام")
+    position = expected.index(str(last["_id"]))
+    assert rest == expected[position + 1 :]
+
+
+async def test_malformed_cursor_is_rejected_in_both_modes(services):
+    bad = encode_cursor(["x", 1, 2, str(ObjectId())])
+    for service in services:
+        with pytest.raises(ValueError):
+            await service.search_hadiths(full_text_plain="الله", cursor=bad)
+
+
+@pytest.mark.parametrize("search", [{}, {"book_id": 2}, *SEARCHES])
+async def test_index_and_mongo_paths_count_the_same_facets(services, search):
+    mongo, indexed = services
+    mongo_page = await mongo.search_hadiths(facets=True, limit=5, **search)
+    index_page = await indexed.search_hadiths(facets=True, limit=5, **search)
+    assert mongo_page["facets"] == index_page["facets"]
+    assert mongo_page["total"] == index_page["total"]
+    named = {n["name"] for n in index_page["facets"]["narrators"]}
+    assert named <= set(NAMES.values())
+
+
+@pytest.mark.parametrize("mode", ["narrators_ordered", "narrators_contiguous"])
+async def test_repeated_narrators_match_at_any_position(tmp_path, mode):
+    chains = [[5, 3, 5], [5, 9, 3, 5], [3, 5], [5, 3]]
+    hadiths = [
+        _hadith(i, 1, i + 1, "قال رسول الله", chain) for i, chain in enumerate(chains)
+    ]
+    snapshot, services = await _open(tmp_path / "chains.snapshot", hadiths)
+    try:
+        for service in services:
+            ids, total = await all_pages(service, narrators="3,5", **{mode: True})
+            assert sorted(ids) == [str(d["_id"]) for d in hadiths[:3]]
+            assert total == 3
+    finally:
+        snapshot.close()
@@ -0,0 +1,84 @@
+import pytest
+
+from app.core.index_catalog import INDEX_CATALOG, RETIRED_INDEXES, reconcile_indexes
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeCollection:
+    def __init__(self, indexes: dict[str, list[tuple[str, int]]]) -> None:
+        self.indexes = {"_id_": [("_id", 1)], **indexes}
+        self.created: list[str] = []
+        self.dropped: list[str] = []
+
+    async def index_information(self) -> dict:
+        return {name: {"key": list(keys)} for name, keys in self.indexes.items()}
+
+    async def create_indexes(self, models) -> None:
+        for model in models:
+            document = model.document
+            self.indexes[document["name"]] = list(document["key"].items())
+            self.created.append(document["name"])
+
+    async def drop_index(self, name: str) -> None:
+        del self.indexes[name]
+        self.dropped.append(name)
+
+
+def _catalog(collection: str) -> dict[str, list[tuple[str, int]]]:
+    return {
+        spec.name: list(spec.keys)
+        for spec in INDEX_CATALOG
+        if spec.collection == collection
+    }
+
+
+@pytest.fixture
+def db() -> dict[str, FakeCollection]:
+    hadiths = _catalog("hadiths")
+    # Built by hand under another name: matched on its keys, not rebuilt.
+    hadiths["by_tokens"] = hadiths.pop("text_tokens_1")
+    del hadiths["book_id_1_page_number_1__id_1"]
+    hadiths["book_id_1"] = [("book_id", 1)]
+    return {
+        "users": FakeCollection({}),
+        "hadiths": FakeCollection(hadiths),
+        "narrators": FakeCollection(_catalog("narrators")),
+    }
+
+
+async def test_missing_indexes_are_created_and_matching_ones_kept(db):
+    await reconcile_indexes(db)
+    assert db["users"].created == ["email_1"]
+    assert db["hadiths"].created == ["book_id_1_page_number_1__id_1"]
+    assert db["narrators"].created == []
+    assert "by_tokens" in db["hadiths"].indexes
+
+
+async def test_retired_indexes_are_reported_but_kept_by_default(db):
+    retired = await reconcile_indexes(db)
+    assert retired == ["hadiths.book_id_1"]
+    assert "book_id_1" in db["hadiths"].indexes
+    assert all(not collection.dropped for collection in db.values())
+
+
+async def test_retired_indexes_are_dropped_on_request(db):
+    retired = await reconcile_indexes(db, drop_retired=True)
+    assert retired == []
+    assert db["hadiths"].dropped == ["book_id_1"]
+    assert set(RETIRED_INDEXES["hadiths"]).isdisjoint(db["hadiths"].indexes)
+
+
+async def test_only_the_given_collections_are_reconciled(db):
+    await reconcile_indexes(db, ["users"], drop_retired=True)
+    assert db["users"].created == ["email_1"]
+    assert db["hadiths"].created == db["hadiths"].dropped == []
+
+
+async def test_a_failing_collection_does_not_stop_the_others(db):
+    async def denied():
+        raise PermissionError("not authorized")
+
+    db["users"].index_information = denied
+    await reconcile_indexes(db)
+    assert db["hadiths"].created == ["book_id_1_page_number_1__id_1"]
@@ -0,0 +1,97 @@
+import json
+from concurrent.futures import ThreadPoolExecutor
+from types import SimpleNamespace
+
+import pytest
+
+from app.commands import ingest
+from app.commands.ingest import Checkpoint, natural_id
+
+pytestmark = pytest.mark.anyio
+
+RECORDS = [
+    {
+        "book_id": 1,
+        "page_number": page,
+        "full_text": f"حدثنا راو، قال حديث {page}",
+        "full_text_plain": f"حدثنا راو، قال حديث {page}",
+        "matn": f"قال حديث {page}",
+        "matn_plain": f"قال حديث {page}",
+    }
+    for page in range(11)
+]
+IDS = [natural_id("hadiths", record) for record in RECORDS]
+
+
+class Interrupted(Exception):
+    pass
+
+
+class FakeCollection:
+    """Records every inserted ``_id``; fails the write numbered ``fail_on``."""
+
+    def __init__(self) -> None:
+        self.inserted: list = []
+        self.writes = 0
+        self.fail_on: int | None = None
+
+    async def insert_many(self, documents, ordered=True):
+        self.writes += 1
+        if self.writes == self.fail_on:
+            raise Interrupted
+        self.inserted += [document["_id"] for document in documents]
+
+
+def _write_source(path, suffix):
+    source = path / f"hadiths{suffix}"
+    if suffix == ".jsonl":
+        # Blank lines must not shift the saved offsets.
+        source.write_text(
+            "\n".join(json.dumps(r, ensure_ascii=False) + "\n" for r in RECORDS)
+        )
+    else:
+        source.write_text(json.dumps(RECORDS, ensure_ascii=False, indent=1))
+    return source
+
+
+async def _load(source):
+    checkpoint = Checkpoint(source.with_suffix(".checkpoint"), source, "hadiths")
+    checkpoint.load()
+    await ingest.ingest("hadiths", source, 3, 1, "insert", checkpoint)
+    return checkpoint
+
+
+@pytest.fixture
+def collection(monkeypatch):
+    collection = FakeCollection()
+    monkeypatch.setattr(ingest, "database", SimpleNamespace(db={"hadiths": collection}))
+    # Batches are prepared the same way in a thread; tests avoid forking.
+    monkeypatch.setattr(ingest, "ProcessPoolExecutor", ThreadPoolExecutor)
+    return collection
+
+
+@pytest.mark.parametrize("suffix", [".jsonl", ".json"])
+async def test_resume_neither_duplicates_nor_skips(tmp_path, collection, suffix):
+    source = _write_source(tmp_path, suffix)
+    collection.fail_on = 3
+    with pytest.raises(Interrupted):
+        await _load(source)
+    assert collection.inserted == IDS[:6]
+
+    collection.fail_on = None
+    checkpoint = await _load(source)
+    assert collection.inserted == IDS
+    assert checkpoint.records == len(RECORDS)
+
+    # Running again after a finished load writes nothing.
+    await _load(source)
+    assert collection.inserted == IDS
+
+
+async def test_checkpoint_of_another_source_is_refused(tmp_path, collection):
+    source = _write_source(tmp_path, ".jsonl")
+    checkpoint = await _load(source)
+    other = tmp_path / "other.jsonl"
+    other.write_text(source.read_text())
+    with pytest.raises(SystemExit):
+        Checkpoint(checkpoint.path, other, "hadiths").load()
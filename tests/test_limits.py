@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from app.core.limits import ConcurrencyLimiter, OverloadedError
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_calls_beyond_the_queue_are_shed():
+    limiter = ConcurrencyLimiter(limit=1, max_queue=1, message="busy")
+    release = asyncio.Event()
+    running = 0
+    peak = 0
+
+    async def call():
+        nonlocal running, peak
+        async with limiter:
+            running += 1
+            peak = max(peak, running)
+            await release.wait()
+            running -= 1
+
+    first = asyncio.create_task(call())
+    queued = asyncio.create_task(call())
+    await asyncio.sleep(0)
+    assert limiter.pending == 2
+
+    with pytest.raises(OverloadedError, match="busy"):
+        await call()
+    assert limiter.pending == 2
+
+    release.set()
+    await asyncio.gather(first, queued)
+    assert peak == 1
+    assert limiter.pending == 0
+
+
+async def test_cancelled_waiter_gives_its_place_back():
+    limiter = ConcurrencyLimiter(limit=1, max_queue=1, message="busy")
+    await limiter.__aenter__()
+    waiter = asyncio.create_task(limiter.__aenter__())
+    await asyncio.sleep(0)
+    assert limiter.pending == 2
+
+    waiter.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert limiter.pending == 1
+
+    await limiter.__aexit__(None, None, None)
+    async with limiter:
+        assert limiter.pending == 1
+    assert limiter.pending == 0
+
+
+async def test_failing_call_releases_its_slot():
+    limiter = ConcurrencyLimiter(limit=1, max_queue=0, message="busy")
+    with pytest.raises(LookupError):
+        async with limiter:
+            raise LookupError
+    async with limiter:
+        assert limiter.pending == 1
@@ -0,0 +1,70 @@
+import httpx
+import pytest
+from fastapi import APIRouter, FastAPI
+from prometheus_client import REGISTRY
+
+from app.core.metrics import UNMATCHED_ROUTE, MetricsMiddleware, metrics_endpoint
+
+pytestmark = pytest.mark.anyio
+
+
+def _app() -> FastAPI:
+    """Routers nested the way create_app nests them, under a prefix."""
+    items = APIRouter(prefix="/items")
+
+    @items.get("/{item_id}")
+    async def get_item(item_id: int) -> dict:
+        return {"id": item_id}
+
+    api = APIRouter()
+    api.include_router(items)
+    app = FastAPI()
+    app.add_middleware(MetricsMiddleware)
+    app.add_route("/metrics", metrics_endpoint, include_in_schema=False)
+    app.include_router(api, prefix="/api/v1")
+    return app
+
+
+def _count(route: str, status: str) -> float:
+    labels = {"method": "GET", "route": route, "status": status}
+    value = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels)
+    return value or 0
+
+
+@pytest.fixture
+async def client():
+    transport = httpx.ASGITransport(app=_app())
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as c:
+        yield c
+
+
+async def test_requests_are_labelled_with_the_full_route(client):
+    route = "/api/v1/items/{item_id}"
+    before = _count(route, "200"), _count(route, "422")
+    for path in ["/api/v1/items/1", "/api/v1/items/2", "/api/v1/items/x"]:
+        await client.get(path)
+    assert (_count(route, "200"), _count(route, "422")) == (
+        before[0] + 2,
+        before[1] + 1,
+    )
+    assert _count("/items/{item_id}", "200") == 0
+
+
+async def test_unmatched_paths_share_one_label(client):
+    before = _count(UNMATCHED_ROUTE, "404")
+    await client.get("/api/v1/nothing/1")
+    await client.get("/elsewhere")
+    assert _count(UNMATCHED_ROUTE, "404") == before + 2
+
+
+async def test_metrics_endpoint_exposes_the_series(client):
+    await client.get("/api/v1/items/7")
+    response = await client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    assert (
+        'http_request_duration_seconds_count{method="GET",'
+        'route="/api/v1/items/{item_id}",status="200"}'
+    ) in response.text
+    assert "http_requests_in_flight" in response.text
+    assert "mongodb_command_duration_seconds" in response.text
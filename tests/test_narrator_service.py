@@ -0,0 +1,146 @@
+import pytest
+from bson import ObjectId
+
+from app.core.normalization import narrator_search_fields
+from app.core.pagination import InvalidCursorError
+from app.indexes.registry import HADITH_SORT, SearchIndexes
+from app.services.narrator_loader import NarratorLoader
+from app.services.narrator_service import NARRATOR_SORT, NarratorService
+from app.storage.backend import SnapshotDatabase
+from app.storage.snapshot import Snapshot, SnapshotWriter
+
+pytestmark = pytest.mark.anyio
+
+NARRATORS = [
+    (1, "عبد الرحمن بن صخر", "أبو هريرة", "الدوسي"),
+    (2, "مالك بن أنس", "أبو عبد الله", "الأصبحي"),
+    (3, "محمد بن مسلم", "أبو بكر", "الزهري"),
+]
+
+
+async def _narrators():
+    for narrator_id, name, kunya, nasab in NARRATORS:
+        doc = {
+            "_id": ObjectId(f"{narrator_id:024x}"),
+            "narrator_id": narrator_id,
+            "name": name,
+            "name_plain": name,
+            "kunya": kunya,
+            "nasab": nasab,
+        }
+        yield {**doc, **narrator_search_fields(doc)}
+
+
+async def _nothing():
+    return
+    yield
+
+
+@pytest.fixture
+async def db(tmp_path):
+    writer = SnapshotWriter(tmp_path / "corpus.snapshot")
+    await writer.add_collection("hadiths", _nothing(), HADITH_SORT, ["narrators.id"])
+    await writer.add_collection("narrators", _narrators(), NARRATOR_SORT)
+    writer.close()
+    snapshot = Snapshot(tmp_path / "corpus.snapshot")
+    yield SnapshotDatabase(snapshot)
+    snapshot.close()
+
+
+@pytest.fixture
+def service(db):
+    return NarratorService(db)
+
+
+@pytest.fixture
+async def indexed(db):
+    indexes = SearchIndexes()
+    await indexes.build(db)
+    return NarratorService(db, indexes)
+
+
+async def suggested(service: NarratorService, q: str) -> list[int]:
+    result = await service.suggest_narrators(q)
+    return sorted(item["narrator_id"] for item in result["items"])
+
+
+async def test_suggest_fallback_matches_name_kunya_and_nasab(service):
+    assert await suggested(service, "مال") == [2]
+    assert await suggested(service, "ابو") == [1, 2, 3]
+    assert await suggested(service, "ابو هرير") == [1]
+    assert await suggested(service, "الزهر") == [3]
+
+
+async def test_suggest_fallback_without_tokens(service):
+    assert await suggested(service, "  ") == []
+    assert await suggested(service, "قتادة") == []
+
+
+@pytest.mark.parametrize("ready", [False, True])
+async def test_fuzzy_search_rejects_a_cursor(service, indexed, ready):
+    searcher = indexed if ready else service
+    first = await service.search_narrators(limit=1)
+    with pytest.raises(InvalidCursorError):
+        await searcher.search_narrators(
+            name_plain="مالك", fuzzy=True, cursor=first["next_cursor"]
+        )
+
+
+@pytest.mark.parametrize("ready", [False, True])
+async def test_fuzzy_search_pages_with_skip_only(service, indexed, ready):
+    searcher = indexed if ready else service
+    page = await searcher.search_narrators(name_plain="بن", fuzzy=True, limit=1)
+    assert page["has_more"]
+    assert page["next_cursor"] is None
+
+
+async def test_fuzzy_search_total(indexed):
+    page = await indexed.search_narrators(name_plain="مالك بن انس", fuzzy=True)
+    assert page["items"][0]["narrator_id"] == 2
+    assert page["total"] == len(page["items"])
+    page = await indexed.search_narrators(
+        name_plain="مالك بن انس", fuzzy=True, include_total=False
+    )
+    assert page["total"] is None
+    assert page["items"][0]["narrator_id"] == 2
+
+
+class CountingCollection:
+    """Passes through to a collection, recording each ``find`` filter."""
+
+    def __init__(self, collection) -> None:
+        self.collection = collection
+        self.filters: list[dict] = []
+
+    def find(self, filter, *args, **kwargs):
+        self.filters.append(filter)
+        return self.collection.find(filter, *args, **kwargs)
+
+
+async def test_loader_queries_each_narrator_once(service):
+    counting = CountingCollection(service.collection)
+    service.collection = counting
+    loader = NarratorLoader(service)
+
+    first = await loader.load_many([2, 1, 2, 9])
+    assert [n and n["narrator_id"] for n in first] == [2, 1, 2, None]
+    assert counting.filters == [{"narrator_id": {"$in": [2, 1, 9]}}]
+
+    second = await loader.load_many([9, 3, 1])
+    assert [n and n["narrator_id"] for n in second] == [None, 3, 1]
+    assert counting.filters[1:] == [{"narrator_id": {"$in": [3]}}]
+
+    await loader.load_many([1, 2, 3, 9])
+    assert len(counting.filters) == 2
+
+
+async def test_loaders_share_the_record_cache(service):
+    counting = CountingCollection(service.collection)
+    service.collection = counting
+    await NarratorLoader(service).load_many([1, 2])
+    # A later request's loader only queries what no request has seen yet.
+    await NarratorLoader(service).load_many([2, 3])
+    assert counting.filters == [
+        {"narrator_id": {"$in": [1, 2]}},
+        {"narrator_id": {"$in": [3]}},
+    ]
@@ -0,0 +1,52 @@
+import base64
+
+import pytest
+
+from app.core.pagination import (
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    keyset_query,
+)
+
+
+def test_cursor_round_trip():
+    values = [12.5, 3, 140, "665f1c2e9b1e8a0012345678"]
+    cursor = encode_cursor(values)
+    assert "=" not in cursor
+    assert decode_cursor(cursor, len(values)) == values
+
+
+def test_cursor_of_arabic_text_round_trips():
+    values = ["حدثنا", 1]
+    assert decode_cursor(encode_cursor(values), 2) == values
+
+
+@pytest.mark.parametrize(
+    "cursor",
+    [
+        "not a cursor!",
+        encode_cursor([1, 2, 3])[:-3] + "***",
+        base64.urlsafe_b64encode(b"[1, 2").decode(),
+        base64.urlsafe_b64encode(b'{"book_id": 1}').decode(),
+        base64.urlsafe_b64encode(b"\xff\xfe").decode(),
+    ],
+)
+def test_tampered_cursor_is_rejected(cursor):
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(cursor, 3)
+
+
+def test_cursor_of_another_length_is_rejected():
+    with pytest.raises(InvalidCursorError):
+        decode_cursor(encode_cursor([1, 2]), 3)
+
+
+def test_keyset_query_follows_sort_directions():
+    query = keyset_query([("book_id", 1), ("_id", -1)], [4, "x"])
+    assert query == {
+        "$or": [
+            {"book_id": {"$gt": 4}},
+            {"book_id": 4, "_id": {"$lt": "x"}},
+        ]
+    }
@@ -0,0 +1,115 @@
+import asyncio
+
+import pytest
+
+from app.core.singleflight import SingleFlight
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_concurrent_callers_share_one_result():
+    flights = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        return {"items": []}
+
+    waiters = [asyncio.create_task(flights.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    assert len(flights) == 1
+    release.set()
+    results = await asyncio.gather(*waiters)
+    assert calls == 1
+    assert all(result is results[0] for result in results)
+    assert len(flights) == 0
+
+
+async def test_concurrent_callers_share_one_exception():
+    flights = SingleFlight()
+    calls = 0
+    release = asyncio.Event()
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        await release.wait()
+        raise LookupError("boom")
+
+    waiters = [asyncio.create_task(flights.do("key", call)) for _ in range(3)]
+    await asyncio.sleep(0)
+    release.set()
+    errors = await asyncio.gather(*waiters, return_exceptions=True)
+    assert calls == 1
+    assert all(isinstance(error, LookupError) for error in errors)
+    assert all(error is errors[0] for error in errors)
+    assert len(flights) == 0
+
+
+async def test_key_is_cleared_so_later_calls_run_again():
+    flights = SingleFlight()
+    calls = 0
+
+    async def call():
+        nonlocal calls
+        calls += 1
+        return calls
+
+    assert await flights.do("key", call) == 1
+    assert await flights.do("key", call) == 2
+    assert len(flights) == 0
+
+
+async def test_different_keys_do_not_share():
+    flights = SingleFlight()
+
+    async def call(value):
+        await asyncio.sleep(0)
+        return value
+
+    results = await asyncio.gather(
+        flights.do("a", lambda: call(1)), flights.do("b", lambda: call(2))
+    )
+    assert results == [1, 2]
+
+
+async def test_cancelling_one_waiter_keeps_the_call_for_others():
+    flights = SingleFlight()
+    release = asyncio.Event()
+
+    async def call():
+        await release.wait()
+        return "done"
+
+    first = asyncio.create_task(flights.do("key", call))
+    second = asyncio.create_task(flights.do("key", call))
+    await asyncio.sleep(0)
+    first.cancel()
+    await asyncio.sleep(0)
+    release.set()
+    assert await second == "done"
+    assert first.cancelled()
+    assert len(flights) == 0
+
+
+async def test_call_is_cancelled_when_every_waiter_leaves():
+    flights = SingleFlight()
+    started = asyncio.Event()
+    cancelled = asyncio.Event()
+
+    async def call():
+        started.set()
+        try:
+            await asyncio.Event().wait()
+        except asyncio.CancelledError:
+            cancelled.set()
+            raise
+
+    waiter = asyncio.create_task(flights.do("key", call))
+    await started.wait()
+    waiter.cancel()
+    await asyncio.wait_for(cancelled.wait(), 1)
+    assert len(flights) == 0
@@ -0,0 +1,175 @@
+import random
+import threading
+
+import pytest
+from bson import ObjectId
+
+from app.core.pagination import keyset_query
+from app.indexes.registry import HADITH_SORT
+from app.storage import backend
+from app.storage.backend import SnapshotDatabase
+from app.storage.query import matches, project, run_pipeline, sort_documents
+from app.storage.snapshot import Snapshot, SnapshotWriter
+
+pytestmark = pytest.mark.anyio
+
+
+def _hadiths() -> list[dict]:
+    rng = random.Random(7)
+    docs = []
+    for i in range(300):
+        chain = rng.sample(range(1, 30), rng.randint(0, 5))
+        docs.append(
+            {
+                "_id": ObjectId(f"{i:024x}"),
+                "book_id": rng.randint(1, 6),
+                "page_number": rng.randint(1, 40),
+                "text_tokens": rng.sample(["a", "b", "c", "d"], rng.randint(1, 3)),
+                "narrators": [{"id": n, "name": f"n{n}"} for n in chain],
+            }
+        )
+    docs.sort(key=lambda d: (d["book_id"], d["page_number"], d["_id"]))
+    return docs
+
+
+HADITHS = _hadiths()
+
+
+async def _aiter(docs):
+    for doc in docs:
+        yield doc
+
+
+@pytest.fixture
+async def db(tmp_path):
+    writer = SnapshotWriter(tmp_path / "corpus.snapshot")
+    await writer.add_collection(
+        "hadiths", _aiter(HADITHS), HADITH_SORT, multi_paths=["narrators.id"]
+    )
+    writer.close()
+    snapshot = Snapshot(tmp_path / "corpus.snapshot")
+    yield SnapshotDatabase(snapshot)
+    snapshot.close()
+
+
+def expected(query: dict) -> list[dict]:
+    return [doc for doc in HADITHS if matches(doc, query)]
+
+
+QUERIES = [
+    {},
+    {"book_id": 3},
+    {"book_id": {"$in": [2, 5]}},
+    {"narrators.id": 4},
+    {"narrators.id": {"$in": [4, 9]}},
+    {"narrators.id": {"$all": [4, 9]}},
+    {"narrators.id": {"$all": [4]}, "book_id": 2},
+    {"$and": [{"book_id": 2}, {"text_tokens": {"$all": ["a", "b"]}}]},
+    {"_id": HADITHS[17]["_id"]},
+    {"_id": {"$in": [HADITHS[3]["_id"], HADITHS[250]["_id"], ObjectId()]}},
+    {"page_number": {"$gte": 30}},
+    {"book_id": "3"},
+    {"narrators": {"$exists": True}, "narrators.id": {"$nin": [1, 2, 3]}},
+    {"$or": [{"book_id": 1}, {"narrators.id": 5}]},
+    {
+        "$and": [
+            {"narrators.id": 6},
+            keyset_query(HADITH_SORT, [3, 10, HADITHS[100]["_id"]]),
+        ]
+    },
+]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+async def test_find_and_count_agree_with_a_full_scan(db, query):
+    found = await db.hadiths.find(query).to_list()
+    assert found == expected(query)
+    assert await db.hadiths.count_documents(query) == len(found)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+async def test_plan_never_drops_a_match(db, query):
+    positions, exact = db.hadiths.plan(query)
+    planned = {HADITHS[p]["_id"] for p in positions}
+    matching = {doc["_id"] for doc in expected(query)}
+    assert matching <= planned
+    if exact:
+        assert planned == matching
+
+
+async def test_keyset_pages_cover_the_collection_in_order(db):
+    seen = []
+    after = None
+    while True:
+        query = {} if after is None else keyset_query(HADITH_SORT, after)
+        page = await db.hadiths.find(query).sort(HADITH_SORT).limit(25).to_list()
+        if not page:
+            break
+        seen += page
+        last = page[-1]
+        after = [last["book_id"], last["page_number"], last["_id"]]
+    assert seen == HADITHS
+
+
+async def test_skip_limit_and_projection(db):
+    query = {"narrators.id": {"$in": [1, 2]}}
+    cursor = db.hadiths.find(query, {"book_id": 1, "narrators.id": 1})
+    page = await cursor.sort(HADITH_SORT).skip(3).limit(4).to_list()
+    assert page == [
+        project(doc, {"book_id": 1, "narrators.id": 1}) for doc in expected(query)[3:7]
+    ]
+
+
+async def test_non_native_sort_is_done_in_memory(db):
+    page = await (
+        db.hadiths.find({"book_id": 2}).sort([("page_number", -1), ("_id", 1)])
+    ).to_list()
+    assert page == sorted(
+        expected({"book_id": 2}), key=lambda d: (-d["page_number"], d["_id"])
+    )
+
+
+async def test_find_one(db):
+    doc = HADITHS[42]
+    assert await db.hadiths.find_one({"_id": doc["_id"]}) == doc
+    assert await db.hadiths.find_one({"_id": ObjectId()}) is None
+
+
+async def test_aggregate_plans_the_leading_match(db):
+    pipeline = [
+        {"$match": {"narrators.id": 4}},
+        {"$group": {"_id": "$book_id", "count": {"$sum": 1}}},
+        {"$sort": {"_id": 1}},
+    ]
+    counts: dict[int, int] = {}
+    for doc in expected({"narrators.id": 4}):
+        counts[doc["book_id"]] = counts.get(doc["book_id"], 0) + 1
+    result = await db.hadiths.aggregate(pipeline).to_list()
+    assert result == [{"_id": k, "count": v} for k, v in sorted(counts.items())]
+
+
+async def test_postings_are_built_when_the_snapshot_opens(db):
+    assert set(db.hadiths.data._postings) == {"narrators.id"}
+
+
+async def test_full_decodes_run_off_the_event_loop(db, monkeypatch):
+    threads = []
+
+    def recording(function):
+        def wrapper(*args):
+            threads.append(threading.current_thread())
+            return function(*args)
+
+        return wrapper
+
+    monkeypatch.setattr(backend, "run_pipeline", recording(run_pipeline))
+    monkeypatch.setattr(backend, "sort_documents", recording(sort_documents))
+    await db.hadiths.aggregate([{"$match": {"book_id": 2}}, {"$count": "n"}]).to_list()
+    await db.hadiths.find({"book_id": 2}).sort("page_number", -1).to_list()
+    assert len(threads) == 2
+    assert threading.main_thread() not in threads
+
+
+async def test_unknown_collection_raises(db):
+    with pytest.raises(KeyError):
+        db["missing"]
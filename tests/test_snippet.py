@@ -0,0 +1,47 @@
+from app.services.hadith_service import SNIPPET_LENGTH, _snippet_expression
+from app.storage.query import evaluate
+
+ISNAD = "حدثنا عبد الله بن يوسف قال أخبرنا مالك عن نافع عن عبد الله بن عمر "
+MATN = (
+    "إنما الأعمال بالنيات وإنما لكل امرئ ما نوى فمن كانت هجرته إلى دنيا "
+    "يصيبها أو إلى امرأة ينكحها فهجرته إلى ما هاجر إليه"
+)
+HADITH = {
+    "matn_plain": MATN * 2,
+    "full_text_plain": f"{ISNAD * 3}قال رسول الله صلى الله عليه وسلم {MATN * 2}",
+}
+
+
+def snippet(query: str | None, doc: dict = HADITH) -> str:
+    return evaluate(_snippet_expression(query), doc)
+
+
+def test_snippet_is_stored_text_cut_at_whitespace():
+    text = snippet("امراه ينكحها")
+    assert "امرأة ينكحها" in text
+    assert len(text) <= SNIPPET_LENGTH
+    assert f" {text} " in f" {HADITH['matn_plain']} "
+
+
+def test_match_in_the_matn_is_preferred():
+    text = snippet("عبد الله ينكحها")
+    assert "ينكحها" in text
+    assert "حدثنا" not in text
+
+
+def test_match_in_the_isnad_only_falls_back_to_the_full_text():
+    text = snippet("نافع")
+    assert "نافع" in text
+    assert f" {text} " in f" {HADITH['full_text_plain']} "
+
+
+def test_without_a_match_the_snippet_is_the_start_of_the_matn():
+    for query in (None, "زكاه"):
+        text = snippet(query)
+        assert text.startswith("إنما الأعمال")
+        assert f" {text} " in f" {HADITH['matn_plain']} "
+
+
+def test_short_and_missing_texts():
+    assert snippet("x", {"matn_plain": "short text"}) == "short text"
+    assert snippet("x", {}) == ""
@@ -0,0 +1,289 @@
+import pytest
+from bson import ObjectId
+
+from app.storage.query import (
+    UnsupportedQueryError,
+    evaluate,
+    matches,
+    project,
+    run_pipeline,
+)
+
+# Expected results follow MongoDB's documented behaviour.
+DOC = {
+    "_id": ObjectId("665f1c2e9b1e8a0012345678"),
+    "book_id": 3,
+    "title": "Sahih",
+    "tags": ["fiqh", "salah"],
+    "narrators": [{"id": 1, "name": "a"}, {"id": 2, "name": "b"}, {"id": 1}],
+    "empty": [],
+    "none": None,
+}
+
+
+@pytest.mark.parametrize(
+    ("query", "expected"),
+    [
+        # Equality; an array matches on any element or on the whole array.
+        ({"book_id": 3}, True),
+        ({"book_id": 4}, False),
+        ({"tags": "salah"}, True),
+        ({"tags": ["fiqh", "salah"]}, True),
+        ({"tags": ["salah", "fiqh"]}, False),
+        ({"narrators.id": 2}, True),
+        ({"narrators.name": "c"}, False),
+        # null matches null and missing fields, not present ones.
+        ({"none": None}, True),
+        ({"missing": None}, True),
+        ({"book_id": None}, False),
+        ({"missing": {"$eq": None}}, True),
+        ({"missing": {"$ne": None}}, False),
+        ({"missing": {"$in": [None, 1]}}, True),
+        ({"missing": {"$nin": [None]}}, False),
+        # $eq / $ne / $in / $nin
+        ({"book_id": {"$eq": 3}}, True),
+        ({"tags": {"$ne": "fiqh"}}, False),
+        ({"tags": {"$ne": "zakah"}}, True),
+        ({"missing": {"$ne": 1}}, True),
+        ({"narrators.id": {"$in": [5, 2]}}, True),
+        ({"narrators.id": {"$in": []}}, False),
+        ({"narrators.id": {"$nin": [5, 6]}}, True),
+        ({"narrators.id": {"$nin": [1]}}, False),
+        # $all needs every value; an empty $all matches nothing.
+        ({"narrators.id": {"$all": [2, 1]}}, True),
+        ({"narrators.id": {"$all": [1, 3]}}, False),
+        ({"narrators.id": {"$all": []}}, False),
+        # Comparisons match on any element, and only within one type.
+        ({"book_id": {"$gt": 2, "$lte": 3}}, True),
+        ({"book_id": {"$gte": 4}}, False),
+        ({"narrators.id": {"$lt": 2}}, True),
+        ({"title": {"$gt": 1}}, False),
+        ({"missing": {"$gt": 1}}, False),
+        # $regex applies to strings only, with $options.
+        ({"title": {"$regex": "^sah", "$options": "i"}}, True),
+        ({"title": {"$regex": "^sah"}}, False),
+        ({"tags": {"$regex": "^sal"}}, True),
+        ({"book_id": {"$regex": "3"}}, False),
+        # $exists: null is present, an empty array is present.
+        ({"none": {"$exists": True}}, True),
+        ({"empty": {"$exists": True}}, True),
+        ({"missing": {"$exists": False}}, True),
+        ({"narrators.name": {"$exists": True}}, True),
+        # Logical operators.
+        ({"$and": [{"book_id": 3}, {"tags": "fiqh"}]}, True),
+        ({"$or": [{"book_id": 4}, {"tags": "fiqh"}]}, True),
+        ({"$nor": [{"book_id": 4}, {"tags": "zakah"}]}, True),
+        ({"$expr": {"$lt": [{"$indexOfArray": ["$narrators.id", 2]}, 2]}}, True),
+        ({}, True),
+    ],
+)
+def test_matches(query, expected):
+    assert matches(DOC, query) is expected
+
+
+@pytest.mark.parametrize(
+    "query",
+    [{"$where": "true"}, {"book_id": {"$size": 1}}, {"$text": {"$search": "x"}}],
+)
+def test_unsupported_query_operators_raise(query):
+    with pytest.raises(UnsupportedQueryError):
+        matches(DOC, query)
+
+
+@pytest.mark.parametrize(
+    ("expression", "expected"),
+    [
+        ("$book_id", 3),
+        ("$narrators.id", [1, 2, 1]),
+        ("$missing", None),
+        ({"$literal": "$book_id"}, "$book_id"),
+        ({"$let": {"vars": {"x": "$book_id"}, "in": {"$add": ["$$x", 1]}}}, 4),
+        ({"$let": {"vars": {"n": {"$literal": {"a": 5}}}, "in": "$$n.a"}}, 5),
+        ({"$cond": [{"$gt": ["$book_id", 2]}, "big", "small"]}, "big"),
+        ({"$cond": {"if": False, "then": 1, "else": 2}}, 2),
+        ({"$and": [True, {"$eq": ["$book_id", 3]}]}, True),
+        ({"$or": [False, {"$ne": ["$book_id", 3]}]}, False),
+        ({"$not": [False]}, True),
+        # Arithmetic on null gives null; $max and $min skip nulls.
+        ({"$add": ["$book_id", 2]}, 5),
+        ({"$add": ["$book_id", "$missing"]}, None),
+        ({"$subtract": ["$book_id", 5]}, -2),
+        ({"$subtract": ["$missing", 5]}, None),
+        ({"$max": [1, "$missing", 4]}, 4),
+        ({"$min": [1, "$missing", 4]}, 1),
+        ({"$max": ["$missing", None]}, None),
+        # Arrays and strings; string positions count code points.
+        ({"$indexOfArray": ["$narrators.id", 2]}, 1),
+        ({"$indexOfArray": ["$narrators.id", 9]}, -1),
+        ({"$indexOfArray": ["$missing", 9]}, None),
+        ({"$indexOfArray": ["$narrators.id", 1, 1]}, 2),
+        ({"$indexOfArray": ["$narrators.id", 2, 2]}, -1),
+        ({"$indexOfArray": ["$narrators.id", 1, 7]}, -1),
+        ({"$in": [2, "$narrators.id"]}, True),
+        ({"$in": [{"$literal": [1, 2]}, [[2, 1], [1, 2]]]}, True),
+        ({"$size": "$narrators"}, 3),
+        ({"$size": [{"$literal": [[1, 2]]}]}, 1),
+        ({"$range": [0, 3]}, [0, 1, 2]),
+        ({"$slice": ["$narrators.id", 2]}, [1, 2]),
+        ({"$slice": ["$narrators.id", -1]}, [1]),
+        ({"$slice": ["$narrators.id", 1, 5]}, [2, 1]),
+        ({"$slice": ["$narrators.id", -2, 1]}, [2]),
+        ({"$slice": ["$missing", 1]}, None),
+        (
+            {"$map": {"input": "$narrators.id", "as": "n", "in": {"$add": ["$$n", 1]}}},
+            [2, 3, 2],
+        ),
+        ({"$map": {"input": "$missing", "as": "n", "in": "$$n"}}, None),
+        (
+            {
+                "$reduce": {
+                    "input": "$narrators.id",
+                    "initialValue": 10,
+                    "in": {"$add": ["$$value", "$$this"]},
+                }
+            },
+            14,
+        ),
+        ({"$reduce": {"input": "$missing", "initialValue": 0, "in": 1}}, None),
+        ({"$arrayElemAt": ["$tags", 1]}, "salah"),
+        ({"$arrayElemAt": ["$tags", -1]}, "salah"),
+        ({"$arrayElemAt": ["$tags", 5]}, None),
+        ({"$indexOfCP": ["قال رسول", "رسول"]}, 4),
+        ({"$indexOfCP": ["$missing", "x"]}, None),
+        ({"$substrCP": ["قال رسول", 4, 2]}, "رس"),
+        ({"$substrCP": ["$missing", 0, 2]}, ""),
+        ({"$strLenCP": "قَالَ"}, 5),
+        ({"$ifNull": ["$missing", "$none", "fallback"]}, "fallback"),
+        ({"$ifNull": ["$title", "fallback"]}, "Sahih"),
+        (
+            {"$regexFind": {"input": "قال رسول الله", "regex": "ر(س)ول"}},
+            {"match": "رسول", "idx": 4, "captures": ["س"]},
+        ),
+        (
+            {"$regexFind": {"input": "$title", "regex": "SAH", "options": "i"}},
+            {"match": "Sah", "idx": 0, "captures": []},
+        ),
+        ({"$regexFind": {"input": "$title", "regex": "x"}}, None),
+        ({"$regexFind": {"input": "$missing", "regex": "x"}}, None),
+    ],
+)
+def test_evaluate(expression, expected):
+    assert evaluate(expression, DOC) == expected
+
+
+def test_unsupported_expression_operators_raise():
+    with pytest.raises(UnsupportedQueryError):
+        evaluate({"$toUpper": "$title"}, DOC)
+
+
+def test_inclusion_projection_keeps_id_and_listed_paths():
+    assert project(DOC, {"book_id": 1, "narrators.id": 1}) == {
+        "_id": DOC["_id"],
+        "book_id": 3,
+        "narrators": [{"id": 1}, {"id": 2}, {"id": 1}],
+    }
+    assert project(DOC, {"_id": 0, "title": 1, "missing": 1}) == {"title": "Sahih"}
+
+
+def test_exclusion_projection_drops_listed_fields():
+    result = project(DOC, {"narrators": 0, "tags": 0, "_id": 0})
+    assert set(result) == {"book_id", "title", "empty", "none"}
+    with pytest.raises(UnsupportedQueryError):
+        project(DOC, {"narrators.name": 0})
+
+
+def test_computed_projection_fields():
+    result = project(DOC, {"book_id": 1, "next": {"$add": ["$book_id", 1]}})
+    assert result == {"_id": DOC["_id"], "book_id": 3, "next": 4}
+
+
+def test_no_projection_returns_the_document():
+    assert project(DOC, None) is DOC
+
+
+DOCS = [
+    {"_id": 1, "book": 2, "narrators": [{"id": 7, "name": "x"}, {"id": 8}]},
+    {"_id": 2, "book": 1, "narrators": [{"id": 7, "name": "x"}, {"id": 7}]},
+    {"_id": 3, "book": 2, "narrators": []},
+    {"_id": 4, "book": None},
+    {"_id": 5},
+]
+
+
+def test_sort_puts_null_and_missing_first_and_is_stable():
+    result = run_pipeline(list(DOCS), [{"$sort": {"book": 1, "_id": -1}}])
+    assert [doc["_id"] for doc in result] == [5, 4, 2, 3, 1]
+    result = run_pipeline(list(DOCS), [{"$sort": {"book": -1}}])
+    assert [doc["_id"] for doc in result] == [1, 3, 2, 4, 5]
+
+
+def test_skip_limit_and_count():
+    stages = [{"$sort": {"_id": 1}}, {"$skip": 1}, {"$limit": 2}]
+    assert [doc["_id"] for doc in run_pipeline(list(DOCS), stages)] == [2, 3]
+    assert run_pipeline(list(DOCS), [{"$count": "n"}]) == [{"n": 5}]
+    # $count emits no document for no input.
+    assert run_pipeline([], [{"$count": "n"}]) == []
+
+
+def test_unwind_skips_missing_null_and_empty_arrays():
+    result = run_pipeline(list(DOCS), [{"$unwind": "$narrators"}])
+    assert [(doc["_id"], doc["narrators"]["id"]) for doc in result] == [
+        (1, 7),
+        (1, 8),
+        (2, 7),
+        (2, 7),
+    ]
+
+
+def test_group_with_sum_and_first():
+    stages = [
+        {"$unwind": "$narrators"},
+        {
+            "$group": {
+                "_id": "$narrators.id",
+                "name": {"$first": "$narrators.name"},
+                "count": {"$sum": 1},
+            }
+        },
+        {"$sort": {"_id": 1}},
+    ]
+    assert run_pipeline(list(DOCS), stages) == [
+        {"_id": 7, "name": "x", "count": 3},
+        {"_id": 8, "name": None, "count": 1},
+    ]
+
+
+def test_group_on_a_compound_key():
+    stages = [
+        {"$unwind": "$narrators"},
+        {"$group": {"_id": {"doc": "$_id", "id": "$narrators.id"}}},
+    ]
+    assert run_pipeline(list(DOCS), stages) == [
+        {"_id": {"doc": 1, "id": 7}},
+        {"_id": {"doc": 1, "id": 8}},
+        {"_id": {"doc": 2, "id": 7}},
+    ]
+
+
+def test_facet_runs_each_branch_on_the_same_input():
+    stages = [
+        {"$match": {"book": 2}},
+        {
+            "$facet": {
+                "total": [{"$count": "count"}],
+                "ids": [{"$project": {"_id": 1}}],
+            }
+        },
+    ]
+    assert run_pipeline(list(DOCS), stages) == [
+        {"total": [{"count": 2}], "ids": [{"_id": 1}, {"_id": 3}]}
+    ]
+
+
+def test_unsupported_stages_raise():
+    with pytest.raises(UnsupportedQueryError):
+        run_pipeline(list(DOCS), [{"$lookup": {}}])
+    with pytest.raises(UnsupportedQueryError):
+        run_pipeline(list(DOCS), [{"$group": {"_id": 1, "n": {"$avg": 1}}}])
+    with pytest.raises(UnsupportedQueryError):
+        run_pipeline(list(DOCS), [{"$unwind": "$a.b"}])
@@ -0,0 +1,71 @@
+import pytest
+
+from app.indexes.text import InvertedIndex, parse_query
+
+
+def build(*texts: str) -> InvertedIndex:
+    index = InvertedIndex()
+    for ordinal, text in enumerate(texts):
+        index.add_document(ordinal, text)
+    index.finalize()
+    return index
+
+
+def ordinals(results: list[tuple[int, float]]) -> list[int]:
+    return [ordinal for ordinal, _ in results]
+
+
+def test_parse_query_splits_terms_and_phrases():
+    terms, phrases = parse_query('qala "haddathana malik" nafi')
+    assert terms == ["qala", "haddathana", "malik", "nafi"]
+    assert phrases == [["haddathana", "malik"]]
+
+
+def test_every_term_is_required():
+    index = build("alpha beta", "alpha gamma", "beta gamma alpha")
+    assert sorted(ordinals(index.search("alpha beta"))) == [0, 2]
+    assert index.search("alpha delta") == []
+    assert index.search("") == []
+
+
+def test_higher_term_frequency_ranks_first():
+    index = build("alpha beta gamma", "alpha alpha alpha", "beta gamma delta")
+    assert ordinals(index.search("alpha")) == [1, 0]
+
+
+def test_shorter_document_ranks_first_at_equal_frequency():
+    index = build("alpha beta gamma delta epsilon zeta", "alpha beta", "gamma")
+    assert ordinals(index.search("alpha")) == [1, 0]
+
+
+def test_rarer_term_weighs_more():
+    index = build("common rare", "common other", "common other", "common")
+    results = dict(index.search("common"))
+    [(_, rare_score)] = index.search("rare")
+    assert rare_score > max(results.values())
+
+
+def test_ties_break_on_ordinal():
+    index = build("gamma", "alpha beta", "delta", "beta alpha", "alpha beta")
+    results = index.search("alpha beta")
+    assert ordinals(results) == [1, 3, 4]
+    assert len({score for _, score in results}) == 1
+
+
+def test_phrase_requires_adjacent_terms_in_order():
+    index = build("alpha beta gamma", "beta alpha gamma", "alpha gamma beta")
+    assert ordinals(index.search('"alpha beta"')) == [0]
+    assert ordinals(index.search('"beta alpha" gamma')) == [1]
+
+
+def test_arabic_matches_ignore_diacritics_and_letter_variants():
+    index = build("حَدَّثَنَا مَالِكٌ عَنْ نَافِعٍ", "قال أبو هريرة")
+    assert ordinals(index.search("حدثنا مالك")) == [0]
+    assert ordinals(index.search("ابو")) == [1]
+
+
+def test_documents_must_be_added_in_order():
+    index = InvertedIndex()
+    index.add_document(0, "alpha")
+    with pytest.raises(ValueError):
+        index.add_document(2, "beta")
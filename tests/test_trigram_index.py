@@ -0,0 +1,45 @@
+from app.indexes.trigram import TrigramIndex
+
+NARRATORS = [
+    (1, "حماد بن زيد بن درهم", 40),
+    (2, "حماد بن سلمة بن دينار", 25),
+    (3, "مالك بن أنس", 90),
+    (4, "محمد بن مسلم بن شهاب الزهري", 70),
+]
+
+
+def build() -> TrigramIndex:
+    index = TrigramIndex()
+    for narrator_id, name, weight in NARRATORS:
+        index.add(narrator_id, name, weight=weight)
+    return index
+
+
+def ids(results: list[tuple[int, float]]) -> list[int]:
+    return [narrator_id for narrator_id, _ in results]
+
+
+def test_one_word_finds_every_narrator_with_it():
+    assert ids(build().search("حماد")) == [1, 2]
+
+
+def test_one_word_typo_finds_the_narrator():
+    results = build().search("حماز")
+    assert ids(results)[:2] == [1, 2]
+    assert 3 not in ids(results)
+    assert build().search("الزهرى")[0][0] == 4
+
+
+def test_partial_name_scores_against_the_matching_words():
+    results = build().search("حماد بن سلمه")
+    assert results[0] == (2, 1.0)
+    assert ids(build().search("ابن شهاب")) == [4]
+
+
+def test_exact_name_is_a_perfect_match():
+    assert build().search("مالك بن انس")[0] == (3, 1.0)
+
+
+def test_unrelated_query_matches_nothing():
+    assert build().search("عبد الرزاق") == []
+    assert build().search("") == []
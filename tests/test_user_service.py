@@ -0,0 +1,92 @@
+import asyncio
+from datetime import datetime, timezone
+
+import pytest
+from bson import ObjectId
+
+from app.schemas.user import UserUpdate
+from app.services.user_service import UserService, _user_cache
+
+pytestmark = pytest.mark.anyio
+
+
+class FakeUsers:
+    """Users collection whose reads can be held after loading a document."""
+
+    def __init__(self, doc: dict) -> None:
+        self.docs = {doc["_id"]: doc}
+        self.reads = 0
+        self.hold: asyncio.Event | None = None
+        self.loaded = asyncio.Event()
+
+    async def find_one(self, filter: dict) -> dict | None:
+        self.reads += 1
+        doc = self.docs.get(filter["_id"])
+        doc = None if doc is None else dict(doc)
+        self.loaded.set()
+        if self.hold is not None:
+            await self.hold.wait()
+        return doc
+
+    async def find_one_and_update(self, filter, update, return_document):
+        doc = self.docs.get(filter["_id"])
+        if doc is None:
+            return None
+        doc.update(update["$set"])
+        return dict(doc)
+
+
+@pytest.fixture
+def users():
+    now = datetime.now(timezone.utc)
+    doc = {
+        "_id": ObjectId(),
+        "email": "reader@example.com",
+        "full_name": "Old Name",
+        "hashed_password": "x",
+        "is_active": True,
+        "created_at": now,
+        "updated_at": now,
+    }
+    _user_cache.clear()
+    yield FakeUsers(doc), str(doc["_id"])
+    _user_cache.clear()
+
+
+async def test_get_after_update_returns_the_update(users):
+    collection, user_id = users
+    service = UserService({"users": collection})
+    assert (await service.get_user_by_id(user_id)).full_name == "Old Name"
+
+    updated = await service.update_user(user_id, UserUpdate(full_name="New Name"))
+    assert updated.full_name == "New Name"
+    assert (await service.get_user_by_id(user_id)).full_name == "New Name"
+    # The second get filled the cache again.
+    reads = collection.reads
+    assert (await service.get_user_by_id(user_id)).full_name == "New Name"
+    assert collection.reads == reads
+
+
+async def test_read_overlapping_an_update_does_not_cache_the_old_user(users):
+    collection, user_id = users
+    service = UserService({"users": collection})
+
+    # A read loads the old document, then the update completes before the
+    # read gets to fill the cache.
+    collection.hold = asyncio.Event()
+    read = asyncio.create_task(service.get_user_by_id(user_id))
+    await collection.loaded.wait()
+    await service.update_user(user_id, UserUpdate(full_name="New Name"))
+    collection.hold.set()
+    assert (await read).full_name == "Old Name"
+
+    collection.hold = None
+    assert (await service.get_user_by_id(user_id)).full_name == "New Name"
+
+
+async def test_update_of_a_missing_user(users):
+    collection, _ = users
+    service = UserService({"users": collection})
+    missing = str(ObjectId())
+    assert await service.update_user(missing, UserUpdate(full_name="x")) is None
+    assert await service.update_user("not-an-id", UserUpdate(full_name="x")) is None